@@ -21,6 +21,7 @@ import config
 from pipeline.base_agent import BaseAgent
 from pipeline.claude_agent_scout import call_claude_agent_structured
 from pipeline.llm import (
+    LLMCancelled,
     call_claude_web_search,
     call_deep_research,
     call_llm_structured,
@@ -98,6 +99,7 @@ class Agent02IdeaGenerator(BaseAgent):
             model=self.model,
             temperature=self.temperature,
             max_tokens=step1_max_tokens,
+            cancel_token=inputs.get("_cancel_token"),
         )
         self._assert_engine_budget("Phase 1", engine_start_cost)
 
@@ -158,6 +160,7 @@ class Agent02IdeaGenerator(BaseAgent):
             model=self.model,
             temperature=self.temperature,
             max_tokens=step3_max_tokens,
+            cancel_token=inputs.get("_cancel_token"),
         )
         self._assert_engine_budget("Phase 3", engine_start_cost)
 
@@ -198,6 +201,7 @@ class Agent02IdeaGenerator(BaseAgent):
                 f"Creative Engine budget exhausted before Step 2 research (cap: ${config.CREATIVE_ENGINE_MAX_COST_USD:.2f})"
             )
 
+        cancel_token = inputs.get("_cancel_token")
         sdk_budget = min(
             max(0.0, remaining_budget_usd),
             config.CREATIVE_SCOUT_MAX_BUDGET_USD,
@@ -219,6 +223,7 @@ class Agent02IdeaGenerator(BaseAgent):
                     max_turns=config.CREATIVE_SCOUT_MAX_TURNS,
                     max_thinking_tokens=config.CREATIVE_SCOUT_MAX_THINKING_TOKENS,
                     max_budget_usd=sdk_budget,
+                    cancel_token=cancel_token,
                 )
                 report = self._format_structured_research(structured_report)
                 self.logger.info(
@@ -226,6 +231,8 @@ class Agent02IdeaGenerator(BaseAgent):
                     len(report),
                 )
                 return report
+            except LLMCancelled:
+                raise
             except Exception as e:
                 self.logger.warning(
                     "Phase 2 Claude Agent SDK failed: %s. Trying legacy Anthropic web search...",
@@ -246,12 +253,15 @@ class Agent02IdeaGenerator(BaseAgent):
                     model=config.CREATIVE_SCOUT_MODEL,
                     max_uses=config.CREATIVE_SCOUT_WEB_MAX_USES,
                     max_tokens=config.CREATIVE_SCOUT_WEB_MAX_TOKENS,
+                    cancel_token=cancel_token,
                 )
                 self.logger.info(
                     "Phase 2 complete (Legacy Claude Web Search): %d chars",
                     len(report),
                 )
                 return report
+            except LLMCancelled:
+                raise
             except Exception as e:
                 self.logger.warning(
                     "Phase 2 legacy Claude web search failed: %s. Trying Gemini fallback...",
@@ -268,12 +278,14 @@ class Agent02IdeaGenerator(BaseAgent):
                 "Phase 2: Falling back to Gemini Deep Research..."
             )
             try:
-                report = call_deep_research(research_prompt)
+                report = call_deep_research(research_prompt, is_cancelled=cancel_token)
                 self.logger.info(
                     "Phase 2 complete (Gemini Deep Research): %d chars of research",
                     len(report),
                 )
                 return report
+            except LLMCancelled:
+                raise
             except Exception as e:
                 self.logger.warning(
                     "Phase 2 Gemini Deep Research also failed: %s. Using built-in fallback.",
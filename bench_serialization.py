@@ -0,0 +1,84 @@
+"""Compare CPU time per agent completion: old vs single-encode serialization.
+
+Usage:
+    python bench_serialization.py [iterations]
+
+"old" repeats what the pipeline used to do with each result: one dump and
+parse for the dict, a pretty dump for the file, ``json.dumps`` for SQLite,
+and one ``json.dumps`` per WebSocket client. "new" is what the pipeline does
+now (pipeline/serialization.py). Install ``orjson`` to see the faster backend.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+
+from pydantic import BaseModel
+
+from pipeline.serialization import BACKEND, dumps_text, encode_model, raw_json
+
+WS_CLIENTS = 3
+
+
+class _Idea(BaseModel):
+    title: str
+    angle: str
+    hook: str
+    proof_points: list[str]
+    score: float
+
+
+class _Result(BaseModel):
+    brand: str
+    summary: str
+    ideas: list[_Idea]
+
+
+def _sample() -> _Result:
+    ideas = [
+        _Idea(
+            title=f"Idea {i} — “quoted” title",
+            angle="Problem-aware angle " * 8,
+            hook="Stop scrolling if you've ever wondered why " * 4,
+            proof_points=[f"Proof point {j} with some supporting detail" for j in range(8)],
+            score=i / 7,
+        )
+        for i in range(120)
+    ]
+    return _Result(brand="Example", summary="Long summary. " * 200, ideas=ideas)
+
+
+def _old(result: _Result):
+    data = json.loads(result.model_dump_json())       # _run_agent_sync
+    result.model_dump_json(indent=2)                  # _save_output
+    json.dumps(data)                                  # save_agent_output
+    msg = {"type": "agent_complete", "slug": "agent", "output": data}
+    for _ in range(WS_CLIENTS):                       # send_json per client
+        json.dumps(msg)
+
+
+def _new(result: _Result):
+    doc = encode_model(result)                        # _save_output (file + dict)
+    raw_json(doc).decode("utf-8")                     # save_agent_output
+    msg = {"type": "agent_complete", "slug": "agent", "output": doc}
+    dumps_text(msg)                                   # hub.encode, shared by clients
+
+
+def _measure(fn, result, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(result)
+    return (time.process_time() - start) / iterations * 1000
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    result = _sample()
+    size_kb = len(result.model_dump_json(indent=2)) / 1024
+    old_ms = _measure(_old, result, iterations)
+    new_ms = _measure(_new, result, iterations)
+    print(f"backend: {BACKEND}   payload: {size_kb:.0f} KB   ws clients: {WS_CLIENTS}")
+    print(f"  old: {old_ms:7.2f} ms CPU / completion")
+    print(f"  new: {new_ms:7.2f} ms CPU / completion  ({(1 - new_ms / old_ms) * 100:.0f}% less)")
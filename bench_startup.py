@@ -0,0 +1,57 @@
+"""Import-time budget check for the server and the CLI.
+
+Usage:
+    python bench_startup.py [runs]
+
+Imports each entry module in a fresh interpreter (best of ``runs``, default
+3) and fails with exit status 1 if one exceeds its budget or eagerly
+imports something that should load lazily (agent modules, prompts,
+schemas, the scraper, provider SDKs). Run it after touching top-level
+imports.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+# Seconds, wall clock, on a warm disk cache.
+BUDGETS = {
+    "server": 0.8,
+    "main": 0.4,
+}
+
+# Module prefixes that must not be imported by merely importing the entry point.
+LAZY = ("agents.", "prompts.", "schemas.", "pipeline.scraper", "openai", "anthropic", "google.genai", "bs4")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _probe(module: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    failed = False
+    for module, budget in BUDGETS.items():
+        probes = [_probe(module) for _ in range(runs)]
+        best = min(p["elapsed"] for p in probes)
+        eager = [m for m in probes[0]["modules"] if m.startswith(LAZY)]
+        ok = best <= budget and not eager
+        failed |= not ok
+        print(f"  import {module:<8} {best * 1000:6.0f} ms  (budget {budget * 1000:.0f} ms)  {'ok' if ok else 'FAIL'}")
+        if eager:
+            print(f"    eagerly imported: {', '.join(eager)}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,23 @@
+"""Build content-hashed, precompressed dashboard assets into static/dist/.
+
+Usage:
+    python build_static.py
+
+The server also rebuilds on startup when static/app.js or style.css changed
+(see pipeline/static_assets.py). Install ``brotli`` to get .br variants in
+addition to .gz.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from pipeline.static_assets import build
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    static_dir = Path(__file__).parent / "static"
+    manifest = build(static_dir)
+    for name, hashed in manifest.items():
+        print(f"  {name} -> dist/{hashed}")
@@ -61,6 +61,161 @@ CREATIVE_SCOUT_MAX_BUDGET_USD = float(
 CREATIVE_SCOUT_WEB_MAX_USES = int(os.getenv("CREATIVE_SCOUT_WEB_MAX_USES", "20"))
 CREATIVE_SCOUT_WEB_MAX_TOKENS = int(os.getenv("CREATIVE_SCOUT_WEB_MAX_TOKENS", "20000"))
 
+# ---------------------------------------------------------------------------
+# Parallel Copywriter (Agent 04) — adaptive concurrency (AIMD)
+#
+# Starts at INITIAL parallel jobs, grows while the provider is healthy and
+# backs off on 429s, 5xx errors or rising time-to-first-token.
+# ---------------------------------------------------------------------------
+COPYWRITER_PARALLEL_INITIAL = int(os.getenv("COPYWRITER_PARALLEL_INITIAL", "4"))
+COPYWRITER_PARALLEL_MIN = int(os.getenv("COPYWRITER_PARALLEL_MIN", "1"))
+COPYWRITER_PARALLEL_MAX = int(os.getenv("COPYWRITER_PARALLEL_MAX", "12"))
+
+# Reuse already-written scripts whose job fingerprint (angle + concept +
+# foundation brief + model + prompt) is unchanged. Set to 0 to always rewrite.
+COPYWRITER_SCRIPT_REUSE = os.getenv("COPYWRITER_SCRIPT_REUSE", "1") not in ("0", "false", "False")
+
+# Provider pool for fan-out jobs: several API keys and/or equivalent models
+# (with weights) that parallel Copywriter jobs are spread across. Inline JSON
+# list in PROVIDER_POOL, or a path to a JSON file in PROVIDER_POOL_FILE.
+# See pipeline/provider_pool.py for the format. Empty = single default key.
+PROVIDER_POOL = os.getenv("PROVIDER_POOL", "")
+PROVIDER_POOL_FILE = os.getenv("PROVIDER_POOL_FILE", "")
+
+# ---------------------------------------------------------------------------
+# Concurrent pipeline runs
+#
+# Up to MAX_CONCURRENT_RUNS pipeline/branch runs execute at once (one per
+# brand); further runs wait in a FIFO queue instead of being rejected.
+# ---------------------------------------------------------------------------
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "2"))
+
+# ---------------------------------------------------------------------------
+# LLM work scheduler
+#
+# All blocking LLM work runs on one worker pool, dispatched by priority
+# (chat > gate-blocking pipeline work > reruns > speculative) with per-brand
+# fairness. RESERVED_INTERACTIVE workers are kept free for chat turns.
+# ---------------------------------------------------------------------------
+LLM_SCHEDULER_WORKERS = int(os.getenv("LLM_SCHEDULER_WORKERS", "16"))
+LLM_SCHEDULER_RESERVED_INTERACTIVE = int(os.getenv("LLM_SCHEDULER_RESERVED_INTERACTIVE", "2"))
+LLM_SCHEDULER_MAX_QUEUE = int(os.getenv("LLM_SCHEDULER_MAX_QUEUE", "200"))
+
+# ---------------------------------------------------------------------------
+# Non-LLM executors
+#
+# Short disk/SQLite I/O and CPU-heavy parsing get their own bounded pools
+# (pipeline/executors.py), so a burst of LLM work never delays them. The IO
+# pool is also the event loop's default executor.
+# ---------------------------------------------------------------------------
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "8"))
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+
+# ---------------------------------------------------------------------------
+# Output store
+#
+# Output/artifact files are written atomically (temp file + rename). FSYNC:
+# "batch" fsyncs each file and coalesces directory fsyncs per INTERVAL
+# seconds, "always" fsyncs both on every write, "off" skips fsync.
+# ---------------------------------------------------------------------------
+OUTPUT_FSYNC = os.getenv("OUTPUT_FSYNC", "batch").lower()
+OUTPUT_FSYNC_INTERVAL = float(os.getenv("OUTPUT_FSYNC_INTERVAL", "0.2"))
+
+# ---------------------------------------------------------------------------
+# WebSocket fan-out
+#
+# Each dashboard connection gets its own bounded send queue. Progress ticks
+# and log lines are coalesced/dropped when a client falls behind; a client
+# that stalls longer than WS_SEND_TIMEOUT seconds is disconnected (it
+# reconnects and resyncs). The last WS_REPLAY_BUFFER events are kept so a
+# reconnecting client receives only what it missed instead of a snapshot.
+# ---------------------------------------------------------------------------
+WS_CLIENT_QUEUE_SIZE = int(os.getenv("WS_CLIENT_QUEUE_SIZE", "256"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+WS_REPLAY_BUFFER = int(os.getenv("WS_REPLAY_BUFFER", "1000"))
+
+# ---------------------------------------------------------------------------
+# HTTP delivery
+#
+# JSON responses larger than GZIP_MINIMUM_SIZE bytes are gzip-compressed on
+# the fly. Dashboard assets are served content-hashed and precompressed from
+# static/dist/ (python build_static.py); STATIC_BUILD_ON_START rebuilds them
+# at startup when the sources changed.
+# ---------------------------------------------------------------------------
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+STATIC_BUILD_ON_START = os.getenv("STATIC_BUILD_ON_START", "1") not in ("0", "false", "False")
+
+# ---------------------------------------------------------------------------
+# Server log streaming
+#
+# Log lines are pushed to dashboards in batches of up to LOG_FLUSH_MAX_LINES,
+# at most LOG_FLUSH_INTERVAL_MS after the first line of a batch. Each run
+# keeps its last RUN_LOG_RING_SIZE lines, mirrored to RUN_LOG_DIR for replay
+# (GET /api/runs/{run_id}/logs?since=<seq>).
+# ---------------------------------------------------------------------------
+LOG_FLUSH_INTERVAL_MS = int(os.getenv("LOG_FLUSH_INTERVAL_MS", "50"))
+LOG_FLUSH_MAX_LINES = int(os.getenv("LOG_FLUSH_MAX_LINES", "200"))
+RUN_LOG_RING_SIZE = int(os.getenv("RUN_LOG_RING_SIZE", "2000"))
+RUN_LOG_DIR = ROOT_DIR / os.getenv("RUN_LOG_DIR", "run_logs")
+
+# ---------------------------------------------------------------------------
+# Output chat sessions
+#
+# /api/chat keeps a server-side session per agent output (keyed by slug and
+# session id) so the system prompt and earlier turns stay byte-identical and
+# provider prompt caching can hit. Idle sessions expire after
+# CHAT_SESSION_TTL seconds; at most CHAT_MAX_SESSIONS are kept.
+# ---------------------------------------------------------------------------
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "3600"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "100"))
+
+# ---------------------------------------------------------------------------
+# Background jobs
+#
+# /api/rerun queues a persisted job (SQLite) and returns its id at once. Up
+# to JOB_MAX_CONCURRENT jobs run side by side; their LLM calls still share
+# the scheduler above. Queued/interrupted jobs resume after a restart.
+# ---------------------------------------------------------------------------
+JOB_MAX_CONCURRENT = int(os.getenv("JOB_MAX_CONCURRENT", "4"))
+
+# ---------------------------------------------------------------------------
+# Agent worker processes
+#
+# With AGENT_PROCESS_WORKERS > 0, agent runs (prompt building, output
+# validation, scraping) execute in that many spawned worker processes
+# instead of server threads, so their CPU work doesn't hold the GIL against
+# the event loop. Logs, stream progress, usage and cancellation are relayed
+# over IPC. 0 keeps the in-process thread path.
+# ---------------------------------------------------------------------------
+AGENT_PROCESS_WORKERS = int(os.getenv("AGENT_PROCESS_WORKERS", "0"))
+
+# ---------------------------------------------------------------------------
+# Stream progress
+#
+# Streaming LLM calls emit a structured stream_progress event (tokens so far,
+# bytes, tokens/sec, ETA from the previous output's size) at most every
+# PROGRESS_INTERVAL_SECONDS per agent/job.
+# ---------------------------------------------------------------------------
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("PROGRESS_INTERVAL_SECONDS", "2"))
+
+# ---------------------------------------------------------------------------
+# Distributed work queue
+#
+# With WORK_QUEUE_BACKEND set, the server only enqueues agent runs (including
+# copywriter/hook shards) and aggregates results; stand-alone `python
+# worker.py` processes lease and run them, here or on other machines.
+# Backends: "sqlite" (WORK_QUEUE_DB, shared by server and workers), "memory"
+# (in-process, for tests), or "module:Class" for a custom WorkQueue. Leases
+# last WORK_QUEUE_LEASE_SECONDS and are renewed by heartbeats; a task is
+# retried up to WORK_QUEUE_MAX_ATTEMPTS times. WORK_QUEUE_LOCAL_WORKERS
+# starts that many worker threads inside the server as well.
+# ---------------------------------------------------------------------------
+WORK_QUEUE_BACKEND = os.getenv("WORK_QUEUE_BACKEND", "")
+WORK_QUEUE_DB = Path(os.getenv("WORK_QUEUE_DB", str(ROOT_DIR / "creative_maker.db")))
+WORK_QUEUE_LEASE_SECONDS = float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "60"))
+WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+WORK_QUEUE_LOCAL_WORKERS = int(os.getenv("WORK_QUEUE_LOCAL_WORKERS", "0"))
+
 AGENT_LLM_CONFIG: dict[str, dict] = {
     # --- PHASE 1: RESEARCH ---
     # 1A: Foundation Research — Gemini 2.5 Pro (1M context, 65K output, strong reasoning)
@@ -32,11 +32,7 @@ from rich.logging import RichHandler
 from rich.panel import Panel
 
 import config
-from agents.agent_01a_foundation_research import Agent01AFoundationResearch
-from agents.agent_02_idea_generator import Agent02IdeaGenerator
-
-from agents.agent_04_copywriter import Agent04Copywriter
-from agents.agent_05_hook_specialist import Agent05HookSpecialist
+from pipeline.agent_registry import AGENTS
 from pipeline.orchestrator import Pipeline
 
 console = Console()
@@ -95,7 +91,7 @@ def _load_agent_output(slug: str) -> dict | None:
 def run_phase1(inputs: dict) -> dict[str, object]:
     """Run Phase 1 — Research (Agent 1A: Foundation Research)."""
     pipeline = Pipeline()
-    pipeline.register(Agent01AFoundationResearch())
+    pipeline.register(AGENTS["agent_01a"]())
 
     console.print(
         Panel(
@@ -149,7 +145,7 @@ def run_phase2(inputs: dict) -> dict[str, object]:
     results = {}
 
     # Agent 02 — Creative Engine
-    agent_02 = Agent02IdeaGenerator()
+    agent_02 = AGENTS["agent_02"]()
     pipeline.register(agent_02)
     result_02 = pipeline.run_agent("agent_02", inputs)
     results["agent_02"] = result_02
@@ -207,7 +203,7 @@ def run_phase3(inputs: dict) -> dict[str, object]:
     results = {}
 
     # Agent 04 — Copywriter
-    agent_04 = Agent04Copywriter()
+    agent_04 = AGENTS["agent_04"]()
     pipeline.register(agent_04)
     result_04 = pipeline.run_agent("agent_04", inputs)
     results["agent_04"] = result_04
@@ -220,7 +216,7 @@ def run_phase3(inputs: dict) -> dict[str, object]:
     inputs["copywriter_brief"] = json.loads(result_04.model_dump_json())
 
     # Agent 05 — Hook Specialist
-    agent_05 = Agent05HookSpecialist()
+    agent_05 = AGENTS["agent_05"]()
     pipeline.register(agent_05)
     result_05 = pipeline.run_agent("agent_05", inputs)
     results["agent_05"] = result_05
@@ -290,18 +286,13 @@ def run_full_pipeline(inputs: dict):
 
 def run_single_agent(agent_slug: str, inputs: dict):
     """Run a single agent by slug."""
-    agent_map = {
-        "01a": Agent01AFoundationResearch,
-        "02": Agent02IdeaGenerator,
-        "04": Agent04Copywriter,
-        "05": Agent05HookSpecialist,
-    }
+    agent_map = AGENTS.cli_names()
 
-    agent_cls = agent_map.get(agent_slug)
-    if not agent_cls:
+    if agent_slug not in agent_map:
         console.print(f"[red]Unknown agent: {agent_slug}[/red]")
         console.print(f"Available: {', '.join(sorted(agent_map.keys()))}")
         sys.exit(1)
+    agent_cls = AGENTS[agent_map[agent_slug]]
 
     # Auto-load upstream outputs from disk for downstream agents
     if agent_slug in ("02", "03", "04", "05", "06", "07"):
@@ -0,0 +1,277 @@
+"""Run agent executions in worker processes instead of server threads.
+
+Building multi-MB prompts, validating huge structured outputs and parsing
+scraped HTML are pure-Python CPU work. In scheduler threads inside the
+uvicorn process they hold the GIL against the event loop, so dashboard
+requests and WebSocket fan-out stall while a dozen outputs validate.
+
+With ``AGENT_PROCESS_WORKERS > 0``, ``AgentProcessPool.run()`` executes
+``agent.run()`` in a spawned worker process. The calling (scheduler)
+thread blocks on IPC and replays what the worker reports, in its own
+contextvars context, so everything lands where it would have in-process:
+
+  - log records are re-handled by the parent's loggers (and so tagged with
+    the current run by the WebSocket log handler);
+  - structured stream progress events go to the current progress reporter
+    (pipeline/progress.py), re-tagged with its run/slug/job key;
+  - token usage is merged into the current usage scope, and stream timings
+    into the calling thread's samples (for the adaptive limiter);
+  - cancellation (CancelToken / abort check) is forwarded to a token in the
+    worker, which tears down its in-flight stream.
+
+The result comes back as the JSON bytes the worker already wrote to disk;
+the parent only parses them. Adaptive concurrency limiter state is per
+process, so provider concurrency is additionally bounded by the number of
+workers.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import logging.handlers
+import multiprocessing
+import pickle
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable
+
+import config
+from pipeline.cancellation import CancelToken
+from pipeline.llm import (
+    active_api_key,
+    add_stream_stats,
+    begin_usage_scope,
+    collect_stream_stats,
+    get_usage_log,
+    merge_usage,
+    reset_stream_stats,
+    use_api_key,
+)
+from pipeline.output_cache import get_output_cache
+from pipeline.progress import ProgressReporter, current_reporter, forward_progress, use_progress_reporter
+from pipeline.serialization import JSONDocument, loads, model_bytes
+
+logger = logging.getLogger(__name__)
+
+# How often the waiting thread checks for cancellation while idle (seconds).
+_POLL_INTERVAL = 0.2
+
+
+class _EventHandler(logging.Handler):
+    """Worker side: ships log records to the parent over the call's event queue."""
+
+    def __init__(self, events):
+        super().__init__()
+        self._events = events
+        self._prepare = logging.handlers.QueueHandler(None).prepare
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._events.put(("log", self._prepare(record)))
+        except Exception:
+            self.handleError(record)
+
+
+def _init_worker(levels: dict[str, int]):
+    """Relay-only logging: drop handlers the spawn import may have installed
+    (the parent prints relayed records) and mirror the parent's levels so
+    filtered records are never shipped."""
+    logging.getLogger().handlers.clear()
+    for name, level in levels.items():
+        logging.getLogger(name or None).setLevel(level)
+
+
+def _execute(
+    agent_cls: type,
+    inputs: dict[str, Any],
+    agent_kwargs: dict[str, Any],
+    api_key: tuple[str, str, str] | None,
+    progress: dict[str, Any] | None,
+    events,
+    cancel_event,
+) -> tuple[bytes, bool, list[dict[str, Any]], list[dict[str, Any]]]:
+    """Worker entry point: (output JSON, saved to disk, usage, stream stats)."""
+    return contextvars.Context().run(
+        _execute_in_context, agent_cls, inputs, agent_kwargs, api_key, progress, events, cancel_event,
+    )
+
+
+def _execute_in_context(agent_cls, inputs, agent_kwargs, api_key, progress, events, cancel_event):
+    handler = _EventHandler(events)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    begin_usage_scope()
+    reset_stream_stats()
+    # Untagged here; the parent re-tags events with its own reporter.
+    reporter = ProgressReporter(lambda e: events.put(("progress", e)), **progress) if progress else None
+
+    token = None
+    done = threading.Event()
+    if cancel_event is not None:
+        token = inputs["_cancel_token"] = CancelToken()
+
+        def _watch():
+            while not done.wait(_POLL_INTERVAL):
+                if cancel_event.is_set():
+                    token.cancel("Cancelled")
+                    return
+
+        threading.Thread(target=_watch, name="agent-cancel-watch", daemon=True).start()
+
+    try:
+        agent = agent_cls(**agent_kwargs)
+        with use_progress_reporter(reporter):
+            if api_key is not None:
+                with use_api_key(*api_key):
+                    result = agent.run(inputs)
+            else:
+                result = agent.run(inputs)
+        saved = agent.last_output_raw is not None
+        raw = agent.last_output_raw if saved else model_bytes(result)
+        return raw, saved, get_usage_log(), collect_stream_stats()
+    except Exception as exc:
+        # The parent can only re-raise what pickles.
+        try:
+            pickle.dumps(exc)
+        except Exception:
+            raise RuntimeError(f"{type(exc).__name__}: {exc}") from None
+        raise
+    finally:
+        done.set()
+        root.removeHandler(handler)
+
+
+class AgentProcessPool:
+    """Process pool for agent runs; see the module docstring."""
+
+    def __init__(self, workers: int):
+        self.workers = max(0, int(workers))
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._manager = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def run(
+        self,
+        agent_cls: type,
+        inputs: dict[str, Any],
+        agent_kwargs: dict[str, Any],
+        cancel_check: Callable[[], bool] | None = None,
+    ) -> tuple[JSONDocument, bool]:
+        """Run ``agent_cls(**agent_kwargs).run(inputs)`` in a worker process.
+
+        Blocks the calling thread. Returns (output document, whether the
+        agent saved it to ``output_dir``).
+        """
+        executor, manager = self._ensure_started()
+        events = manager.Queue()
+        cancel_event = manager.Event() if cancel_check is not None else None
+        reporter = current_reporter()
+        progress = None
+        if reporter is not None:
+            progress = {"expected_chars": reporter.expected_chars, "interval": reporter.interval}
+        try:
+            future = executor.submit(
+                _execute, agent_cls, inputs, agent_kwargs, active_api_key(), progress, events, cancel_event,
+            )
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+        while True:
+            # Checked every iteration: a chatty worker may never let get() time out.
+            if cancel_event is not None and not cancel_event.is_set() and cancel_check():
+                cancel_event.set()
+            try:
+                kind, payload = events.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            self._replay(kind, payload)
+            if future.done() and events.empty():
+                break
+
+        try:
+            raw, saved, usage, stats = future.result()
+        except BrokenProcessPool:
+            self._reset()
+            raise
+        finally:
+            # Events put right before the worker returned.
+            while True:
+                try:
+                    self._replay(*events.get_nowait())
+                except queue.Empty:
+                    break
+        merge_usage(usage)
+        add_stream_stats(stats)
+        if saved:
+            get_output_cache().invalidate(Path(agent_kwargs["output_dir"]) / f"{agent_cls.slug}_output.json")
+        return JSONDocument(loads(raw), raw), saved
+
+    def shutdown(self):
+        with self._lock:
+            executor, manager = self._executor, self._manager
+            self._executor = self._manager = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+    # -- internals ---------------------------------------------------------
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                ctx = multiprocessing.get_context("spawn")
+                levels = {
+                    name: lg.level
+                    for name, lg in logging.root.manager.loggerDict.items()
+                    if isinstance(lg, logging.Logger) and lg.level
+                }
+                levels[""] = logging.getLogger().level
+                self._manager = ctx.Manager()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(levels,),
+                )
+                logger.info("Agent process pool started (%d workers)", self.workers)
+            return self._executor, self._manager
+
+    def _reset(self):
+        logger.warning("Agent process pool broke; restarting it on next use")
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _replay(kind: str, payload: Any):
+        if kind == "log":
+            record: logging.LogRecord = payload
+            logger_ = logging.getLogger(record.name)
+            if logger_.isEnabledFor(record.levelno):
+                logger_.handle(record)
+        elif kind == "progress":
+            forward_progress(payload)
+
+
+_pool: AgentProcessPool | None = None
+
+
+def get_agent_processes() -> AgentProcessPool:
+    """Return the process-wide agent process pool (disabled when 0 workers)."""
+    global _pool
+    if _pool is None:
+        _pool = AgentProcessPool(config.AGENT_PROCESS_WORKERS)
+    return _pool
@@ -0,0 +1,63 @@
+"""Lazy agent registry shared by the server and the CLI.
+
+Agent modules pull in their prompts (tens of KB of text) and Pydantic
+schemas, and building those dominates cold start. The registry maps each
+agent slug to an ``"module:Class"`` reference and imports the module the
+first time the class is looked up, so ``python main.py agent 04`` loads only
+Agent 04 and the server loads agents as runs first need them.
+
+``AGENTS`` is a read-only mapping: ``slug in AGENTS`` and iteration never
+import anything; ``AGENTS[slug]`` / ``AGENTS.get(slug)`` do.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Iterator, Mapping
+
+
+class AgentRegistry(Mapping[str, type]):
+    """slug -> agent class, resolved on first access."""
+
+    def __init__(self, refs: dict[str, str]):
+        self._refs = dict(refs)
+        self._classes: dict[str, type] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, slug: str) -> type:
+        cls = self._classes.get(slug)
+        if cls is None:
+            ref = self._refs[slug]
+            module_name, _, class_name = ref.partition(":")
+            with self._lock:
+                cls = self._classes.get(slug)
+                if cls is None:
+                    cls = getattr(importlib.import_module(module_name), class_name)
+                    self._classes[slug] = cls
+        return cls
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self._refs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def ref(self, slug: str) -> str:
+        """The ``"module:Class"`` reference of ``slug`` (no import)."""
+        return self._refs[slug]
+
+    def cli_names(self) -> dict[str, str]:
+        """Short CLI names (``"04"``) -> slugs (``"agent_04"``)."""
+        return {slug.removeprefix("agent_"): slug for slug in self._refs}
+
+
+AGENTS = AgentRegistry({
+    "agent_01a": "agents.agent_01a_foundation_research:Agent01AFoundationResearch",
+    "agent_02": "agents.agent_02_idea_generator:Agent02IdeaGenerator",
+    "agent_04": "agents.agent_04_copywriter:Agent04Copywriter",
+    "agent_05": "agents.agent_05_hook_specialist:Agent05HookSpecialist",
+})
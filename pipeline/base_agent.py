@@ -17,6 +17,8 @@ from pydantic import BaseModel
 
 import config
 from pipeline.llm import call_llm, call_llm_structured, call_deep_research
+from pipeline.output_store import get_output_store
+from pipeline.serialization import JSONDocument, decode_document, model_bytes
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -57,12 +59,22 @@ class BaseAgent(ABC):
         self.max_tokens = max_tokens if max_tokens is not None else llm_conf["max_tokens"]
         self.output_dir = output_dir or config.OUTPUT_DIR
         self.logger = logging.getLogger(f"agent.{self.slug}")
+        # Last saved result, serialized once (reused for SQLite / HTTP).
+        self.last_output_raw: bytes | None = None
+        self._last_output: JSONDocument | None = None
 
         self.logger.debug(
             "Config: provider=%s, model=%s, temp=%.2f, max_tokens=%d",
             self.provider, self.model, self.temperature, self.max_tokens,
         )
 
+    @property
+    def last_output(self) -> JSONDocument | None:
+        """Last saved result as a document, decoded from its bytes on first use."""
+        if self._last_output is None and self.last_output_raw is not None:
+            self._last_output = decode_document(self.last_output_raw)
+        return self._last_output
+
     @property
     @abstractmethod
     def system_prompt(self) -> str:
@@ -99,6 +111,7 @@ class BaseAgent(ABC):
             model=self.model,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            cancel_token=inputs.get("_cancel_token"),
         )
 
         elapsed = time.time() - start
@@ -123,6 +136,7 @@ class BaseAgent(ABC):
             model=self.model,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            cancel_token=inputs.get("_cancel_token"),
         )
 
         elapsed = time.time() - start
@@ -170,7 +184,8 @@ class BaseAgent(ABC):
 
         # Step 1: Deep Research (web browsing, source reading, report generation)
         self.logger.info("Step 1: Deep Research (%d char prompt)", len(research_prompt))
-        abort_check = inputs.get("_abort_check")
+        # Prefer the run's CancelToken: it wakes the poll loop immediately.
+        abort_check = inputs.get("_cancel_token") or inputs.get("_abort_check")
         research_report = call_deep_research(research_prompt, is_cancelled=abort_check)
         step1_elapsed = time.time() - start
         self.logger.info(
@@ -193,6 +208,7 @@ class BaseAgent(ABC):
             model=self.model,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            cancel_token=inputs.get("_cancel_token"),
         )
 
         elapsed = time.time() - start
@@ -202,13 +218,11 @@ class BaseAgent(ABC):
         return result
 
     def _save_output(self, result: BaseModel) -> Path:
-        """Save structured output as JSON to the outputs directory."""
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        """Save structured output as JSON to the outputs directory (atomically)."""
         output_path = self.output_dir / f"{self.slug}_output.json"
-        output_path.write_text(
-            result.model_dump_json(indent=2),
-            encoding="utf-8",
-        )
+        self.last_output_raw = model_bytes(result)
+        self._last_output = None
+        get_output_store().write_bytes(output_path, self.last_output_raw)
         self.logger.info("Output saved: %s", output_path)
         return output_path
 
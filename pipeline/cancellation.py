@@ -0,0 +1,86 @@
+"""Cancellation tokens for in-flight LLM work.
+
+A CancelToken is created per pipeline run (and per rewrite) and passed down
+through call_llm / call_llm_structured into every provider stream loop and
+the Claude Agent SDK scout. Cancelling it:
+
+  - flips a thread-safe flag that stream loops check on every chunk, and
+  - fires registered close callbacks immediately, so a stream that is
+    blocked waiting on the network (e.g. while the model is thinking) is
+    torn down from the aborting thread instead of running to completion.
+
+The token is also callable (returns True once cancelled), so it can be
+passed anywhere an ``is_cancelled`` callable is expected.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class CancelToken:
+    """Thread-safe, one-shot cancellation signal with close callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.reason = ""
+
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Cancelled"):
+        """Cancel the token and fire all registered close callbacks (once)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception as exc:
+                logger.debug("Cancel callback failed: %s", exc)
+
+    def register(self, cb: Callable[[], None]) -> Callable[[], None]:
+        """Run ``cb`` on cancellation (immediately if already cancelled).
+
+        Returns an unregister function; call it once the guarded stream has
+        finished so the token doesn't hold on to closed resources.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(cb)
+
+                def _unregister():
+                    with self._lock:
+                        if cb in self._callbacks:
+                            self._callbacks.remove(cb)
+
+                return _unregister
+        try:
+            cb()
+        except Exception as exc:
+            logger.debug("Cancel callback failed: %s", exc)
+        return lambda: None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Sleep up to ``timeout`` seconds; return True early if cancelled."""
+        return self._event.wait(timeout)
+
+
+def on_cancel(token: CancelToken | None, cb: Callable[[], None]) -> Callable[[], None]:
+    """Register ``cb`` on an optional token; returns an unregister function."""
+    if token is None:
+        return lambda: None
+    return token.register(cb)
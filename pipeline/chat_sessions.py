@@ -0,0 +1,215 @@
+"""Server-side sessions for chatting with an agent output.
+
+/api/chat used to rebuild everything on every turn. It re-embedded the
+current output in the system prompt and flattened a sliding window of the
+last 20 messages into the user prompt. The prompt prefix therefore changed
+every turn, and provider prompt caching never hit.
+
+A ChatSession freezes the system prompt (with the output snapshot) when the
+session starts and only ever appends to its transcript, so each turn's
+prompt is the previous turn's prompt plus the new exchange. Edits come back
+as RFC 6902 patches (pipeline/json_patch.py) and are applied to the
+session's working ``document``; the model sees its own earlier patches in
+the transcript rather than a re-embedded copy of the output.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+import config
+
+# Oldest turns are dropped once the transcript grows past this (costs one
+# cache miss, keeps long sessions inside the context window).
+_MAX_TRANSCRIPT_CHARS = 120_000
+
+# Tagged blocks in a chat reply that carry an edit rather than prose.
+EDIT_TAGS = ("json_patch", "modified_output")
+
+
+@dataclass
+class ChatTurn:
+    role: str  # "user" or "assistant"
+    content: str
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    slug: str
+    brand_slug: str
+    system_prompt: str
+    document: Any
+    # ETag of the output file the working document matches; a different one
+    # means the output changed outside this session.
+    source_etag: str
+    schema: type[BaseModel] | None = None
+    turns: list[ChatTurn] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def prompt(self, message: str) -> str:
+        """Transcript so far plus ``message``, as one append-only user prompt."""
+        parts = [
+            f"{'User' if t.role == 'user' else 'Assistant'}: {t.content}"
+            for t in self.turns
+        ]
+        parts.append(f"User: {message}")
+        return "\n\n".join(parts)
+
+    def record(self, message: str, reply: str):
+        self.turns.append(ChatTurn("user", message))
+        self.turns.append(ChatTurn("assistant", reply))
+        total = sum(len(t.content) for t in self.turns)
+        while total > _MAX_TRANSCRIPT_CHARS and len(self.turns) > 2:
+            for turn in self.turns[:2]:
+                total -= len(turn.content)
+            del self.turns[:2]
+
+    def validate(self, document: Any) -> str | None:
+        """Error message if ``document`` doesn't fit the agent's schema, else None."""
+        if self.schema is None:
+            return None
+        try:
+            self.schema.model_validate(document)
+        except Exception as exc:
+            return str(exc)
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "slug": self.slug,
+            "brand_slug": self.brand_slug,
+            "turns": len(self.turns),
+            "created_at": self.created_at,
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+        }
+
+
+class ReplyStreamParser:
+    """Splits a streamed chat reply into visible text and edit blocks.
+
+    ``feed()`` returns the text that can be shown now and any
+    ``(tag, body)`` edit blocks that just closed. Text that might be the
+    start of an edit tag is held back until the next chunk decides it.
+    """
+
+    def __init__(self, tags: tuple[str, ...] = EDIT_TAGS):
+        self._opens = {f"<{t}>": t for t in tags}
+        self._buf = ""
+        self._inside: str | None = None
+
+    def feed(self, chunk: str) -> tuple[str, list[tuple[str, str]]]:
+        self._buf += chunk
+        visible: list[str] = []
+        blocks: list[tuple[str, str]] = []
+        while True:
+            if self._inside is not None:
+                close = f"</{self._inside}>"
+                idx = self._buf.find(close)
+                if idx < 0:
+                    break
+                blocks.append((self._inside, self._buf[:idx]))
+                self._buf = self._buf[idx + len(close):]
+                self._inside = None
+                continue
+            hits = [(self._buf.find(o), o) for o in self._opens if o in self._buf]
+            if hits:
+                idx, open_tag = min(hits)
+                visible.append(self._buf[:idx])
+                self._buf = self._buf[idx + len(open_tag):]
+                self._inside = self._opens[open_tag]
+                continue
+            keep = self._partial_tag_len()
+            visible.append(self._buf[:len(self._buf) - keep])
+            self._buf = self._buf[len(self._buf) - keep:]
+            break
+        return "".join(visible), blocks
+
+    def _partial_tag_len(self) -> int:
+        for n in range(min(len(self._buf), max(map(len, self._opens)) - 1), 0, -1):
+            tail = self._buf[-n:]
+            if any(o.startswith(tail) for o in self._opens):
+                return n
+        return 0
+
+
+class ChatSessionStore:
+    """Sessions keyed by (slug, session_id), with idle expiry and a size cap."""
+
+    def __init__(self, ttl: float = 3600.0, max_sessions: int = 100):
+        self.ttl = float(ttl)
+        self.max_sessions = max(1, int(max_sessions))
+        self._lock = threading.Lock()
+        self._sessions: dict[tuple[str, str], ChatSession] = {}
+
+    def get(self, slug: str, session_id: str | None, brand_slug: str = "") -> ChatSession | None:
+        if not session_id:
+            return None
+        with self._lock:
+            self._expire()
+            session = self._sessions.get((slug, session_id))
+            if session is None or session.brand_slug != brand_slug:
+                return None
+            session.last_used = time.monotonic()
+            return session
+
+    def create(
+        self,
+        slug: str,
+        brand_slug: str,
+        system_prompt: str,
+        document: Any,
+        source_etag: str,
+        schema: type[BaseModel] | None = None,
+    ) -> ChatSession:
+        session = ChatSession(
+            session_id=secrets.token_urlsafe(12),
+            slug=slug,
+            brand_slug=brand_slug,
+            system_prompt=system_prompt,
+            document=document,
+            source_etag=source_etag,
+            schema=schema,
+        )
+        with self._lock:
+            self._expire()
+            self._sessions[(slug, session.session_id)] = session
+            while len(self._sessions) > self.max_sessions:
+                oldest = min(self._sessions, key=lambda k: self._sessions[k].last_used)
+                del self._sessions[oldest]
+        return session
+
+    def drop(self, slug: str, session_id: str):
+        with self._lock:
+            self._sessions.pop((slug, session_id), None)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            self._expire()
+            return [s.snapshot() for s in self._sessions.values()]
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for key in [k for k, s in self._sessions.items() if s.last_used < cutoff]:
+            del self._sessions[key]
+
+
+_store: ChatSessionStore | None = None
+
+
+def get_chat_sessions() -> ChatSessionStore:
+    """Return the process-wide chat session store."""
+    global _store
+    if _store is None:
+        _store = ChatSessionStore(config.CHAT_SESSION_TTL, config.CHAT_MAX_SESSIONS)
+    return _store
@@ -16,7 +16,8 @@ from typing import Any, TypeVar
 from pydantic import BaseModel
 
 import config
-from pipeline.llm import LLMError, get_model_pricing, record_external_usage
+from pipeline.cancellation import CancelToken, on_cancel
+from pipeline.llm import LLMCancelled, LLMError, get_model_pricing, record_external_usage
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +98,7 @@ async def _run_query_async(
     max_turns: int,
     max_thinking_tokens: int,
     max_budget_usd: float | None,
+    cancel_token: CancelToken | None = None,
 ) -> T:
     try:
         from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
@@ -147,9 +149,18 @@ async def _run_query_async(
                 event_count,
             )
 
+    if cancel_token is not None and cancel_token.cancelled:
+        raise LLMCancelled("Claude Agent SDK: cancelled before start", provider="anthropic", model=model)
+
+    # Abort arrives on another thread: cancel this task on its own loop so the
+    # SDK client context exits and tears down the agent subprocess.
+    loop = asyncio.get_running_loop()
+    query_task = asyncio.current_task()
+    unregister = on_cancel(cancel_token, lambda: loop.call_soon_threadsafe(query_task.cancel))
+
     heartbeat_task = asyncio.create_task(_heartbeat())
-    async with ClaudeSDKClient(options=options) as client:
-        try:
+    try:
+        async with ClaudeSDKClient(options=options) as client:
             await client.query(user_prompt)
             async for message in client.receive_response():
                 event_count += 1
@@ -169,10 +180,19 @@ async def _run_query_async(
                 if message.__class__.__name__ == "ResultMessage":
                     result_message = message
                     break
-        finally:
-            heartbeat_task.cancel()
-            with suppress(asyncio.CancelledError):
-                await heartbeat_task
+    except asyncio.CancelledError as exc:
+        if cancel_token is not None and cancel_token.cancelled:
+            raise LLMCancelled(
+                f"Claude Agent SDK: cancelled after {int(time.time() - started_at)}s",
+                provider="anthropic",
+                model=model,
+            ) from exc
+        raise
+    finally:
+        unregister()
+        heartbeat_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await heartbeat_task
 
     if result_message is None:
         raise LLMError(
@@ -255,6 +275,7 @@ def call_claude_agent_structured(
     max_turns: int = config.CREATIVE_SCOUT_MAX_TURNS,
     max_thinking_tokens: int = config.CREATIVE_SCOUT_MAX_THINKING_TOKENS,
     max_budget_usd: float | None = None,
+    cancel_token: CancelToken | None = None,
 ) -> T:
     """Run Claude Agent SDK and parse output into a typed Pydantic model."""
     coro = _run_query_async(
@@ -265,6 +286,7 @@ def call_claude_agent_structured(
         max_turns=max_turns,
         max_thinking_tokens=max_thinking_tokens,
         max_budget_usd=max_budget_usd,
+        cancel_token=cancel_token,
     )
 
     try:
@@ -0,0 +1,232 @@
+"""Adaptive concurrency control for parallel LLM fan-out.
+
+The parallel Copywriter (Agent 04) used to run behind a fixed
+asyncio.Semaphore(4). That is too conservative for a healthy provider tier
+and too aggressive during a provider brownout, so jobs now acquire slots
+from an AIMD (additive-increase / multiplicative-decrease) limiter:
+
+  - Every healthy completion raises the limit by 1/limit, i.e. roughly +1
+    per "window" of ``limit`` successful jobs.
+  - A 429, 5xx or timeout halves the limit.
+  - A time-to-first-token well above the running baseline is treated as
+    early congestion and trims the limit by 25%.
+
+Decreases are rate-limited to one per cooldown window so a burst of
+failures from the same overload only backs off once.
+
+Limiters are shared per provider/model/API key (see get_limiter), so what one run
+learns about a provider carries over to the next run and to rewrites of
+failed jobs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any
+
+import config
+from pipeline.llm import classify_llm_error
+
+logger = logging.getLogger(__name__)
+
+# Error buckets (see pipeline.llm.classify_llm_error) that mean "slow down".
+_OVERLOAD_ERRORS = frozenset({"rate_limit", "server", "timeout"})
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter for asyncio fan-out.
+
+    Usage:
+        await limiter.acquire()
+        try:
+            ...
+        finally:
+            limiter.release(latency=..., ttft=..., error=exc_or_none)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 12,
+        decrease_factor: float = 0.5,
+        ttft_tolerance: float = 2.0,
+        cooldown_seconds: float = 5.0,
+        history_size: int = 50,
+    ):
+        self.name = name
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self._limit = float(min(max(int(initial), self.min_limit), self.max_limit))
+        self.decrease_factor = decrease_factor
+        self.ttft_tolerance = ttft_tolerance
+        self.cooldown_seconds = cooldown_seconds
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.overloads = 0
+        self.errors = 0
+        self._ttft_baseline: float | None = None
+        self._latency_ewma: float | None = None
+        self._last_decrease = 0.0
+        self._cond: asyncio.Condition | None = None
+        self.history: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._record("init")
+
+    # -- public API --------------------------------------------------------
+
+    @property
+    def limit(self) -> int:
+        """Current integer concurrency limit."""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def latency(self) -> float | None:
+        """Smoothed latency (seconds) of recent successful jobs, if any."""
+        return self._latency_ewma
+
+    async def acquire(self):
+        """Wait until a slot is free under the current limit."""
+        cond = self._condition()
+        async with cond:
+            self.waiting += 1
+            try:
+                await cond.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    def release(
+        self,
+        *,
+        latency: float | None = None,
+        ttft: float | None = None,
+        error: BaseException | None = None,
+        aborted: bool = False,
+    ):
+        """Free a slot and feed the outcome of the job into the controller.
+
+        ``aborted`` jobs (user abort / cancellation) only free the slot: how
+        far they got says nothing about provider load.
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+        before = self.limit
+
+        if aborted:
+            pass
+        elif error is not None:
+            kind = classify_llm_error(error)
+            if kind in _OVERLOAD_ERRORS:
+                self.overloads += 1
+                self._decrease(self.decrease_factor, kind)
+            else:
+                # Bad requests / schema failures say nothing about provider load.
+                self.errors += 1
+        else:
+            self.successes += 1
+            if latency is not None:
+                self._latency_ewma = (
+                    latency if self._latency_ewma is None
+                    else 0.8 * self._latency_ewma + 0.2 * latency
+                )
+            if ttft is not None and self._ttft_baseline is not None and ttft > self._ttft_baseline * self.ttft_tolerance:
+                self._decrease(0.75, f"ttft {ttft:.1f}s > {self.ttft_tolerance:.1f}x baseline {self._ttft_baseline:.1f}s")
+            else:
+                if ttft is not None:
+                    self._ttft_baseline = (
+                        ttft if self._ttft_baseline is None
+                        else 0.8 * self._ttft_baseline + 0.2 * ttft
+                    )
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+                if self.limit != before:
+                    self._record("increase")
+
+        self._notify()
+
+    def snapshot(self, history: int = 10) -> dict[str, Any]:
+        """JSON-serialisable view of the limiter for progress broadcasts."""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "min": self.min_limit,
+            "max": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "errors": self.errors,
+            "ttft_baseline": round(self._ttft_baseline, 2) if self._ttft_baseline is not None else None,
+            "latency_ewma": round(self._latency_ewma, 1) if self._latency_ewma is not None else None,
+            "history": list(self.history)[-history:],
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter can be built before the event loop runs.
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _notify(self):
+        cond = self._cond
+        if cond is None:
+            return
+
+        async def _wake():
+            async with cond:
+                cond.notify_all()
+
+        try:
+            asyncio.get_running_loop().create_task(_wake())
+        except RuntimeError:
+            pass  # no running loop — nobody can be waiting
+
+    def _decrease(self, factor: float, reason: str):
+        now = time.time()
+        cooldown = max(self.cooldown_seconds, self._latency_ewma or 0.0)
+        if now - self._last_decrease < cooldown:
+            return
+        before = self.limit
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._last_decrease = now
+        if self.limit != before:
+            self._record(f"decrease: {reason}")
+            logger.warning(
+                "Concurrency [%s]: %s — limit %d → %d",
+                self.name, reason, before, self.limit,
+            )
+
+    def _record(self, reason: str):
+        self.history.append({
+            "time": round(time.time(), 1),
+            "limit": self.limit,
+            "reason": reason,
+        })
+
+
+# ---------------------------------------------------------------------------
+# Shared limiters (one per provider/model)
+# ---------------------------------------------------------------------------
+
+_limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_limiter(provider: str, model: str, key_id: str = "") -> AdaptiveConcurrencyLimiter:
+    """Return the shared copywriter limiter for a provider/model (and API key)."""
+    key = f"{provider}/{model}" + (f"#{key_id}" if key_id else "")
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = AdaptiveConcurrencyLimiter(
+            name=key,
+            initial=config.COPYWRITER_PARALLEL_INITIAL,
+            min_limit=config.COPYWRITER_PARALLEL_MIN,
+            max_limit=config.COPYWRITER_PARALLEL_MAX,
+        )
+        _limiters[key] = limiter
+    return limiter
@@ -0,0 +1,150 @@
+"""Named, bounded thread pools for the server's non-LLM blocking work.
+
+LLM calls (agent runs, copywriter jobs, reruns, chat turns, deep-research
+polls) go through the priority scheduler (pipeline/scheduler.py), which
+owns its own pool. Everything else used to land in asyncio's default
+executor, min(32, cpu + 4) threads shared with whatever else called
+``run_in_executor(None, ...)``. A pool per workload class keeps them apart:
+
+  - ``io``:  short disk and SQLite I/O, and the scraper's page fetch.
+  - ``cpu``: parsing/validating large JSON documents, HTML cleanup.
+
+Both are MeteredExecutors: ThreadPoolExecutors that count submitted /
+running / queued work and record queue wait and run times, so
+``snapshot()`` shows whether a class is saturated. The server installs the
+``io`` pool as the event loop's default executor, so any remaining
+``asyncio.to_thread`` call is bounded and metered too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import config
+
+IO = "io"
+CPU = "cpu"
+
+
+class MeteredExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that records queue depth, wait and run times."""
+
+    def __init__(self, name: str, workers: int, history_size: int = 200):
+        self.name = name
+        self.workers = max(1, int(workers))
+        super().__init__(max_workers=self.workers, thread_name_prefix=name)
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self._waits: deque[float] = deque(maxlen=history_size)
+        self._runs: deque[float] = deque(maxlen=history_size)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        enqueued = time.perf_counter()
+        with self._stats_lock:
+            self.submitted += 1
+        return super().submit(self._timed, enqueued, fn, *args, **kwargs)
+
+    def _timed(self, enqueued: float, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.running += 1
+            self._waits.append(started - enqueued)
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+                self._runs.append(time.perf_counter() - started)
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serialisable queue depth / timing view (times in ms)."""
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            runs = sorted(self._runs)
+            done = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": max(0, self.submitted - done - self.running),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_ms_p50": _percentile_ms(waits, 0.5),
+                "wait_ms_p95": _percentile_ms(waits, 0.95),
+                "wait_ms_max": _percentile_ms(waits, 1.0),
+                "run_ms_p50": _percentile_ms(runs, 0.5),
+                "run_ms_p95": _percentile_ms(runs, 0.95),
+            }
+
+
+def _percentile_ms(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 1)
+
+
+# ---------------------------------------------------------------------------
+# Shared pools
+# ---------------------------------------------------------------------------
+
+_executors: dict[str, MeteredExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_executor(name: str) -> MeteredExecutor:
+    """Return the process-wide pool for ``name`` ("io" or "cpu"), created on first use."""
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            sizes = {IO: config.IO_EXECUTOR_WORKERS, CPU: config.CPU_EXECUTOR_WORKERS}
+            if name not in sizes:
+                raise ValueError(f"Unknown executor: {name}")
+            executor = _executors[name] = MeteredExecutor(name, sizes[name])
+        return executor
+
+
+async def _run_in(name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Like asyncio.to_thread: the function sees the caller's contextvars.
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(name), call)
+
+
+async def run_io(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a short blocking disk/SQLite call on the ``io`` pool."""
+    return await _run_in(IO, fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-heavy parsing/validation on the ``cpu`` pool."""
+    return await _run_in(CPU, fn, *args, **kwargs)
+
+
+def executors_snapshot() -> dict[str, Any]:
+    with _lock:
+        return {name: executor.snapshot() for name, executor in _executors.items()}
+
+
+def shutdown_executors():
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+"""Persisted background jobs (agent reruns) with WebSocket progress.
+
+/api/rerun used to hold the HTTP request open for the whole agent run, which
+takes minutes for Agent 1A or 02, and proxies timed it out. Now
+``submit()`` writes the job to SQLite and returns at once; the caller gets a
+job id. Jobs:
+
+  - run as asyncio tasks, at most ``max_concurrent`` at a time. Their LLM
+    work still goes through the shared priority scheduler, so reruns for
+    different agents or brands run side by side under the global limits;
+  - report every state change through ``notify`` (WebSocket ``job_update``
+    events) and can be polled via ``GET /api/jobs/{id}``;
+  - survive restarts: on ``start()`` jobs left running by the previous
+    process are re-queued and everything queued is picked up again.
+
+Handlers are registered per job kind: ``async handler(job, progress) ->
+result dict``. ``await progress(text)`` records and broadcasts a status
+line. SQLite reads and writes run on the IO executor, off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+import time
+from typing import Any, Awaitable, Callable
+
+from pipeline import storage
+from pipeline.executors import run_io
+
+logger = logging.getLogger(__name__)
+
+ProgressFn = Callable[[str], Awaitable[None]]
+JobHandler = Callable[[dict, ProgressFn], Awaitable[dict]]
+
+
+class JobRunner:
+    """Runs persisted jobs through registered handlers."""
+
+    def __init__(self, notify: Callable[[dict], Any], max_concurrent: int = 4):
+        self.notify = notify
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._handlers: dict[str, JobHandler] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    def start(self):
+        """Resume jobs from a previous process. Call once the event loop runs."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        requeued = storage.requeue_interrupted_jobs()
+        pending = storage.queued_jobs()
+        if pending:
+            logger.info("Resuming %d queued job(s) (%d interrupted by restart)", len(pending), requeued)
+        for job in pending:
+            self._spawn(job)
+
+    async def stop(self):
+        """Cancel in-flight jobs; they stay 'running' in SQLite and resume next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, kind: str, request: dict, brand_slug: str = "", agent_slug: str = "") -> dict:
+        """Persist a new job and schedule it. Returns the queued job."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        job = await run_io(storage.create_job, secrets.token_hex(8), kind, request, brand_slug, agent_slug)
+        self._publish(job)
+        self._spawn(job)
+        return job
+
+    def running(self) -> list[str]:
+        return list(self._tasks)
+
+    # -- internals ---------------------------------------------------------
+
+    def _spawn(self, job: dict):
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job["id"]] = task
+        task.add_done_callback(lambda _t, job_id=job["id"]: self._tasks.pop(job_id, None))
+
+    def _publish(self, job: dict):
+        try:
+            self.notify(job)
+        except Exception:
+            logger.exception("Job notification failed for %s", job.get("id"))
+
+    async def _run(self, job: dict):
+        assert self._semaphore is not None, "JobRunner.start() was not called"
+        job_id = job["id"]
+        async with self._semaphore:
+            handler = self._handlers.get(job["kind"])
+            started = time.time()
+            await run_io(storage.start_job, job_id)
+            self._publish(await run_io(storage.get_job, job_id))
+
+            async def progress(text: str):
+                await run_io(storage.update_job_progress, job_id, text)
+                self._publish(await run_io(storage.get_job, job_id))
+
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job kind: {job['kind']}")
+                result = await handler(await run_io(storage.get_job, job_id), progress)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job_id, job["kind"])
+                await run_io(storage.finish_job, job_id, "failed", time.time() - started, error=str(e))
+            else:
+                await run_io(storage.finish_job, job_id, "completed", time.time() - started, result=result)
+            self._publish(await run_io(storage.get_job, job_id))
@@ -0,0 +1,124 @@
+"""Minimal RFC 6902 JSON Patch (with RFC 6901 JSON Pointers).
+
+Chat edits come back from the model as a list of patch operations instead of
+the whole modified document. ``apply_patch()`` applies them to a copy of the
+document and raises JSONPatchError on anything malformed, so a bad patch
+never half-applies.
+
+Supported ops: add, remove, replace, move, copy, test.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+_OPS = frozenset({"add", "remove", "replace", "move", "copy", "test"})
+
+
+class JSONPatchError(ValueError):
+    """A patch operation is malformed or doesn't fit the document."""
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split a JSON Pointer ("/a/0/b~1c") into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JSONPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _index(container: list, token: str, *, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise JSONPatchError(f"Invalid array index: {token!r}")
+    idx = int(token)
+    if idx > len(container) or (idx == len(container) and not allow_end):
+        raise JSONPatchError(f"Array index out of range: {idx}")
+    return idx
+
+
+def _resolve(doc: Any, tokens: list[str]) -> Any:
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token, allow_end=False)]
+        else:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _parent(doc: Any, tokens: list[str]) -> tuple[Any, str]:
+    if not tokens:
+        raise JSONPatchError("Operation on the document root is not supported")
+    return _resolve(doc, tokens[:-1]), tokens[-1]
+
+
+def _add(doc: Any, tokens: list[str], value: Any):
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, key, allow_end=True), value)
+    else:
+        raise JSONPatchError(f"Cannot add to a scalar at /{'/'.join(tokens[:-1])}")
+
+
+def _remove(doc: Any, tokens: list[str]) -> Any:
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, key, allow_end=False))
+    raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _replace(doc: Any, tokens: list[str], value: Any):
+    parent, key = _parent(doc, tokens)
+    if isinstance(parent, dict) and key in parent:
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent[_index(parent, key, allow_end=False)] = value
+    else:
+        raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def apply_patch(doc: Any, patch: list[dict[str, Any]]) -> Any:
+    """Return a patched deep copy of ``doc``; ``doc`` itself is never modified."""
+    if not isinstance(patch, list):
+        raise JSONPatchError("A patch must be a JSON array of operations")
+    result = copy.deepcopy(doc)
+    for i, op in enumerate(patch):
+        if not isinstance(op, dict) or op.get("op") not in _OPS or "path" not in op:
+            raise JSONPatchError(f"Operation {i} is malformed: {op!r}")
+        kind = op["op"]
+        tokens = parse_pointer(op["path"])
+        if kind in ("add", "replace", "test") and "value" not in op:
+            raise JSONPatchError(f"Operation {i} ({kind}) is missing 'value'")
+        if kind in ("move", "copy") and "from" not in op:
+            raise JSONPatchError(f"Operation {i} ({kind}) is missing 'from'")
+
+        if kind == "add":
+            _add(result, tokens, copy.deepcopy(op["value"]))
+        elif kind == "remove":
+            _remove(result, tokens)
+        elif kind == "replace":
+            _replace(result, tokens, copy.deepcopy(op["value"]))
+        elif kind == "move":
+            source = parse_pointer(op["from"])
+            if tokens[:len(source)] == source and tokens != source:
+                raise JSONPatchError(f"Operation {i} moves a value into itself")
+            _add(result, tokens, _remove(result, source))
+        elif kind == "copy":
+            _add(result, tokens, copy.deepcopy(_resolve(result, parse_pointer(op["from"]))))
+        elif _resolve(result, tokens) != op["value"]:
+            raise JSONPatchError(f"Test failed at {op['path']}")
+    return result
@@ -15,12 +15,14 @@ Error handling:
 
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
 import threading
 import time as _time
 import os
-from typing import Any, TypeVar
+from contextlib import contextmanager
+from typing import Any, Callable, TypeVar
 
 from pydantic import BaseModel
 from tenacity import (
@@ -31,19 +33,49 @@ from tenacity import (
 )
 
 import config
+from pipeline.cancellation import CancelToken, on_cancel
+from pipeline.progress import stream_progress
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Streaming progress callback — set by server to broadcast to frontend
+# Per-thread stream timing — read by the adaptive concurrency controller
 # ---------------------------------------------------------------------------
-_stream_progress_callback = None
+_stream_stats = threading.local()
 
 
-def set_stream_progress_callback(cb):
-    """Set a callback(message: str) that's called during LLM streaming."""
-    global _stream_progress_callback
-    _stream_progress_callback = cb
+def _record_stream_stats(provider: str, model: str, started: float, first_token_at: float | None):
+    """Remember time-to-first-token and total duration of a finished stream."""
+    now = _time.time()
+    samples = getattr(_stream_stats, "samples", None)
+    if samples is None:
+        samples = _stream_stats.samples = []
+    samples.append({
+        "provider": provider,
+        "model": model,
+        "ttft": round(first_token_at - started, 3) if first_token_at else None,
+        "elapsed": round(now - started, 3),
+    })
+
+
+def reset_stream_stats():
+    """Clear stream timing samples collected on the calling thread."""
+    _stream_stats.samples = []
+
+
+def collect_stream_stats() -> list[dict[str, Any]]:
+    """Return (and clear) stream timing samples collected on the calling thread."""
+    samples = getattr(_stream_stats, "samples", None) or []
+    _stream_stats.samples = []
+    return samples
+
+
+def add_stream_stats(samples: list[dict[str, Any]]):
+    """Add samples collected elsewhere (e.g. an agent worker process) to this thread's."""
+    if samples:
+        if getattr(_stream_stats, "samples", None) is None:
+            _stream_stats.samples = []
+        _stream_stats.samples.extend(samples)
 
 
 # ---------------------------------------------------------------------------
@@ -87,6 +119,35 @@ _FALLBACK_PRICING = (2.50, 10.00)
 _usage_lock = threading.Lock()
 _usage_log: list[dict[str, Any]] = []
 
+# Per-run usage log (see begin_usage_scope). None = the process-wide log.
+_usage_scope: contextvars.ContextVar[list[dict[str, Any]] | None] = contextvars.ContextVar(
+    "llm_usage_scope", default=None,
+)
+
+
+def begin_usage_scope(scope: list[dict[str, Any]] | None = None) -> list[dict[str, Any]]:
+    """Give the current context (e.g. one pipeline run) its own usage log.
+
+    Usage recorded in this context — including worker threads that copy it —
+    goes to the scoped log, and reset/get_usage_* operate on it, so
+    concurrent runs keep separate cost totals. Pass an existing scope to
+    re-enter it from another task (e.g. an API handler acting on a run).
+    """
+    if scope is None:
+        scope = []
+    _usage_scope.set(scope)
+    return scope
+
+
+def _current_usage_log() -> list[dict[str, Any]]:
+    scope = _usage_scope.get()
+    return _usage_log if scope is None else scope
+
+
+def _append_usage(entry: dict[str, Any]):
+    with _usage_lock:
+        _current_usage_log().append(entry)
+
 
 def _get_pricing(model: str) -> tuple[float, float]:
     """Find pricing for a model by longest-prefix match."""
@@ -112,8 +173,10 @@ def _record_usage(provider: str, model: str, input_tokens: int, output_tokens: i
         "cost": cost,
         "timestamp": _time.time(),
     }
-    with _usage_lock:
-        _usage_log.append(entry)
+    key_id = active_key_id(provider)
+    if key_id:
+        entry["key_id"] = key_id
+    _append_usage(entry)
     logger.info(
         "Token usage: %s/%s — in=%d out=%d cost=$%.4f",
         provider, model, input_tokens, output_tokens, cost,
@@ -151,9 +214,11 @@ def record_external_usage(
     }
     if metadata:
         entry["metadata"] = metadata
+    key_id = active_key_id(provider)
+    if key_id:
+        entry["key_id"] = key_id
 
-    with _usage_lock:
-        _usage_log.append(entry)
+    _append_usage(entry)
 
     logger.info(
         "External usage: %s/%s — in=%d out=%d cost=$%.4f metadata=%s",
@@ -169,29 +234,48 @@ def record_external_usage(
 def reset_usage():
     """Clear all accumulated usage data (call at pipeline start)."""
     with _usage_lock:
-        _usage_log.clear()
+        _current_usage_log().clear()
+
+
+def merge_usage(entries: list[dict[str, Any]]):
+    """Append usage recorded elsewhere (e.g. an agent worker process) to the current log."""
+    with _usage_lock:
+        _current_usage_log().extend(entries)
 
 
 def get_usage_log() -> list[dict[str, Any]]:
     """Return a copy of the full usage log."""
     with _usage_lock:
-        return list(_usage_log)
+        return list(_current_usage_log())
 
 
 def get_usage_summary() -> dict[str, Any]:
     """Return aggregated cost and token totals."""
     with _usage_lock:
-        entries = list(_usage_log)
+        entries = list(_current_usage_log())
     total_input = sum(e["input_tokens"] for e in entries)
     total_output = sum(e["output_tokens"] for e in entries)
     total_cost = sum(e["cost"] for e in entries)
-    return {
+    summary = {
         "total_input_tokens": total_input,
         "total_output_tokens": total_output,
         "total_tokens": total_input + total_output,
         "total_cost": round(total_cost, 4),
         "calls": len(entries),
     }
+    # Per-key attribution for calls made through a provider pool member.
+    by_key: dict[str, dict[str, Any]] = {}
+    for e in entries:
+        key_id = e.get("key_id")
+        if not key_id:
+            continue
+        bucket = by_key.setdefault(key_id, {"provider": e["provider"], "calls": 0, "tokens": 0, "cost": 0.0})
+        bucket["calls"] += 1
+        bucket["tokens"] += e["input_tokens"] + e["output_tokens"]
+        bucket["cost"] = round(bucket["cost"] + e["cost"], 4)
+    if by_key:
+        summary["by_key"] = by_key
+    return summary
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -210,6 +294,19 @@ class LLMError(Exception):
         super().__init__(message)
 
 
+class LLMCancelled(LLMError):
+    """The call was cancelled (pipeline abort) — never retried."""
+
+
+def _raise_if_cancelled(cancel_token: CancelToken | None, provider: str, model: str):
+    if cancel_token is not None and cancel_token.cancelled:
+        raise LLMCancelled(
+            f"[{provider}/{model}] Cancelled: {cancel_token.reason or 'aborted'}",
+            provider=provider,
+            model=model,
+        )
+
+
 def _is_retryable(exc: BaseException) -> bool:
     """Return True if the error is transient and worth retrying.
 
@@ -257,6 +354,42 @@ def _is_retryable(exc: BaseException) -> bool:
     return False
 
 
+def classify_llm_error(exc: BaseException) -> str:
+    """Bucket an LLM failure for load control.
+
+    Returns "rate_limit" (429), "server" (5xx / overloaded), "timeout"
+    (connection or timeout errors) or "other" (bad request, auth, schema).
+    LLMError wrappers are unwrapped via their ``cause``.
+    """
+    seen = 0
+    while isinstance(exc, LLMError) and exc.cause is not None and seen < 5:
+        exc = exc.cause
+        seen += 1
+
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return "rate_limit"
+    if isinstance(status, int) and status >= 500:
+        return "server"
+
+    name = type(exc).__name__
+    if name == "RateLimitError":
+        return "rate_limit"
+    if name in ("InternalServerError", "ServiceUnavailableError", "OverloadedError"):
+        return "server"
+    if name in ("APIConnectionError", "APITimeoutError") or isinstance(exc, (ConnectionError, TimeoutError)):
+        return "timeout"
+
+    msg = str(exc)
+    if "429" in msg or "RESOURCE_EXHAUSTED" in msg:
+        return "rate_limit"
+    if any(code in msg for code in ("500", "502", "503", "529", "UNAVAILABLE", "overloaded")):
+        return "server"
+    return "other"
+
+
 def _extract_error_message(exc: Exception, provider: str, model: str) -> str:
     """Pull out a clean, human-readable error message from an API exception."""
 
@@ -312,6 +445,55 @@ _openai_client = None
 _anthropic_client = None
 _google_client = None
 
+# Per-key clients for provider pool members: {(provider, key_id): client}
+_keyed_clients: dict[tuple[str, str], Any] = {}
+_keyed_clients_lock = threading.Lock()
+
+# (provider, key_id, api_key) selected for calls in the current context.
+_active_api_key: contextvars.ContextVar[tuple[str, str, str] | None] = contextvars.ContextVar(
+    "llm_active_api_key", default=None,
+)
+
+
+@contextmanager
+def use_api_key(provider: str, key_id: str, api_key: str):
+    """Route ``provider`` calls in this context through a specific API key.
+
+    Used by provider pool members (see pipeline.provider_pool). Usage entries
+    recorded inside the block are tagged with ``key_id``.
+    """
+    token = _active_api_key.set((provider, key_id, api_key))
+    try:
+        yield
+    finally:
+        _active_api_key.reset(token)
+
+
+def active_api_key() -> tuple[str, str, str] | None:
+    """(provider, key_id, api_key) set by ``use_api_key`` in this context, if any."""
+    return _active_api_key.get()
+
+
+def active_key_id(provider: str) -> str:
+    """key_id of the pool key active for ``provider`` in this context, or ""."""
+    active = _active_api_key.get()
+    if active is None or active[0] != provider:
+        return ""
+    return active[1]
+
+
+def _keyed_client(provider: str, factory):
+    """Return the cached client for the active pool key, or None if no key is active."""
+    active = _active_api_key.get()
+    if active is None or active[0] != provider or not active[2]:
+        return None
+    _, key_id, api_key = active
+    with _keyed_clients_lock:
+        client = _keyed_clients.get((provider, key_id))
+        if client is None:
+            client = _keyed_clients[(provider, key_id)] = factory(api_key)
+    return client
+
 
 # Gemini models that require non-zero thinking budget.
 _GOOGLE_THINKING_REQUIRED_PREFIXES = (
@@ -323,42 +505,63 @@ _GOOGLE_THINKING_REQUIRED_PREFIXES = (
 _GOOGLE_DEFAULT_THINKING_BUDGET = int(os.getenv("GOOGLE_THINKING_BUDGET", "2048"))
 
 
+def _new_openai(api_key: str):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def _new_anthropic(api_key: str):
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def _new_google(api_key: str):
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
 def _get_openai():
     global _openai_client
+    keyed = _keyed_client("openai", _new_openai)
+    if keyed is not None:
+        return keyed
     if _openai_client is None:
         if not config.OPENAI_API_KEY:
             raise LLMError(
                 "OPENAI_API_KEY is not set. Add it to your .env file.",
                 provider="openai",
             )
-        from openai import OpenAI
-        _openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+        _openai_client = _new_openai(config.OPENAI_API_KEY)
     return _openai_client
 
 
 def _get_anthropic():
     global _anthropic_client
+    keyed = _keyed_client("anthropic", _new_anthropic)
+    if keyed is not None:
+        return keyed
     if _anthropic_client is None:
         if not config.ANTHROPIC_API_KEY:
             raise LLMError(
                 "ANTHROPIC_API_KEY is not set. Add it to your .env file.",
                 provider="anthropic",
             )
-        import anthropic
-        _anthropic_client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+        _anthropic_client = _new_anthropic(config.ANTHROPIC_API_KEY)
     return _anthropic_client
 
 
 def _get_google():
     global _google_client
+    keyed = _keyed_client("google", _new_google)
+    if keyed is not None:
+        return keyed
     if _google_client is None:
         if not config.GOOGLE_API_KEY:
             raise LLMError(
                 "GOOGLE_API_KEY is not set. Add it to your .env file.",
                 provider="google",
             )
-        from google import genai
-        _google_client = genai.Client(api_key=config.GOOGLE_API_KEY)
+        _google_client = _new_google(config.GOOGLE_API_KEY)
     return _google_client
 
 
@@ -386,6 +589,16 @@ _OPENAI_NEW_TOKEN_PARAM_PREFIXES = (
     "gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4",
 )
 
+# Models that accept Predicted Outputs (``prediction``) — most of a rewritten
+# document matching the prediction is emitted at prefill speed.
+_OPENAI_PREDICTION_PREFIXES = ("gpt-4o", "gpt-4.1")
+
+
+def supports_prediction(provider: str, model: str | None) -> bool:
+    """Whether ``call_llm(prediction=...)`` is passed through for this model."""
+    model = model or config.DEFAULT_MODEL
+    return provider == "openai" and any(model.startswith(p) for p in _OPENAI_PREDICTION_PREFIXES)
+
 
 def _call_openai(
     system_prompt: str,
@@ -394,6 +607,9 @@ def _call_openai(
     temperature: float,
     max_tokens: int,
     json_mode: bool = False,
+    cancel_token: CancelToken | None = None,
+    prediction: str | None = None,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     client = _get_openai()
 
@@ -417,34 +633,46 @@ def _call_openai(
     if json_mode:
         kwargs["response_format"] = {"type": "json_object"}
 
+    if prediction:
+        kwargs["prediction"] = {"type": "content", "content": prediction}
+
     # Use streaming so we can log progress
     import time as _time
     _stream_start = _time.time()
-    _last_progress = _stream_start
-    _chunk_count = 0
+    _progress = stream_progress("openai", model)
     _chunks = []
+    _first_token_at = None
 
+    _raise_if_cancelled(cancel_token, "openai", model)
     stream = client.chat.completions.create(**kwargs, stream=True, stream_options={"include_usage": True})
     _usage = None
-    for chunk in stream:
-        if chunk.usage:
-            _usage = chunk.usage
-        if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-            _chunks.append(chunk.choices[0].delta.content)
-            _chunk_count += 1
-            now = _time.time()
-            if now - _last_progress >= 15:
-                elapsed = round(now - _stream_start)
-                msg = f"Streaming... ~{_chunk_count} chunks, {elapsed}s elapsed"
-                logger.info("OpenAI [%s]: %s", model, msg)
-                if _stream_progress_callback:
-                    try:
-                        _stream_progress_callback(msg)
-                    except Exception:
-                        pass
-                _last_progress = now
+    # Closing the stream from the aborting thread interrupts a blocked read.
+    _unregister = on_cancel(cancel_token, stream.close)
+    try:
+        for chunk in stream:
+            _raise_if_cancelled(cancel_token, "openai", model)
+            if chunk.usage:
+                _usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                _chunks.append(chunk.choices[0].delta.content)
+                if on_delta is not None:
+                    on_delta(chunk.choices[0].delta.content)
+                if _first_token_at is None:
+                    _first_token_at = _time.time()
+                _progress.update(chunk.choices[0].delta.content)
+    except LLMCancelled:
+        stream.close()
+        raise
+    except Exception:
+        _raise_if_cancelled(cancel_token, "openai", model)
+        raise
+    finally:
+        _unregister()
+    _raise_if_cancelled(cancel_token, "openai", model)
 
     content = "".join(_chunks)
+    _progress.finish()
+    _record_stream_stats("openai", model, _stream_start, _first_token_at)
     elapsed_total = round(_time.time() - _stream_start, 1)
     logger.info(
         "OpenAI [%s]: stream complete — %d chars in %.1fs",
@@ -465,6 +693,9 @@ def _call_anthropic(
     temperature: float,
     max_tokens: int,
     json_mode: bool = False,
+    cancel_token: CancelToken | None = None,
+    cache_system: bool = False,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     client = _get_anthropic()
 
@@ -477,38 +708,50 @@ def _call_anthropic(
         )
 
     messages = [{"role": "user", "content": user_prompt}]
+    system: str | list[dict] = effective_system
+    if cache_system:
+        # Mark the (stable) system prompt as a cache breakpoint.
+        system = [{"type": "text", "text": effective_system, "cache_control": {"type": "ephemeral"}}]
 
     # Use streaming to avoid 10-minute timeout on long requests
     # (Anthropic requires streaming for operations > 10 min)
     import time as _time
     _stream_start = _time.time()
-    _last_progress = _stream_start
-    _token_count = 0
-
-    with client.messages.stream(
-        model=model,
-        max_tokens=max_tokens,
-        temperature=temperature,
-        system=effective_system,
-        messages=messages,
-    ) as stream:
-        for text in stream.text_stream:
-            _token_count += 1
-            now = _time.time()
-            # Log progress every 15 seconds so user knows it's alive
-            if now - _last_progress >= 15:
-                elapsed = round(now - _stream_start)
-                msg = f"Streaming... ~{_token_count} chunks, {elapsed}s elapsed"
-                logger.info("Anthropic [%s]: %s", model, msg)
-                if _stream_progress_callback:
-                    try:
-                        _stream_progress_callback(msg)
-                    except Exception:
-                        pass
-                _last_progress = now
-
-        response = stream.get_final_message()
+    _progress = stream_progress("anthropic", model)
+    _first_token_at = None
 
+    _raise_if_cancelled(cancel_token, "anthropic", model)
+    try:
+        with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system,
+            messages=messages,
+        ) as stream:
+            # Closing the stream from the aborting thread interrupts a blocked read.
+            _unregister = on_cancel(cancel_token, stream.close)
+            try:
+                for text in stream.text_stream:
+                    _raise_if_cancelled(cancel_token, "anthropic", model)
+                    if on_delta is not None:
+                        on_delta(text)
+                    if _first_token_at is None:
+                        _first_token_at = _time.time()
+                    _progress.update(text)
+
+                _raise_if_cancelled(cancel_token, "anthropic", model)
+                response = stream.get_final_message()
+            finally:
+                _unregister()
+    except LLMCancelled:
+        raise
+    except Exception:
+        _raise_if_cancelled(cancel_token, "anthropic", model)
+        raise
+
+    _progress.finish()
+    _record_stream_stats("anthropic", model, _stream_start, _first_token_at)
     elapsed_total = round(_time.time() - _stream_start, 1)
     content = response.content[0].text
 
@@ -535,6 +778,8 @@ def _call_google(
     temperature: float,
     max_tokens: int,
     json_mode: bool = False,
+    cancel_token: CancelToken | None = None,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     from google.genai import types
 
@@ -566,32 +811,33 @@ def _call_google(
         import time as _time
 
         stream_start = _time.time()
-        last_progress = stream_start
-        chunk_count = 0
+        progress = stream_progress("google", model)
         chunks: list[str] = []
         last_chunk = None
+        first_token_at = None
 
-        for last_chunk in client.models.generate_content_stream(
+        _raise_if_cancelled(cancel_token, "google", model)
+        stream = client.models.generate_content_stream(
             model=model,
             contents=user_prompt,
             config=cfg,
-        ):
+        )
+        for last_chunk in stream:
+            if cancel_token is not None and cancel_token.cancelled:
+                # Stop consuming and release the HTTP response.
+                stream.close()
+                _raise_if_cancelled(cancel_token, "google", model)
             if last_chunk.text:
                 chunks.append(last_chunk.text)
-                chunk_count += 1
-                now = _time.time()
-                if now - last_progress >= 15:
-                    elapsed = round(now - stream_start)
-                    msg = f"Streaming... ~{chunk_count} chunks, {elapsed}s elapsed"
-                    logger.info("Google [%s]: %s", model, msg)
-                    if _stream_progress_callback:
-                        try:
-                            _stream_progress_callback(msg)
-                        except Exception:
-                            pass
-                    last_progress = now
+                if on_delta is not None:
+                    on_delta(last_chunk.text)
+                if first_token_at is None:
+                    first_token_at = _time.time()
+                progress.update(last_chunk.text)
 
         content = "".join(chunks)
+        progress.finish()
+        _record_stream_stats("google", model, stream_start, first_token_at)
         elapsed_total = round(_time.time() - stream_start, 1)
         logger.info(
             "Google [%s]: stream complete — %d chars in %.1fs",
@@ -610,7 +856,10 @@ def _call_google(
 
     try:
         content, meta = _stream_once(gen_config)
+    except LLMCancelled:
+        raise
     except Exception as exc:
+        _raise_if_cancelled(cancel_token, "google", model)
         msg = str(exc)
         if needs_thinking and ("Budget 0 is invalid" in msg or "only works in thinking mode" in msg):
             retry_budget = _google_thinking_budget(model, max_tokens)
@@ -675,7 +924,7 @@ def call_deep_research(prompt: str, is_cancelled=None) -> str:
     base_url = "https://generativelanguage.googleapis.com/v1beta"
 
     if callable(is_cancelled) and is_cancelled():
-        raise LLMError(
+        raise LLMCancelled(
             "[google/deep-research] Cancelled before start",
             provider="google",
             model=DEEP_RESEARCH_AGENT,
@@ -722,14 +971,24 @@ def call_deep_research(prompt: str, is_cancelled=None) -> str:
     elapsed = 0
     while elapsed < DEEP_RESEARCH_MAX_WAIT:
         if callable(is_cancelled) and is_cancelled():
-            raise LLMError(
+            raise LLMCancelled(
                 "[google/deep-research] Cancelled by user",
                 provider="google",
                 model=DEEP_RESEARCH_AGENT,
             )
 
-        time.sleep(DEEP_RESEARCH_POLL_INTERVAL)
+        if isinstance(is_cancelled, CancelToken):
+            # Wake immediately on abort instead of sleeping out the interval.
+            is_cancelled.wait(DEEP_RESEARCH_POLL_INTERVAL)
+        else:
+            time.sleep(DEEP_RESEARCH_POLL_INTERVAL)
         elapsed += DEEP_RESEARCH_POLL_INTERVAL
+        if callable(is_cancelled) and is_cancelled():
+            raise LLMCancelled(
+                "[google/deep-research] Cancelled by user",
+                provider="google",
+                model=DEEP_RESEARCH_AGENT,
+            )
 
         try:
             poll_resp = req_lib.get(
@@ -804,6 +1063,7 @@ def call_claude_web_search(
     model: str = CLAUDE_WEB_SEARCH_MODEL,
     max_uses: int = CLAUDE_WEB_SEARCH_MAX_USES,
     max_tokens: int = CLAUDE_WEB_SEARCH_MAX_TOKENS,
+    cancel_token: CancelToken | None = None,
 ) -> str:
     """Run a Claude web-search-powered research task and return the text report.
 
@@ -841,6 +1101,7 @@ def call_claude_web_search(
 
     # Loop to handle pause_turn continuations
     for iteration in range(5):  # safety limit on continuations
+        _raise_if_cancelled(cancel_token, "anthropic", model)
         try:
             response = client.messages.create(
                 model=model,
@@ -900,15 +1161,14 @@ def call_claude_web_search(
     # Record search costs separately (~$0.01 per search)
     if search_count > 0:
         search_cost = search_count * 0.01  # $10 per 1000 searches
-        with _usage_lock:
-            _usage_log.append({
-                "provider": "anthropic",
-                "model": f"{model}/web_search",
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "cost": search_cost,
-                "timestamp": _t.time(),
-            })
+        _append_usage({
+            "provider": "anthropic",
+            "model": f"{model}/web_search",
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cost": search_cost,
+            "timestamp": _t.time(),
+        })
         logger.info(
             "Claude Web Search: %d searches × $0.01 = $%.2f search cost",
             search_count, search_cost,
@@ -949,11 +1209,27 @@ def call_llm(
     model: str | None = None,
     temperature: float = 0.7,
     max_tokens: int = 16_000,
+    cancel_token: CancelToken | None = None,
+    cache_system: bool = False,
+    prediction: str | None = None,
+    on_delta: Callable[[str], None] | None = None,
 ) -> str:
     """Call an LLM and return raw text. Provider-agnostic.
 
     Retries on transient errors (rate limits, server errors).
-    Raises LLMError immediately for bad requests or auth errors.
+    Raises LLMError immediately for bad requests or auth errors, and
+    LLMCancelled as soon as ``cancel_token`` is cancelled.
+
+    ``cache_system`` marks a system prompt that will be resent unchanged
+    (e.g. chat sessions) for Anthropic prompt caching; OpenAI and Gemini
+    cache stable prefixes automatically.
+
+    ``prediction`` is text the response is expected to mostly repeat (e.g.
+    the current document for a full rewrite). It is passed through where
+    ``supports_prediction()`` is true and ignored elsewhere.
+
+    ``on_delta`` is called (on the calling thread) with each text chunk as
+    the provider streams it. A retried call streams again from the start.
     """
     model = model or config.DEFAULT_MODEL
     call_fn = _PROVIDERS.get(provider)
@@ -966,7 +1242,17 @@ def call_llm(
 
     logger.info("LLM call: provider=%s, model=%s, temp=%.1f", provider, model, temperature)
     try:
-        return call_fn(system_prompt, user_prompt, model, temperature, max_tokens, json_mode=False)
+        extra: dict[str, Any] = {}
+        if cache_system and provider == "anthropic":
+            extra["cache_system"] = True
+        if prediction and supports_prediction(provider, model):
+            extra["prediction"] = prediction
+        if on_delta is not None:
+            extra["on_delta"] = on_delta
+        return call_fn(
+            system_prompt, user_prompt, model, temperature, max_tokens,
+            json_mode=False, cancel_token=cancel_token, **extra,
+        )
     except LLMError:
         raise
     except Exception as exc:
@@ -991,6 +1277,7 @@ def call_llm_structured(
     model: str | None = None,
     temperature: float = 0.7,
     max_tokens: int = 16_000,
+    cancel_token: CancelToken | None = None,
 ) -> T:
     """Call an LLM and parse into a Pydantic model. Provider-agnostic.
 
@@ -998,7 +1285,8 @@ def call_llm_structured(
     knows the exact structure required.
 
     Retries on transient errors (rate limits, server errors).
-    Raises LLMError immediately for bad requests or auth errors.
+    Raises LLMError immediately for bad requests or auth errors, and
+    LLMCancelled as soon as ``cancel_token`` is cancelled.
     """
     model = model or config.DEFAULT_MODEL
     call_fn = _PROVIDERS.get(provider)
@@ -1031,6 +1319,7 @@ def call_llm_structured(
             temperature,
             max_tokens,
             json_mode=True,
+            cancel_token=cancel_token,
         )
     except LLMError:
         raise
@@ -1085,6 +1374,7 @@ def call_llm_structured(
                     )
 
             # Final salvage attempt: ask the model to repair malformed JSON.
+            _raise_if_cancelled(cancel_token, provider, model)
             try:
                 logger.info("Attempting LLM JSON repair pass...")
                 parsed = _attempt_llm_json_repair(
@@ -1094,9 +1384,12 @@ def call_llm_structured(
                     response_model=response_model,
                     raw=raw,
                     max_tokens=max_tokens,
+                    cancel_token=cancel_token,
                 )
                 logger.info("LLM JSON repair pass succeeded!")
                 return parsed
+            except LLMCancelled:
+                raise
             except Exception as exc3:
                 logger.warning("LLM JSON repair pass failed: %s", exc3)
 
@@ -1117,6 +1410,7 @@ def _attempt_llm_json_repair(
     response_model: type[T],
     raw: str,
     max_tokens: int,
+    cancel_token: CancelToken | None = None,
 ) -> T:
     """Ask the model to repair malformed JSON into valid schema-conforming JSON."""
     if not raw or len(raw) < 20:
@@ -1150,6 +1444,7 @@ def _attempt_llm_json_repair(
         0.0,
         repair_max_tokens,
         json_mode=True,
+        cancel_token=cancel_token,
     )
 
     repaired_raw = repaired_raw.strip()
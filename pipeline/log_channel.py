@@ -0,0 +1,363 @@
+"""Event-driven server log channel.
+
+The old path put every formatted log line on a 1000-slot queue.Queue (lines
+were silently dropped when it was full), and a task woke every 0.5s to
+broadcast at most 30 of them.
+
+LogChannel is fed from any thread. Lines go into an unbounded inbox, and the
+first line of a burst wakes the event loop with ``call_soon_threadsafe``.
+On the loop, lines get a sequence number and are batched. A batch is
+flushed to the sink (the WebSocket hub) once it reaches ``max_batch`` lines
+or ``flush_interval`` seconds after its first line, whichever comes first.
+Lines reach the browser within milliseconds, and a noisy run costs one
+wakeup per burst rather than one per line.
+
+Every run gets a ring buffer of its last ``ring_size`` lines, numbered by a
+per-run sequence. The buffer is appended to ``<persist_dir>/run_<id>.jsonl``
+on each flush, so ``replay(run_id, since)`` can backfill a client that
+missed lines: it was dropped under backpressure, it reconnected, or the
+server restarted. Server-wide lines (logged outside any run) only go to an
+in-memory tail.
+
+The in-memory rings are authoritative; the event loop never touches the
+disk. Appends and compactions are handed to a single writer thread (so a
+run's writes stay ordered). A run that is not in memory (first line after a
+restart, or after eviction) is loaded from its file on that same thread, so
+the read sees every queued write and numbering continues from the real
+tail; its new lines wait until the load finishes. Runs that are loading or
+have unflushed lines are never evicted. Replaying a run that is no longer
+in memory reads its file on the IO executor without caching it, so replay
+requests can't evict live runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from pipeline.executors import run_io
+
+logger = logging.getLogger(__name__)
+
+# (run_id, brand_slug, branch_id) of the run that logged a line; () = server-wide.
+Topic = tuple
+
+
+class _RunLog:
+    """One run's ring buffer and its on-disk mirror."""
+
+    def __init__(self, run_id: int, ring_size: int, path: Path | None):
+        self.run_id = run_id
+        self.ring: deque[tuple[int, int, str]] = deque(maxlen=ring_size)
+        self.path = path
+        self.seq = 0
+        self.lines_on_disk = 0
+        # Set while the file is being read; lines fed meanwhile wait in ``held``.
+        self.loading: Future | None = None
+        self.held: list[tuple[int, Topic, str]] = []
+
+    def load(self, entries: list[tuple[int, int, str]]):
+        """Adopt the entries read from disk (called on the loop)."""
+        self.ring.extend(entries)
+        self.lines_on_disk = len(entries)
+        if self.ring:
+            self.seq = self.ring[-1][0]
+        self.loading = None
+
+    def plan_write(self, entries: list[tuple[int, int, str]]) -> tuple[Path, str, str] | None:
+        """(path, mode, payload) persisting ``entries``; compacts from the ring when large."""
+        if self.path is None or not entries:
+            return None
+        if self.lines_on_disk + len(entries) > 2 * self.ring.maxlen:
+            # Compact: rewrite the file from the ring (already holds entries).
+            self.lines_on_disk = len(self.ring)
+            return self.path, "w", "".join(_jsonl(e) for e in self.ring)
+        self.lines_on_disk += len(entries)
+        return self.path, "a", "".join(_jsonl(e) for e in entries)
+
+
+def _read_entries(path: Path) -> list[tuple[int, int, str]]:
+    entries: list[tuple[int, int, str]] = []
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            for raw in fh:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    continue
+                entries.append((int(entry["seq"]), int(entry.get("level", 20)), entry["line"]))
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.debug("Run log %s unreadable: %s", path, exc)
+    return entries
+
+
+def _write(path: Path, mode: str, payload: str):
+    try:
+        with path.open(mode, encoding="utf-8") as fh:
+            fh.write(payload)
+    except OSError as exc:
+        logger.debug("Run log %s not persisted: %s", path, exc)
+
+
+def _jsonl(entry: tuple[int, int, str]) -> str:
+    seq, level, line = entry
+    return json.dumps({"seq": seq, "level": level, "line": line}, ensure_ascii=False) + "\n"
+
+
+class LogChannel:
+    """Thread-safe log line feed with time/size-window flushing and replay."""
+
+    def __init__(
+        self,
+        sink: Callable[[dict], None],
+        *,
+        flush_interval: float = 0.05,
+        max_batch: int = 200,
+        ring_size: int = 2000,
+        tail_size: int = 500,
+        persist_dir: Path | None = None,
+        max_runs_in_memory: int = 20,
+    ):
+        self._sink = sink
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_batch = max(1, int(max_batch))
+        self.ring_size = max(1, int(ring_size))
+        self.persist_dir = persist_dir
+        self.max_runs_in_memory = max(1, int(max_runs_in_memory))
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._inbox: list[tuple[int, Topic, str]] = []
+        self._wakeup_pending = False
+
+        self._tail: deque[str] = deque(maxlen=tail_size)
+        self._server_seq = 0
+        self._runs: OrderedDict[int, _RunLog] = OrderedDict()
+        self._pending: list[tuple[Topic, int, int, str]] = []  # (topic, seq, level, line)
+        self._unflushed: set[int] = set()  # run ids with lines in _pending
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._writer: ThreadPoolExecutor | None = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None):
+        """Attach to the event loop; lines fed before this are delivered now."""
+        self._loop = loop or asyncio.get_running_loop()
+        if self.persist_dir is not None:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-log")
+        self._schedule_drain()
+
+    def stop(self):
+        """Flush everything, wait for pending writes and detach from the loop."""
+        self._loop = None
+        self._drain_inbox()
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+        for run_log in list(self._runs.values()):
+            if run_log.loading is not None:
+                self._loaded(run_log)
+        self._flush()
+
+    # -- feeding (any thread) ----------------------------------------------
+
+    def feed(self, levelno: int, topic: Topic, line: str):
+        with self._lock:
+            self._inbox.append((levelno, topic, line))
+            if self._wakeup_pending:
+                return
+        self._schedule_drain()
+
+    def _schedule_drain(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            if self._wakeup_pending or not self._inbox:
+                return
+            self._wakeup_pending = True
+        try:
+            loop.call_soon_threadsafe(self._drain_inbox)
+        except RuntimeError:  # loop closed during shutdown
+            with self._lock:
+                self._wakeup_pending = False
+
+    # -- event loop side ---------------------------------------------------
+
+    def _drain_inbox(self):
+        with self._lock:
+            inbox, self._inbox = self._inbox, []
+            self._wakeup_pending = False
+        for levelno, topic, line in inbox:
+            self._tail.append(line)
+            self._accept(levelno, topic, line)
+        self._schedule_flush()
+
+    def _accept(self, levelno: int, topic: Topic, line: str):
+        if topic:
+            run_log = self._run_log(topic[0])
+            if run_log.loading is not None:
+                run_log.held.append((levelno, topic, line))
+                return
+            run_log.seq += 1
+            seq = run_log.seq
+            run_log.ring.append((seq, levelno, line))
+            self._unflushed.add(run_log.run_id)
+        else:
+            self._server_seq += 1
+            seq = self._server_seq
+        self._pending.append((topic, seq, levelno, line))
+
+    def _loaded(self, run_log: _RunLog):
+        """Finish loading ``run_log`` and number the lines that waited for it."""
+        if run_log.loading is None:
+            return
+        try:
+            entries = run_log.loading.result()
+        except Exception:
+            logger.debug("Run log %s not loaded", run_log.path, exc_info=True)
+            entries = []
+        run_log.load(entries)
+        held, run_log.held = run_log.held, []
+        for levelno, topic, line in held:
+            self._accept(levelno, topic, line)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if len(self._pending) >= self.max_batch or self._loop is None:
+            self._flush()
+        elif self._pending and self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.flush_interval, self._flush)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        self._unflushed.clear()
+        if not pending:
+            return
+
+        groups: dict[Topic, dict[str, Any]] = {}
+        persisted: dict[int, list[tuple[int, int, str]]] = {}
+        for topic, seq, levelno, line in pending:
+            group = groups.get(topic)
+            if group is None:
+                group = {"type": "server_log", "lines": [], "levels": [], "first_log_seq": seq}
+                if topic:
+                    run_id, brand_slug, branch_id = topic
+                    group.update(run_id=run_id, brand_slug=brand_slug)
+                    if branch_id is not None:
+                        group["branch_id"] = branch_id
+                groups[topic] = group
+            group["lines"].append(line)
+            group["levels"].append(levelno)
+            group["log_seq"] = seq
+            if topic:
+                persisted.setdefault(topic[0], []).append((seq, levelno, line))
+
+        for run_id, entries in persisted.items():
+            write = self._run_log(run_id).plan_write(entries)
+            if write is None:
+                continue
+            if self._writer is not None:
+                self._writer.submit(_write, *write)
+            else:
+                _write(*write)
+        for group in groups.values():
+            try:
+                self._sink(group)
+            except Exception as exc:
+                logger.debug("Log sink failed: %s", exc)
+
+    def _run_log(self, run_id: int) -> _RunLog:
+        run_log = self._runs.get(run_id)
+        if run_log is None:
+            path = self.persist_dir / f"run_{run_id}.jsonl" if self.persist_dir is not None else None
+            run_log = _RunLog(run_id, self.ring_size, path)
+            if path is not None:
+                self._load(run_log)
+            self._runs[run_id] = run_log
+            self._evict()
+        else:
+            self._runs.move_to_end(run_id)
+        return run_log
+
+    def _load(self, run_log: _RunLog):
+        # Queued behind the run's pending writes, so the read sees all of them.
+        loop = self._loop
+        if self._writer is None:
+            run_log.load(_read_entries(run_log.path))
+            return
+        if loop is None:  # stopping: wait here
+            run_log.load(self._writer.submit(_read_entries, run_log.path).result())
+            return
+        run_log.loading = self._writer.submit(_read_entries, run_log.path)
+
+        def _done(_future: Future):
+            try:
+                loop.call_soon_threadsafe(self._loaded, run_log)
+            except RuntimeError:  # loop closed; stop() finishes the load
+                pass
+
+        run_log.loading.add_done_callback(_done)
+
+    def _evict(self):
+        excess = len(self._runs) - self.max_runs_in_memory
+        if excess <= 0:
+            return
+        # Oldest first; a run that is loading or has unflushed lines stays.
+        for run_id, run_log in list(self._runs.items()):
+            if excess <= 0:
+                break
+            if run_log.loading is None and run_id not in self._unflushed:
+                del self._runs[run_id]
+                excess -= 1
+
+    # -- reading -----------------------------------------------------------
+
+    def tail(self, n: int = 150) -> list[str]:
+        """Most recent ``n`` lines across all runs (for snapshots)."""
+        if n <= 0:
+            return []
+        return list(self._tail)[-n:]
+
+    async def replay(self, run_id: int, since: int = 0, limit: int = 1000) -> dict[str, Any]:
+        """Lines of ``run_id`` with seq > ``since`` (oldest first, at most ``limit``).
+
+        Runs not in memory are read from disk (off the loop) and not cached.
+        """
+        run_id = int(run_id)
+        run_log = self._runs.get(run_id)
+        if run_log is not None and run_log.loading is not None:
+            ring = (await asyncio.wrap_future(run_log.loading))[-self.ring_size:]
+            last_seq = ring[-1][0] if ring else 0
+        elif run_log is not None:
+            ring = list(run_log.ring)
+            last_seq = run_log.seq
+        else:
+            path = self.persist_dir / f"run_{run_id}.jsonl" if self.persist_dir is not None else None
+            ring = (await run_io(_read_entries, path))[-self.ring_size:] if path is not None else []
+            last_seq = ring[-1][0] if ring else 0
+        entries = [e for e in ring if e[0] > since]
+        truncated = bool(entries) and entries[0][0] > since + 1 and since < last_seq
+        entries = entries[:max(1, int(limit))]
+        return {
+            "run_id": run_id,
+            "last_seq": last_seq,
+            "truncated": truncated,  # older lines fell out of the ring buffer
+            "lines": [{"seq": s, "level": lvl, "line": line} for s, lvl, line in entries],
+        }
+
+    def clear_tail(self):
+        """Forget server-wide tail lines (run ring buffers are kept)."""
+        self._tail.clear()
@@ -0,0 +1,263 @@
+"""In-memory cache of agent output files and output-directory indexes.
+
+The dashboard endpoints used to stat and re-read ``{slug}_output.json`` from
+disk on every request. Listing brands did that for every brand × agent.
+
+OutputCache keeps:
+
+  - a per-directory index of which files exist, rebuilt with one scandir
+    when the directory's mtime changes (creates/deletes/renames), and
+  - parsed file contents keyed by path, reused while the file's
+    (mtime_ns, size) is unchanged.
+
+In-process writes and deletes go through the OutputStore
+(pipeline/output_store.py), which calls ``invalidate()`` directly. The
+cache therefore only revalidates against the filesystem every
+``revalidate_after`` seconds, which catches writes from other processes
+such as the CLI. A warm brand
+picker costs no filesystem calls at all.
+
+Async handlers use the ``a``-prefixed methods: fresh entries are answered
+on the loop, and anything that has to stat or read the disk runs on the
+IO executor (pipeline/executors.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from pipeline.executors import run_io
+
+
+@dataclass
+class FileInfo:
+    """Identity of one file version (drives ETag / Last-Modified)."""
+
+    mtime_ns: int
+    size: int
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.mtime_ns:x}-{self.size:x}"'
+
+
+@dataclass
+class _DirIndex:
+    mtime_ns: int
+    names: frozenset[str]
+    checked_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _FileEntry:
+    info: FileInfo
+    raw: bytes
+    checked_at: float = field(default_factory=time.monotonic)
+    _data: Any = field(default=None, repr=False)
+    _parsed: bool = field(default=False, repr=False)
+
+    @property
+    def data(self) -> Any:
+        """Parsed contents, decoded on first use (raw passthrough never parses)."""
+        if not self._parsed:
+            self._data = json.loads(self.raw)
+            self._parsed = True
+        return self._data
+
+
+class OutputCache:
+    """Thread-safe path+mtime keyed cache for output JSON files."""
+
+    def __init__(self, revalidate_after: float = 1.0, max_files: int = 512):
+        self.revalidate_after = max(0.0, float(revalidate_after))
+        self.max_files = max(1, int(max_files))
+        self._lock = threading.Lock()
+        self._dirs: dict[str, _DirIndex] = {}
+        self._files: dict[str, _FileEntry] = {}
+
+    # -- directory index ---------------------------------------------------
+
+    def listing(self, directory: Path) -> frozenset[str]:
+        """Names of the regular files in ``directory``."""
+        key = str(directory)
+        now = time.monotonic()
+        with self._lock:
+            index = self._dirs.get(key)
+            if index is not None and now - index.checked_at < self.revalidate_after:
+                return index.names
+        try:
+            dir_mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._dirs.pop(key, None)
+            return frozenset()
+        if index is not None and index.mtime_ns == dir_mtime:
+            index.checked_at = now
+            return index.names
+        try:
+            with os.scandir(key) as it:
+                names = frozenset(entry.name for entry in it if entry.is_file())
+        except OSError:
+            return frozenset()
+        with self._lock:
+            self._dirs[key] = _DirIndex(dir_mtime, names, now)
+        return names
+
+    def available(self, directory: Path, names: Iterable[str]) -> list[str]:
+        """Subset of ``names`` (in order) that exist in ``directory``."""
+        listing = self.listing(directory)
+        return [n for n in names if n in listing]
+
+    # -- file contents -----------------------------------------------------
+
+    def info(self, path: Path) -> FileInfo | None:
+        """Current FileInfo of ``path`` (None if missing).
+
+        Served from a fresh cached entry when there is one, else one stat —
+        the directory index alone can't see in-place rewrites.
+        """
+        entry = self._fresh(path)
+        if entry is not None:
+            return entry.info
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return FileInfo(st.st_mtime_ns, st.st_size)
+
+    def read_json(self, path: Path, *, shared: bool = False) -> Any | None:
+        """Parsed contents of ``path`` (None if missing).
+
+        ``shared=True`` returns the cached object itself: callers must treat
+        it as read-only (e.g. to serialise straight into a response).
+        Otherwise a fresh copy is parsed from the cached bytes.
+        """
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        return entry.data if shared else json.loads(entry.raw)
+
+    def read(self, path: Path) -> tuple[Any, FileInfo] | None:
+        """(shared parsed data, FileInfo) for ``path``, or None if missing."""
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        return entry.data, entry.info
+
+    def read_raw(self, path: Path) -> tuple[bytes, FileInfo] | None:
+        """(file bytes, FileInfo) for ``path`` without decoding, or None if missing."""
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        return entry.raw, entry.info
+
+    # -- async API (IO executor) ---------------------------------------------
+
+    async def alisting(self, directory: Path) -> frozenset[str]:
+        with self._lock:
+            index = self._dirs.get(str(directory))
+            if index is not None and time.monotonic() - index.checked_at < self.revalidate_after:
+                return index.names
+        return await run_io(self.listing, directory)
+
+    async def ainfo(self, path: Path) -> FileInfo | None:
+        entry = self._fresh(path)
+        return entry.info if entry is not None else await run_io(self.info, path)
+
+    async def aread_json(self, path: Path, *, shared: bool = False) -> Any | None:
+        entry = self._fresh(path)
+        if entry is None:
+            return await run_io(self.read_json, path, shared=shared)
+        return entry.data if shared else json.loads(entry.raw)
+
+    async def aread(self, path: Path) -> tuple[Any, FileInfo] | None:
+        entry = self._fresh(path)
+        if entry is None:
+            return await run_io(self.read, path)
+        return entry.data, entry.info
+
+    async def aread_raw(self, path: Path) -> tuple[bytes, FileInfo] | None:
+        entry = self._fresh(path)
+        if entry is None:
+            return await run_io(self.read_raw, path)
+        return entry.raw, entry.info
+
+    def invalidate(self, path: Path):
+        """Forget ``path`` and its directory index (call after writing/deleting)."""
+        with self._lock:
+            self._files.pop(str(path), None)
+            self._dirs.pop(str(path.parent), None)
+
+    def invalidate_tree(self, root: Path):
+        """Forget every cached file/index under ``root`` (after rmtree)."""
+        prefix = str(root)
+        with self._lock:
+            for store in (self._files, self._dirs):
+                for key in [k for k in store if k == prefix or k.startswith(prefix + os.sep)]:
+                    del store[key]
+
+    # -- internals ---------------------------------------------------------
+
+    def _fresh(self, path: Path) -> _FileEntry | None:
+        """Cached entry for ``path`` if it was validated recently (no I/O)."""
+        with self._lock:
+            entry = self._files.get(str(path))
+            if entry is not None and time.monotonic() - entry.checked_at < self.revalidate_after:
+                return entry
+        return None
+
+    def _entry(self, path: Path) -> _FileEntry | None:
+        key = str(path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None and now - entry.checked_at < self.revalidate_after:
+                return entry
+        info = self.info(path)
+        if info is None:
+            with self._lock:
+                self._files.pop(key, None)
+            return None
+        if entry is not None and entry.info == info:
+            entry.checked_at = now
+            return entry
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        entry = _FileEntry(info=info, raw=raw, checked_at=now)
+        with self._lock:
+            self._files[key] = entry
+            while len(self._files) > self.max_files:
+                self._files.pop(next(iter(self._files)))
+        return entry
+
+
+def combined_etag(infos: Iterable[tuple[str, FileInfo | None]]) -> str:
+    """Weak ETag over several files' identities (e.g. an output listing)."""
+    h = hashlib.blake2b(digest_size=8)
+    for name, info in infos:
+        h.update(f"{name}:{info.mtime_ns if info else 0}:{info.size if info else 0};".encode())
+    return f'W/"{h.hexdigest()}"'
+
+
+_cache: OutputCache | None = None
+
+
+def get_output_cache() -> OutputCache:
+    """Return the process-wide output cache."""
+    global _cache
+    if _cache is None:
+        _cache = OutputCache()
+    return _cache
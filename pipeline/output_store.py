@@ -0,0 +1,184 @@
+"""Crash-safe writes for agent outputs and run artifacts.
+
+Every write under ``outputs/`` (agent outputs, the copywriter merge and its
+per-job results, chat edits, brief.json, run metadata) goes through the
+OutputStore:
+
+  - Writes are atomic: data goes to a hidden temp file in the target
+    directory, which is then ``os.replace``d over the target. A crash
+    leaves either the old file or the new one, never half-written JSON.
+  - Durability follows ``OUTPUT_FSYNC``:
+      ``batch``  (default) the temp file is fsynced before the rename, and
+                 directory fsyncs (which make the rename itself durable)
+                 are coalesced: each dirty directory is fsynced once per
+                 ``OUTPUT_FSYNC_INTERVAL`` however many files landed in it.
+      ``always`` file and directory are fsynced on every write.
+      ``off``    no fsync (still atomic against process crashes).
+  - The output cache is invalidated after every change.
+
+Blocking methods are for worker threads, agents and the CLI. The
+``a``-prefixed twins run them on the IO executor (pipeline/executors.py)
+so async handlers never touch the disk on the event loop.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+import config
+from pipeline.executors import run_io
+from pipeline.output_cache import OutputCache, get_output_cache
+
+logger = logging.getLogger(__name__)
+
+FSYNC_MODES = ("batch", "always", "off")
+
+
+class OutputStore:
+    """Atomic, cache-coherent file writes; see the module docstring."""
+
+    def __init__(self, cache: OutputCache, fsync: str = "batch", fsync_interval: float = 0.2):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"OUTPUT_FSYNC must be one of {', '.join(FSYNC_MODES)} (got {fsync!r})")
+        self.cache = cache
+        self.fsync = fsync
+        self.fsync_interval = max(0.0, float(fsync_interval))
+        self._lock = threading.Lock()
+        self._dirty_dirs: set[str] = set()
+        self._timer: threading.Timer | None = None
+
+    # -- blocking API ------------------------------------------------------
+
+    def write_bytes(self, path: Path, data: bytes) -> Path:
+        """Atomically replace ``path`` with ``data`` (parent dirs are created)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+                if self.fsync != "off":
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self.cache.invalidate(path)
+        self._dir_changed(path.parent)
+        return path
+
+    def write_text(self, path: Path, text: str) -> Path:
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def write_json(self, path: Path, obj: Any, indent: int | None = 2) -> Path:
+        return self.write_text(path, json.dumps(obj, indent=indent, default=str))
+
+    def read_text(self, path: Path) -> str | None:
+        """Contents of ``path`` (None if missing)."""
+        try:
+            return path.read_text("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def ensure_dir(self, path: Path) -> Path:
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def remove(self, path: Path) -> bool:
+        """Delete one file. Returns whether it existed."""
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        self.cache.invalidate(path)
+        self._dir_changed(path.parent)
+        return True
+
+    def remove_tree(self, path: Path) -> bool:
+        """Delete a directory tree. Returns whether it existed."""
+        if not path.exists():
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        self.cache.invalidate_tree(path)
+        self.cache.invalidate(path)
+        self._dir_changed(path.parent)
+        return True
+
+    def flush(self):
+        """fsync every directory changed since the last flush."""
+        with self._lock:
+            dirs, self._dirty_dirs = self._dirty_dirs, set()
+            self._timer = None
+        for directory in dirs:
+            _fsync_dir(directory)
+
+    # -- async API (IO executor) ---------------------------------------------
+
+    async def awrite_bytes(self, path: Path, data: bytes) -> Path:
+        return await run_io(self.write_bytes, path, data)
+
+    async def awrite_text(self, path: Path, text: str) -> Path:
+        return await run_io(self.write_text, path, text)
+
+    async def awrite_json(self, path: Path, obj: Any, indent: int | None = 2) -> Path:
+        return await run_io(self.write_json, path, obj, indent)
+
+    async def aread_text(self, path: Path) -> str | None:
+        return await run_io(self.read_text, path)
+
+    async def aensure_dir(self, path: Path) -> Path:
+        return await run_io(self.ensure_dir, path)
+
+    async def aremove(self, path: Path) -> bool:
+        return await run_io(self.remove, path)
+
+    async def aremove_tree(self, path: Path) -> bool:
+        return await run_io(self.remove_tree, path)
+
+    # -- internals ---------------------------------------------------------
+
+    def _dir_changed(self, directory: Path):
+        if self.fsync == "off":
+            return
+        if self.fsync == "always" or self.fsync_interval == 0:
+            _fsync_dir(str(directory))
+            return
+        with self._lock:
+            self._dirty_dirs.add(str(directory))
+            if self._timer is None:
+                self._timer = threading.Timer(self.fsync_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+
+def _fsync_dir(directory: str):
+    """Make renames/unlinks in ``directory`` durable (no-op where unsupported)."""
+    flags = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+    try:
+        fd = os.open(directory, flags)
+    except OSError:
+        return  # gone, or directories can't be opened (Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        logger.debug("fsync failed for directory %s", directory, exc_info=True)
+    finally:
+        os.close(fd)
+
+
+_store: OutputStore | None = None
+
+
+def get_output_store() -> OutputStore:
+    """Return the process-wide output store (created on first use)."""
+    global _store
+    if _store is None:
+        _store = OutputStore(get_output_cache(), config.OUTPUT_FSYNC, config.OUTPUT_FSYNC_INTERVAL)
+    return _store
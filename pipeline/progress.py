@@ -0,0 +1,178 @@
+"""Context-scoped, structured progress for streaming LLM calls.
+
+A ProgressReporter carries the tags of the work it reports on (run_id,
+agent slug, job key) and a sink. ``use_progress_reporter()`` installs it in
+the current contextvars context for the duration of a block, and restores
+the previous one on exit. A copywriter job that installs its own reporter
+therefore never clobbers the run's reporter or a concurrent rerun's, and
+worker threads see the reporter that was current when their work was
+scheduled.
+
+Provider stream loops call ``stream_progress(provider, model)`` and feed
+every text delta to the returned StreamProgress. The tracker emits a
+structured event at most every ``interval`` seconds:
+
+    {"slug", "run_id", "job_key", "provider", "model", "chars", "bytes",
+     "tokens", "tokens_per_sec", "elapsed", "expected_tokens",
+     "eta_seconds", "percent", "done", "message"}
+
+``tokens`` is estimated from characters while streaming (the provider
+reports exact usage only at the end). ``expected_tokens``, and with it
+``eta_seconds``/``percent``, comes from the reporter's expected output size,
+e.g. the size of the agent's previous output.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English prose / JSON across providers.
+CHARS_PER_TOKEN = 4.0
+
+# Stream loops also write a "still alive" log line this often (seconds).
+_LOG_INTERVAL = 15.0
+
+ProgressSink = Callable[[dict[str, Any]], None]
+
+
+class ProgressReporter:
+    """Tags + sink for progress events of one unit of work."""
+
+    def __init__(
+        self,
+        sink: ProgressSink,
+        *,
+        slug: str = "",
+        run_id: int | None = None,
+        job_key: str = "",
+        expected_chars: int | None = None,
+        interval: float | None = None,
+    ):
+        self.sink = sink
+        self.slug = slug
+        self.run_id = run_id
+        self.job_key = job_key
+        self.expected_chars = expected_chars or None
+        self.interval = config.PROGRESS_INTERVAL_SECONDS if interval is None else interval
+
+    def tags(self) -> dict[str, Any]:
+        tags: dict[str, Any] = {"slug": self.slug}
+        if self.run_id is not None:
+            tags["run_id"] = self.run_id
+        if self.job_key:
+            tags["job_key"] = self.job_key
+        return tags
+
+    def emit(self, event: dict[str, Any]):
+        """Send ``event`` with this reporter's tags (they win over the event's)."""
+        try:
+            self.sink({**event, **self.tags()})
+        except Exception:
+            logger.debug("Progress sink failed", exc_info=True)
+
+
+_reporter: contextvars.ContextVar[ProgressReporter | None] = contextvars.ContextVar(
+    "progress_reporter", default=None,
+)
+
+
+def current_reporter() -> ProgressReporter | None:
+    return _reporter.get()
+
+
+@contextmanager
+def use_progress_reporter(reporter: ProgressReporter | None) -> Iterator[ProgressReporter | None]:
+    """Install ``reporter`` for this context until the block exits."""
+    token = _reporter.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _reporter.reset(token)
+
+
+def forward_progress(event: dict[str, Any]):
+    """Re-emit an event produced elsewhere (worker process/host) via the current reporter."""
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.emit(event)
+
+
+class StreamProgress:
+    """Counts one stream's output and emits throttled progress events."""
+
+    def __init__(self, provider: str, model: str, reporter: ProgressReporter | None):
+        self.provider = provider
+        self.model = model
+        self.reporter = reporter
+        self.started = time.time()
+        self.chunks = 0
+        self.chars = 0
+        self.bytes = 0
+        self._last_emit = self.started
+        self._last_log = self.started
+
+    def update(self, text: str):
+        self.chunks += 1
+        self.chars += len(text)
+        self.bytes += len(text.encode("utf-8"))
+        now = time.time()
+        if now - self._last_log >= _LOG_INTERVAL:
+            self._last_log = now
+            logger.info("%s [%s]: %s", self.provider, self.model, self._message(now))
+        if self.reporter is not None and now - self._last_emit >= self.reporter.interval:
+            self._last_emit = now
+            self.reporter.emit(self.snapshot(now))
+
+    def finish(self):
+        if self.reporter is not None and self.chunks:
+            self.reporter.emit(self.snapshot(time.time(), done=True))
+
+    def snapshot(self, now: float, done: bool = False) -> dict[str, Any]:
+        elapsed = max(now - self.started, 1e-6)
+        tokens = round(self.chars / CHARS_PER_TOKEN)
+        rate = tokens / elapsed
+        expected = self.reporter.expected_chars if self.reporter is not None else None
+        expected_tokens = round(expected / CHARS_PER_TOKEN) if expected else None
+        eta = percent = None
+        if expected_tokens:
+            percent = 100.0 if done else min(99.0, round(100 * tokens / expected_tokens, 1))
+            if not done and rate > 0:
+                eta = round(max(0.0, expected_tokens - tokens) / rate, 1)
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "chars": self.chars,
+            "bytes": self.bytes,
+            "tokens": tokens,
+            "tokens_per_sec": round(rate, 1),
+            "elapsed": round(elapsed, 1),
+            "expected_tokens": expected_tokens,
+            "eta_seconds": 0.0 if done else eta,
+            "percent": percent,
+            "done": done,
+            "message": (
+                f"Stream complete — ~{tokens:,} tokens in {elapsed:.0f}s ({rate:.0f} tok/s)"
+                if done else self._message(now, eta)
+            ),
+        }
+
+    def _message(self, now: float, eta: float | None = None) -> str:
+        tokens = round(self.chars / CHARS_PER_TOKEN)
+        elapsed = max(now - self.started, 1e-6)
+        msg = f"Streaming... ~{tokens:,} tokens, {tokens / elapsed:.0f} tok/s, {round(elapsed)}s elapsed"
+        if eta is not None:
+            msg += f", ~{round(eta)}s left"
+        return msg
+
+
+def stream_progress(provider: str, model: str) -> StreamProgress:
+    """Tracker for a stream, reporting to the reporter current in this context."""
+    return StreamProgress(provider, model, _reporter.get())
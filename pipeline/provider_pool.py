@@ -0,0 +1,203 @@
+"""Provider pool — spread fan-out jobs across several API keys / models.
+
+Parallel Copywriter jobs used to go through one provider/model and one API
+key, so throughput was capped by a single account's rate limit. A provider
+pool lists interchangeable members (provider + model + API key + weight).
+Each fan-out job is routed to the member with the most live headroom,
+scaled by its weight and recent latency.
+
+Each member has its own AIMD limiter (pipeline.concurrency), so a key that
+starts returning 429s sheds load to the others automatically.
+
+Configuration (PROVIDER_POOL as inline JSON, or PROVIDER_POOL_FILE):
+
+    [
+      {"id": "oa-main",  "provider": "openai",    "model": "gpt-5.2",
+       "api_key_env": "OPENAI_API_KEY",   "weight": 2, "group": "copy"},
+      {"id": "oa-team2", "provider": "openai",    "model": "gpt-5.2",
+       "api_key_env": "OPENAI_API_KEY_2", "weight": 1, "group": "copy"},
+      {"id": "an-main",  "provider": "anthropic", "model": "claude-sonnet-4-5",
+       "api_key_env": "ANTHROPIC_API_KEY", "weight": 1, "group": "copy"}
+    ]
+
+Members in the same ``group`` are treated as equivalent. A job resolved to a
+provider/model listed in a group can run on any member of that group.
+Without a matching group the pool has one member that uses the default key,
+which is exactly the old single-provider behaviour.
+
+Usage is tagged with the member ``id`` (see pipeline.llm.use_api_key) so
+costs stay attributable per key.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import config
+from pipeline.concurrency import AdaptiveConcurrencyLimiter, get_limiter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolMember:
+    """One provider/model/API-key combination in a pool."""
+
+    key_id: str
+    provider: str
+    model: str
+    api_key: str = ""  # "" = provider's default key from config
+    weight: float = 1.0
+    group: str = "default"
+    limiter: AdaptiveConcurrencyLimiter = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.limiter = get_limiter(self.provider, self.model, self.key_id)
+
+    def score(self) -> tuple[int, float]:
+        """Higher is better: prefer free slots, then weight, then low latency."""
+        lim = self.limiter
+        latency = max(lim.latency or 1.0, 0.1)
+        headroom = lim.limit - lim.in_flight - lim.waiting
+        if headroom > 0:
+            return (1, self.weight * headroom / latency)
+        # Saturated: pick the shortest queue relative to capacity.
+        backlog = lim.in_flight + lim.waiting + 1
+        return (0, self.weight * lim.limit / (backlog * latency))
+
+
+class ProviderPool:
+    """A set of interchangeable members that fan-out jobs are spread across."""
+
+    def __init__(self, members: list[PoolMember]):
+        if not members:
+            raise ValueError("ProviderPool needs at least one member")
+        self.members = members
+
+    @property
+    def limit(self) -> int:
+        """Combined concurrency limit across all members."""
+        return sum(m.limiter.limit for m in self.members)
+
+    async def acquire(self) -> PoolMember:
+        """Pick the best member and wait for a slot on its limiter."""
+        member = max(self.members, key=lambda m: m.score())
+        await member.limiter.acquire()
+        return member
+
+    def release(
+        self,
+        member: PoolMember,
+        *,
+        latency: float | None = None,
+        ttft: float | None = None,
+        error: BaseException | None = None,
+        aborted: bool = False,
+    ):
+        member.limiter.release(latency=latency, ttft=ttft, error=error, aborted=aborted)
+
+    def snapshot(self, history: int = 10) -> dict[str, Any]:
+        """JSON-serialisable view for progress broadcasts."""
+        members = [
+            {"key_id": m.key_id, "provider": m.provider, "model": m.model,
+             "weight": m.weight, **m.limiter.snapshot(history)}
+            for m in self.members
+        ]
+        return {
+            "limit": self.limit,
+            "in_flight": sum(m.limiter.in_flight for m in self.members),
+            "waiting": sum(m.limiter.waiting for m in self.members),
+            "members": members,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+_configured: list[PoolMember] | None = None
+
+
+def _load_pool_config() -> list[dict[str, Any]]:
+    raw = config.PROVIDER_POOL
+    if not raw and config.PROVIDER_POOL_FILE:
+        path = Path(config.PROVIDER_POOL_FILE)
+        if not path.is_absolute():
+            path = config.ROOT_DIR / path
+        try:
+            raw = path.read_text("utf-8")
+        except OSError as exc:
+            logger.warning("Provider pool: cannot read %s: %s", path, exc)
+            return []
+    if not raw:
+        return []
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        logger.warning("Provider pool: invalid JSON (%s) — pool disabled", exc)
+        return []
+    if isinstance(data, dict):
+        data = data.get("members", [])
+    return [d for d in data if isinstance(d, dict)]
+
+
+def _configured_members() -> list[PoolMember]:
+    global _configured
+    if _configured is not None:
+        return _configured
+
+    members: list[PoolMember] = []
+    for i, entry in enumerate(_load_pool_config()):
+        provider = str(entry.get("provider") or "").strip()
+        model = str(entry.get("model") or "").strip()
+        if not provider or not model:
+            logger.warning("Provider pool: entry %d missing provider/model — skipped", i)
+            continue
+        api_key = str(entry.get("api_key") or "")
+        key_env = entry.get("api_key_env")
+        if key_env:
+            api_key = os.getenv(str(key_env), "")
+            if not api_key:
+                logger.warning("Provider pool: %s is not set — entry %d skipped", key_env, i)
+                continue
+        members.append(PoolMember(
+            key_id=str(entry.get("id") or f"{provider}-{i}"),
+            provider=provider,
+            model=model,
+            api_key=api_key,
+            weight=max(0.01, float(entry.get("weight", 1.0) or 1.0)),
+            group=str(entry.get("group") or "default"),
+        ))
+    if members:
+        logger.info(
+            "Provider pool: %d members (%s)",
+            len(members), ", ".join(f"{m.key_id}={m.provider}/{m.model}" for m in members),
+        )
+    _configured = members
+    return members
+
+
+def find_pool_member(key_id: str) -> PoolMember | None:
+    """Configured member with ``key_id`` (e.g. to resolve a key on a remote worker)."""
+    for member in _configured_members():
+        if member.key_id == key_id:
+            return member
+    return None
+
+
+def get_provider_pool(provider: str, model: str) -> ProviderPool:
+    """Pool for jobs resolved to ``provider``/``model``.
+
+    Returns every configured member in the first group that lists this
+    provider/model, or a single default-key member if none does.
+    """
+    configured = _configured_members()
+    for member in configured:
+        if member.provider == provider and member.model == model:
+            return ProviderPool([m for m in configured if m.group == member.group])
+    return ProviderPool([PoolMember(key_id="", provider=provider, model=model)])
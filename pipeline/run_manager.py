@@ -0,0 +1,338 @@
+"""Concurrent pipeline runs.
+
+The server used to keep a single global ``pipeline_state`` dict and reject
+any second /api/run (or branch run) with 409. RunManager instead holds one
+RunState per run. It executes up to ``max_concurrent`` runs at once and
+queues the rest FIFO rather than rejecting them.
+
+RunState is a dict with the same keys the old global had (phase, agents,
+gate, abort flags, cancel token, copywriter jobs, log), so server code keeps
+its ``pipeline_state["..."]`` idiom. ``pipeline_state`` is a
+PipelineStateProxy that resolves to the run bound to the current context:
+
+  - inside a run's task, and any worker thread it schedules (the LLM
+    scheduler copies contextvars), that run's RunState;
+  - in an API handler that called ``bind()``, the run it addressed by run_id;
+  - otherwise the shared session state (UI-level keys such as the open
+    brand).
+
+Runs are identified by their SQLite ``pipeline_runs`` id. Two runs of the
+same brand never execute at once, because they would write the same brand
+output directory. A queued run whose brand is busy is skipped until that
+brand is free; runs of other brands behind it can start.
+
+A run paused at a phase gate (``parked()``) gives its slot back while it
+waits for the user, so runs sitting at gates can't starve the queue. It
+keeps its brand reserved, and takes the next free slot when it continues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# RunState bound to the current task / worker thread (None = session state).
+current_run: contextvars.ContextVar["RunState | None"] = contextvars.ContextVar(
+    "current_run", default=None,
+)
+
+
+def _default_state() -> dict[str, Any]:
+    return {
+        "running": False,
+        "abort_requested": False,
+        "abort_generation": 0,  # monotonic abort token for cancelling background thread work
+        "cancel_token": None,  # CancelToken for the current run — closes in-flight LLM streams on abort
+        "pipeline_task": None,  # asyncio.Task reference for cancellation
+        "current_phase": None,
+        "current_agent": None,
+        "completed_agents": [],
+        "failed_agents": [],
+        "start_time": None,
+        "log": [],
+        "run_id": None,  # current SQLite run_id
+        "phase_gate": None,  # asyncio.Event — set when user approves next phase
+        "waiting_for_approval": False,  # True while paused between phases
+        "selected_concepts": [],  # user-selected video concepts from Phase 2
+        "active_branch": None,  # currently running branch ID (None = main pipeline)
+        "active_brand_slug": None,  # current brand slug (scopes outputs + branches)
+        "copywriter_failed_jobs": [],  # failed per-concept jobs from parallel Agent 04
+        "copywriter_parallel_context": None,  # context for rewriting only failed jobs
+        "copywriter_rewrite_in_progress": False,  # guard to block Continue during rewrite
+        "usage_scope": None,  # this run's LLM usage log (pipeline.llm.begin_usage_scope)
+    }
+
+
+class RunState(dict):
+    """Per-run state (same keys as the legacy global pipeline_state)."""
+
+    def __init__(self, run_id: int | None = None, brand_slug: str = "", branch_id: str | None = None):
+        super().__init__(_default_state())
+        self["run_id"] = run_id
+        self["active_brand_slug"] = brand_slug or None
+        self["active_branch"] = branch_id
+        self.status = "idle"  # idle | queued | running | finished
+        self.holds_slot = False  # counts toward max_concurrent (False while parked at a gate)
+        self.queued_at: float | None = None
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def run_id(self) -> int | None:
+        return self.get("run_id")
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "brand_slug": self.get("active_brand_slug") or "",
+            "branch_id": self.get("active_branch"),
+            "current_phase": self.get("current_phase"),
+            "current_agent": self.get("current_agent"),
+            "waiting_for_approval": bool(self.get("waiting_for_approval")),
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class RunManager:
+    """Registry + FIFO admission control for concurrent pipeline runs."""
+
+    def __init__(self, max_concurrent: int = 2, keep_finished: int = 20):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.keep_finished = keep_finished
+        self.session = RunState()
+        self._runs: OrderedDict[int, RunState] = OrderedDict()
+        self._queue: deque[RunState] = deque()
+        self._active = 0
+        self._cond: asyncio.Condition | None = None
+
+    # -- lookup ------------------------------------------------------------
+
+    def current(self) -> RunState:
+        """RunState bound to this context, or the shared session state."""
+        return current_run.get() or self.session
+
+    def get(self, run_id: int | None) -> RunState | None:
+        if run_id is None:
+            return None
+        return self._runs.get(int(run_id))
+
+    def is_active(self, run_id: int | None) -> bool:
+        state = self.get(run_id)
+        return state is not None and state.status in ("queued", "running")
+
+    def focus(self) -> RunState:
+        """Run an unscoped request should act on: newest live run, else newest run."""
+        live = [s for s in self._runs.values() if s.status in ("running", "queued")]
+        if live:
+            # Prefer a run paused at a gate — it is the one waiting on the user.
+            waiting = [s for s in live if s.get("waiting_for_approval")]
+            return (waiting or live)[-1]
+        if self._runs:
+            return next(reversed(self._runs.values()))
+        return self.session
+
+    def bind(self, run_id: int | None = None) -> RunState:
+        """Bind the addressed run (or the focus run) to the current context."""
+        state = self.get(run_id) if run_id is not None else self.focus()
+        if state is None:
+            state = self.session
+        current_run.set(state)
+        return state
+
+    def running_count(self) -> int:
+        return self._active
+
+    def will_wait(self, state: RunState) -> bool:
+        """True if a queued run won't get a slot in the next admission round."""
+        if state.status != "queued":
+            return False
+        slots = self.max_concurrent - self._active
+        busy = self._running_brands()
+        for queued in self._queue:
+            brand = queued.get("active_brand_slug") or ""
+            if slots <= 0 or brand in busy:
+                if queued is state:
+                    return True
+                continue
+            if queued is state:
+                return False
+            busy.add(brand)
+            slots -= 1
+        return True
+
+    def queue_position(self, state: RunState) -> int | None:
+        try:
+            return list(self._queue).index(state) + 1
+        except ValueError:
+            return None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._active,
+            "queued": len(self._queue),
+            "runs": [s.summary() for s in reversed(self._runs.values())],
+        }
+
+    # -- execution ---------------------------------------------------------
+
+    def submit(self, state: RunState, runner: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Register ``state`` and run ``runner()`` once a slot is free.
+
+        The task runs with ``state`` bound as the current run, so everything
+        it does (and every worker thread it schedules) sees its own state.
+        """
+        if state.run_id is None:
+            raise ValueError("RunState needs a run_id before it can be submitted")
+        self._runs[state.run_id] = state
+        self._runs.move_to_end(state.run_id)
+        state.status = "queued"
+        state.queued_at = time.time()
+        self._queue.append(state)
+        task = asyncio.create_task(self._drive(state, runner))
+        state["pipeline_task"] = task
+        self._prune()
+        return task
+
+    def cancel_queued(self, state: RunState) -> bool:
+        """Drop a run that has not started yet. Returns True if it was queued."""
+        if state.status != "queued":
+            return False
+        try:
+            self._queue.remove(state)
+        except ValueError:
+            pass
+        task = state.get("pipeline_task")
+        if task and not task.done():
+            task.cancel()
+        state.status = "finished"
+        state.finished_at = time.time()
+        return True
+
+    async def _drive(self, state: RunState, runner: Callable[[], Awaitable[Any]]):
+        current_run.set(state)
+        cond = self._condition()
+        async with cond:
+            try:
+                await cond.wait_for(lambda: self._next_startable() is state)
+            except asyncio.CancelledError:
+                # Aborted while queued — don't block the runs behind it.
+                if state in self._queue:
+                    self._queue.remove(state)
+                state.status = "finished"
+                state.finished_at = time.time()
+                cond.notify_all()
+                raise
+            self._queue.remove(state)
+            self._active += 1
+            state.holds_slot = True
+            cond.notify_all()  # the next queued run may also fit
+        state.status = "running"
+        state.started_at = time.time()
+        waited = state.started_at - (state.queued_at or state.started_at)
+        if waited >= 1:
+            logger.info("Run #%s started after %.1fs in queue", state.run_id, waited)
+        try:
+            return await runner()
+        finally:
+            state.status = "finished"
+            state.finished_at = time.time()
+            async with cond:
+                if state.holds_slot:
+                    state.holds_slot = False
+                    self._active -= 1
+                cond.notify_all()
+
+    @asynccontextmanager
+    async def parked(self, state: RunState | None = None) -> AsyncIterator[None]:
+        """Release the run's slot for the duration of the block (a phase gate).
+
+        On exit the run waits for a free slot again, unless it was aborted,
+        in which case it takes one right away so it can wind down.
+        """
+        state = state or self.current()
+        cond = self._condition()
+        async with cond:
+            if state.holds_slot:
+                state.holds_slot = False
+                self._active -= 1
+                cond.notify_all()
+        try:
+            yield
+        finally:
+            async with cond:
+                if self._active >= self.max_concurrent and not state.get("abort_requested"):
+                    logger.info("Run #%s continuing once a run slot frees up", state.run_id)
+                await cond.wait_for(
+                    lambda: self._active < self.max_concurrent or state.get("abort_requested")
+                )
+                self._active += 1
+                state.holds_slot = True
+
+    def _next_startable(self) -> RunState | None:
+        """First queued run (FIFO) whose brand isn't already running."""
+        if self._active >= self.max_concurrent:
+            return None
+        busy = self._running_brands()
+        for queued in self._queue:
+            if (queued.get("active_brand_slug") or "") not in busy:
+                return queued
+        return None
+
+    def _running_brands(self) -> set[str]:
+        return {
+            s.get("active_brand_slug") or ""
+            for s in self._runs.values() if s.status == "running"
+        }
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _prune(self):
+        finished = [rid for rid, s in self._runs.items() if s.status == "finished"]
+        for rid in finished[:-self.keep_finished] if len(finished) > self.keep_finished else []:
+            self._runs.pop(rid, None)
+
+
+class PipelineStateProxy(MutableMapping):
+    """Dict-like view of the RunState bound to the current context."""
+
+    def __init__(self, manager: RunManager):
+        self._manager = manager
+
+    def _target(self) -> RunState:
+        return self._manager.current()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._target()[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._target()[key] = value
+
+    def __delitem__(self, key: str):
+        del self._target()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._target())
+
+    def __len__(self) -> int:
+        return len(self._target())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._target().get(key, default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        return self._target().pop(key, *default)
@@ -0,0 +1,269 @@
+"""Priority scheduler for blocking LLM work.
+
+Every blocking LLM call the server makes (agent runs, parallel copywriter
+jobs, reruns, chat turns) used to go straight into the event loop's default
+executor, first come first served. A user's chat reply could sit behind a
+dozen background script generations.
+
+LLMScheduler owns a dedicated worker pool and dispatches queued work by:
+
+  1. Priority class — INTERACTIVE > GATE > BACKGROUND > SPECULATIVE.
+  2. Per-brand fairness — inside a class, the brand with the fewest running
+     items goes next (ties: oldest first), so one brand's fan-out can't
+     starve another brand's work.
+
+A few workers are reserved for INTERACTIVE work, so chat always has a free
+thread even when every other slot is busy. Running work is never
+interrupted. When the queue is full, the newest queued item of a lower
+class is preempted (failed with SchedulerPreempted) to make room.
+
+Functions run inside a copy of the caller's contextvars context, like
+asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Scheduling classes, highest priority first."""
+
+    INTERACTIVE = 0  # chat turns — a user is waiting on the reply
+    GATE = 1         # pipeline work blocking the next phase gate
+    BACKGROUND = 2   # manual reruns
+    SPECULATIVE = 3  # work nobody is waiting on yet
+
+
+class SchedulerPreempted(RuntimeError):
+    """A queued item was evicted to make room for higher-priority work."""
+
+
+@dataclass
+class _Item:
+    seq: int
+    priority: Priority
+    brand: str
+    label: str
+    fn: Callable[..., Any]
+    args: tuple
+    ctx: contextvars.Context
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class _ClassStats:
+    def __init__(self, history_size: int = 200):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.preempted = 0
+        self.running = 0
+        self.waits: deque[float] = deque(maxlen=history_size)
+
+    def snapshot(self, queued: int) -> dict[str, Any]:
+        waits = sorted(self.waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else None
+        return {
+            "queued": queued,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "preempted": self.preempted,
+            "wait_avg": round(sum(waits) / len(waits), 2) if waits else None,
+            "wait_p95": round(p95, 2) if p95 is not None else None,
+            "wait_max": round(waits[-1], 2) if waits else None,
+        }
+
+
+class LLMScheduler:
+    """Priority + per-brand fair dispatcher over a dedicated thread pool.
+
+    Usage:
+        result = await scheduler.run(fn, *args, priority=Priority.GATE, brand=slug)
+    """
+
+    def __init__(
+        self,
+        workers: int = 16,
+        reserved_interactive: int = 2,
+        max_queue: int = 200,
+    ):
+        self.workers = max(1, int(workers))
+        self.reserved_interactive = min(max(0, int(reserved_interactive)), self.workers - 1)
+        self.max_queue = max(1, int(max_queue))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="llm")
+        self._queues: dict[Priority, list[_Item]] = {p: [] for p in Priority}
+        self._stats: dict[Priority, _ClassStats] = {p: _ClassStats() for p in Priority}
+        self._running_by_brand: dict[str, int] = {}
+        self._running = 0
+        self._seq = itertools.count()
+
+    # -- public API --------------------------------------------------------
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: Priority = Priority.GATE,
+        brand: str = "",
+        label: str = "",
+    ) -> Any:
+        """Queue ``fn(*args)`` and await its result."""
+        loop = asyncio.get_running_loop()
+        item = _Item(
+            seq=next(self._seq),
+            priority=Priority(priority),
+            brand=brand or "",
+            label=label or getattr(fn, "__name__", "job"),
+            fn=fn,
+            args=args,
+            ctx=contextvars.copy_context(),
+            future=loop.create_future(),
+        )
+        self._enqueue(item)
+        self._dispatch()
+        # If the caller is cancelled while queued, the item is skipped at
+        # dispatch time (its future is already cancelled).
+        return await item.future
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serialisable queue depth / wait-time view for monitoring."""
+        return {
+            "workers": self.workers,
+            "reserved_interactive": self.reserved_interactive,
+            "max_queue": self.max_queue,
+            "running": self._running,
+            "queued": self._queued_total(),
+            "running_by_brand": {b or "(none)": n for b, n in self._running_by_brand.items() if n},
+            "classes": {
+                p.name.lower(): self._stats[p].snapshot(len(self._queues[p]))
+                for p in Priority
+            },
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- internals ---------------------------------------------------------
+
+    def _queued_total(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _enqueue(self, item: _Item):
+        if self._queued_total() >= self.max_queue:
+            victim = self._pick_victim(item.priority)
+            if victim is None:
+                raise SchedulerPreempted(
+                    f"Scheduler queue full ({self.max_queue}) — rejected {item.label}"
+                )
+            self._queues[victim.priority].remove(victim)
+            self._stats[victim.priority].preempted += 1
+            logger.warning(
+                "Scheduler: preempted queued %s job '%s' for %s job '%s'",
+                victim.priority.name, victim.label, item.priority.name, item.label,
+            )
+            if not victim.future.done():
+                victim.future.set_exception(SchedulerPreempted(
+                    f"'{victim.label}' was preempted by higher-priority work"
+                ))
+        self._queues[item.priority].append(item)
+        self._stats[item.priority].submitted += 1
+
+    def _pick_victim(self, incoming: Priority) -> _Item | None:
+        """Newest queued item from the lowest class below ``incoming``."""
+        for p in sorted(Priority, reverse=True):
+            if p <= incoming:
+                return None
+            if self._queues[p]:
+                return self._queues[p][-1]
+        return None
+
+    def _capacity_for(self, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return self.workers
+        return self.workers - self.reserved_interactive
+
+    def _next_item(self) -> _Item | None:
+        for p in Priority:
+            queue = self._queues[p]
+            # Drop callers that gave up while waiting.
+            queue[:] = [i for i in queue if not i.future.done()]
+            if not queue or self._running >= self._capacity_for(p):
+                continue
+            item = min(queue, key=lambda i: (self._running_by_brand.get(i.brand, 0), i.seq))
+            queue.remove(item)
+            return item
+        return None
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self._running < self.workers:
+            item = self._next_item()
+            if item is None:
+                return
+            wait = time.time() - item.enqueued_at
+            stats = self._stats[item.priority]
+            stats.waits.append(wait)
+            stats.running += 1
+            self._running += 1
+            self._running_by_brand[item.brand] = self._running_by_brand.get(item.brand, 0) + 1
+            if wait >= 5:
+                logger.info(
+                    "Scheduler: %s job '%s' started after %.1fs in queue",
+                    item.priority.name, item.label, wait,
+                )
+            cf = loop.run_in_executor(self._executor, item.ctx.run, item.fn, *item.args)
+            cf.add_done_callback(lambda f, item=item: self._on_done(item, f))
+
+    def _on_done(self, item: _Item, f: asyncio.Future):
+        stats = self._stats[item.priority]
+        stats.running -= 1
+        self._running -= 1
+        self._running_by_brand[item.brand] = max(0, self._running_by_brand.get(item.brand, 1) - 1)
+        if f.cancelled():
+            stats.failed += 1
+            if not item.future.done():
+                item.future.cancel()
+        elif f.exception() is not None:
+            stats.failed += 1
+            if not item.future.done():
+                item.future.set_exception(f.exception())
+        else:
+            stats.completed += 1
+            if not item.future.done():
+                item.future.set_result(f.result())
+        self._dispatch()
+
+
+# ---------------------------------------------------------------------------
+# Shared scheduler
+# ---------------------------------------------------------------------------
+
+_scheduler: LLMScheduler | None = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide LLM scheduler (created on first use)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler(
+            workers=config.LLM_SCHEDULER_WORKERS,
+            reserved_interactive=config.LLM_SCHEDULER_RESERVED_INTERACTIVE,
+            max_queue=config.LLM_SCHEDULER_MAX_QUEUE,
+        )
+    return _scheduler
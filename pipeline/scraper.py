@@ -1,8 +1,9 @@
 """Website Intelligence Scraper — AI-powered marketing intel extraction.
 
 Two-stage process:
-  1. Fetch + Clean: httpx fetches the page HTML, BeautifulSoup strips it to text.
-  2. LLM Extract: Sends cleaned text to the selected LLM to extract structured
+  1. Fetch + Clean: httpx fetches the page HTML (``fetch_page``), BeautifulSoup
+     strips it to text (``clean_page``).
+  2. LLM Extract (``extract_intel``): Sends cleaned text to the selected LLM to extract structured
      marketing intelligence (WebsiteIntel schema).
 
 Runs as a pre-pipeline step before Phase 1 to give Agent 1A and 1B
@@ -11,7 +12,6 @@ richer, real-data-grounded research inputs.
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
@@ -51,11 +51,10 @@ If a section has no data, leave it as empty string or empty list.
 """
 
 
-def _fetch_and_clean(url: str) -> str:
-    """Fetch a URL and return cleaned text content.
+def fetch_page(url: str) -> str:
+    """Fetch a URL and return its HTML (stage 1a, network I/O).
 
-    Uses httpx for the HTTP request and BeautifulSoup to strip HTML
-    down to readable text. Truncates to MAX_PAGE_CHARS.
+    Raises ValueError with a user-facing message on HTTP/network errors.
     """
     headers = {
         "User-Agent": (
@@ -67,15 +66,36 @@ def _fetch_and_clean(url: str) -> str:
         "Accept-Language": "en-US,en;q=0.9",
     }
 
-    response = httpx.get(
-        url,
-        headers=headers,
-        follow_redirects=True,
-        timeout=30.0,
-    )
-    response.raise_for_status()
+    try:
+        response = httpx.get(
+            url,
+            headers=headers,
+            follow_redirects=True,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        logger.warning("HTTP error scraping %s: %s", url, e)
+        raise ValueError(f"Website returned HTTP {e.response.status_code}") from e
+    except httpx.ConnectError as e:
+        logger.warning("Connection error scraping %s: %s", url, e)
+        raise ValueError(f"Could not connect to {url}") from e
+    except httpx.TimeoutException:
+        logger.warning("Timeout scraping %s", url)
+        raise ValueError(f"Timeout fetching {url} (30s limit)")
+    except Exception as e:
+        logger.warning("Failed to fetch %s: %s", url, e)
+        raise ValueError(f"Failed to fetch website: {e}") from e
+    return response.text
+
+
+def clean_page(html: str) -> str:
+    """Strip HTML down to readable text (stage 1b, CPU).
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    Truncates to MAX_PAGE_CHARS. Raises ValueError if the page has almost
+    no text (JavaScript-rendered or blocking scrapers).
+    """
+    soup = BeautifulSoup(html, "html.parser")
 
     # Remove script, style, nav, footer, and other non-content tags
     for tag in soup(["script", "style", "nav", "footer", "header", "noscript", "svg", "iframe"]):
@@ -93,6 +113,10 @@ def _fetch_and_clean(url: str) -> str:
     if len(text) > MAX_PAGE_CHARS:
         text = text[:MAX_PAGE_CHARS] + "\n\n[... page text truncated ...]"
 
+    if len(text.strip()) < 100:
+        logger.warning("Page text too short (%d chars) — skipping LLM extraction", len(text))
+        raise ValueError("Page returned very little text content — it may be JavaScript-rendered or blocking scrapers")
+
     return text
 
 
@@ -119,27 +143,22 @@ def scrape_website(
     logger.info("Scraping website: %s", url)
 
     # Stage 1: Fetch + Clean
-    try:
-        page_text = _fetch_and_clean(url)
-        logger.info("Fetched %d chars of cleaned text from %s", len(page_text), url)
-    except httpx.HTTPStatusError as e:
-        logger.warning("HTTP error scraping %s: %s", url, e)
-        raise ValueError(f"Website returned HTTP {e.response.status_code}") from e
-    except httpx.ConnectError as e:
-        logger.warning("Connection error scraping %s: %s", url, e)
-        raise ValueError(f"Could not connect to {url}") from e
-    except httpx.TimeoutException:
-        logger.warning("Timeout scraping %s", url)
-        raise ValueError(f"Timeout fetching {url} (30s limit)")
-    except Exception as e:
-        logger.warning("Failed to fetch %s: %s", url, e)
-        raise ValueError(f"Failed to fetch website: {e}") from e
-
-    if len(page_text.strip()) < 100:
-        logger.warning("Page text too short (%d chars) — skipping LLM extraction", len(page_text))
-        raise ValueError("Page returned very little text content — it may be JavaScript-rendered or blocking scrapers")
+    page_text = clean_page(fetch_page(url))
+    logger.info("Fetched %d chars of cleaned text from %s", len(page_text), url)
 
     # Stage 2: LLM Extract
+    return extract_intel(url, page_text, provider, model, temperature, max_tokens)
+
+
+def extract_intel(
+    url: str,
+    page_text: str,
+    provider: str = "openai",
+    model: str | None = None,
+    temperature: float = 0.3,
+    max_tokens: int = 8_000,
+) -> dict[str, Any]:
+    """Stage 2: extract WebsiteIntel fields from cleaned page text with the LLM."""
     user_prompt = (
         f"# WEBSITE URL\n{url}\n\n"
         f"# PAGE CONTENT\n{page_text}\n\n"
@@ -159,7 +178,7 @@ def scrape_website(
         max_tokens=max_tokens,
     )
 
-    intel = json.loads(result.model_dump_json())
+    intel = result.model_dump(mode="json")
     logger.info(
         "Website intel extracted: headline=%r, %d benefits, %d testimonials, %d claims",
         intel.get("hero_headline", "")[:50],
@@ -0,0 +1,133 @@
+"""JSON serialization layer — encode each result once, optional orjson.
+
+An agent result used to be serialized four times on its way through the
+system:
+
+  - ``json.loads(result.model_dump_json())`` to get a dict,
+  - ``model_dump_json(indent=2)`` for the output file,
+  - ``json.dumps(output)`` again for SQLite,
+  - ``json.dumps`` per WebSocket client on broadcast.
+
+A pydantic result is encoded once (``model_bytes()``). ``encode_model()``
+wraps those bytes in a JSONDocument: a plain dict decoded from them that
+also carries the encoded bytes. The file write, SQLite insert and raw HTTP
+passthrough all reuse the bytes, and ``raw_json()`` only encodes when a
+document has none yet. Agents keep just the bytes and decode them on first
+use, so worker processes that only ship bytes never build the dict.
+
+``dumps``/``loads`` use orjson when it is installed (``pip install orjson``)
+and fall back to the stdlib otherwise. Run ``python bench_serialization.py``
+to compare per-completion CPU time.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON bytes (``indent`` = 2-space pretty print)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """Compact JSON as ``str`` (for text frames, SQLite TEXT columns)."""
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONDocument(dict):
+    """A JSON-compatible dict that remembers its encoded form.
+
+    Top-level mutation drops the cached bytes; nested mutation is not
+    tracked, so treat documents as read-only once encoded.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, data: dict[str, Any], raw: bytes | None = None):
+        super().__init__(data)
+        self.raw = raw
+
+    def _touch(self):
+        self.raw = None
+
+    def __setitem__(self, key, value):
+        self._touch()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._touch()
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        self._touch()
+        super().update(*args, **kwargs)
+
+    def pop(self, *args):
+        self._touch()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._touch()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._touch()
+        return super().setdefault(key, default)
+
+    def clear(self):
+        self._touch()
+        super().clear()
+
+
+def model_bytes(model: BaseModel) -> bytes:
+    """Pretty-printed JSON bytes of a pydantic result (the on-disk form)."""
+    return model.model_dump_json(indent=2).encode("utf-8")
+
+
+def encode_model(model: BaseModel) -> JSONDocument:
+    """Serialize a pydantic result once; the dict form is decoded from those bytes."""
+    return decode_document(model_bytes(model))
+
+
+def decode_document(raw: bytes) -> JSONDocument:
+    """JSONDocument for already-encoded bytes (no re-encode)."""
+    return JSONDocument(loads(raw), raw)
+
+
+def encode_document(data: dict[str, Any]) -> JSONDocument:
+    """Wrap a plain dict result, encoding it (pretty-printed) once."""
+    if isinstance(data, JSONDocument) and data.raw is not None:
+        return data
+    return JSONDocument(data, dumps(data, indent=True))
+
+
+def raw_json(data: Any) -> bytes:
+    """Encoded bytes for ``data``, reusing a JSONDocument's cached encoding."""
+    if isinstance(data, JSONDocument):
+        if data.raw is None:
+            data.raw = dumps(data, indent=True)
+        return data.raw
+    return dumps(data, indent=True)
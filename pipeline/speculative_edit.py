@@ -0,0 +1,138 @@
+"""Full-document rewrites that only pay for the parts that change.
+
+Some chat edits need the whole document back, e.g. when a JSON Patch
+doesn't apply. Most of a regenerated 50–80K-char output is identical to the
+current one, and output tokens are what make the call slow.
+``rewrite_document()`` picks the cheapest route for the model in use:
+
+  - Predicted outputs: on models where ``supports_prediction()`` is true
+    (OpenAI gpt-4o / gpt-4.1), the model rewrites the full document with the
+    current JSON as the prediction. Matching tokens are accepted at
+    prefill speed.
+  - Speculative spans: elsewhere the document is split into addressable
+    spans (JSON Pointers, each at most ``SPAN_MAX_CHARS`` of JSON). The model
+    sees them all but returns only the spans it changes, which are spliced
+    back in locally.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from typing import Any, Callable
+
+from pipeline.json_patch import JSONPatchError, apply_patch, parse_pointer
+from pipeline.llm import _safe_json_loads, call_llm, supports_prediction
+
+logger = logging.getLogger(__name__)
+
+SPAN_MAX_CHARS = 4_000
+
+_SPAN_RE = re.compile(r'<span path="([^"]*)"((?:\s+\w+="[^"]*")*)\s*>(.*?)</span>', re.DOTALL)
+_ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+
+_PREDICTED_INSTRUCTIONS = """Apply the request above to the current document below and return the COMPLETE updated document as JSON only — no tags, no markdown fences, no commentary. Keep the same key order and 2-space indentation, and leave everything the request doesn't touch exactly as it is.
+
+## Current Document
+{document}"""
+
+_SPAN_INSTRUCTIONS = """Apply the request above to the current document below. The document is split into spans, each addressed by a JSON Pointer.
+
+Return ONLY the spans whose content changes — never unchanged ones:
+- Changed span: <span path="/pointer">new JSON value</span>
+- Deleted span: <span path="/pointer" op="remove"></span>
+- New field or list item: <span path="/pointer/to/new" op="add">JSON value</span> (use "-" as the last token to append to a list)
+
+No other text.
+
+## Current Document (spans)
+{spans}"""
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def split_spans(doc: Any, max_chars: int = SPAN_MAX_CHARS, pointer: str = "") -> list[tuple[str, Any]]:
+    """(pointer, value) leaves covering ``doc``, each encoding to <= max_chars where possible."""
+    if isinstance(doc, (dict, list)) and doc and (pointer == "" or len(json.dumps(doc)) > max_chars):
+        items = doc.items() if isinstance(doc, dict) else enumerate(doc)
+        spans: list[tuple[str, Any]] = []
+        for key, value in items:
+            spans.extend(split_spans(value, max_chars, f"{pointer}/{_escape(str(key))}"))
+        return spans
+    return [(pointer, doc)]
+
+
+def render_spans(doc: Any, max_chars: int = SPAN_MAX_CHARS) -> str:
+    return "\n".join(
+        f'<span path="{pointer}">{json.dumps(value, ensure_ascii=False)}</span>'
+        for pointer, value in split_spans(doc, max_chars)
+    )
+
+
+def spans_to_patch(text: str) -> list[dict[str, Any]]:
+    """Turn a span reply into JSON Patch ops (replaces, removes, then adds).
+
+    Span paths address the current document, so replaces go first and list
+    removals run from the highest index down before anything is inserted.
+    """
+    replaces, adds, removes = [], [], []
+    for path, attrs, body in _SPAN_RE.findall(text):
+        op = dict(_ATTR_RE.findall(attrs)).get("op", "replace")
+        parse_pointer(path)  # validates
+        if op == "remove":
+            removes.append({"op": "remove", "path": path})
+            continue
+        try:
+            value = json.loads(body.strip())
+        except json.JSONDecodeError as e:
+            raise JSONPatchError(f"Span {path} is not valid JSON: {e}") from e
+        (adds if op == "add" else replaces).append({"op": "add" if op == "add" else "replace", "path": path, "value": value})
+
+    def _remove_order(op: dict[str, Any]):
+        # Remove later list items first so earlier indexes stay valid.
+        return [int(t) if t.isdigit() else -1 for t in parse_pointer(op["path"])]
+
+    return replaces + sorted(removes, key=_remove_order, reverse=True) + adds
+
+
+def rewrite_document(
+    system_prompt: str,
+    request_prompt: str,
+    document: Any,
+    provider: str,
+    model: str | None,
+    llm: Callable[..., str] = call_llm,
+    **llm_kwargs: Any,
+) -> tuple[Any, str]:
+    """Rewrite ``document`` per ``request_prompt``; returns (new document, mode).
+
+    ``mode`` is "predicted" or "spans". Raises JSONPatchError / ValueError
+    when the reply can't be turned into a document.
+    """
+    if supports_prediction(provider, model):
+        current = json.dumps(document, indent=2, ensure_ascii=False)
+        reply = llm(
+            system_prompt=system_prompt,
+            user_prompt=f"{request_prompt}\n\n{_PREDICTED_INSTRUCTIONS.format(document=current)}",
+            provider=provider,
+            model=model,
+            prediction=current,
+            **llm_kwargs,
+        )
+        return _safe_json_loads(reply), "predicted"
+
+    reply = llm(
+        system_prompt=system_prompt,
+        user_prompt=f"{request_prompt}\n\n{_SPAN_INSTRUCTIONS.format(spans=render_spans(document))}",
+        provider=provider,
+        model=model,
+        **llm_kwargs,
+    )
+    patch = spans_to_patch(reply)
+    if not patch:
+        raise JSONPatchError("The rewrite returned no changed spans")
+    logger.info("Speculative rewrite: %d span edit(s) from a %d-char reply", len(patch), len(reply))
+    return apply_patch(document, patch), "spans"
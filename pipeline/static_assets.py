@@ -0,0 +1,170 @@
+"""Content-hashed, precompressed dashboard assets.
+
+StaticFiles served app.js / style.css uncompressed, with no cache headers,
+so every dashboard load re-downloaded ~180 KB. ``build()`` (run by
+``python build_static.py``, or at server start when the sources changed)
+writes ``static/dist/``. For each asset it produces:
+
+  - ``app.<hash>.js``, plus ``.gz`` and, when the optional ``brotli``
+    package is installed, ``.br`` variants;
+  - ``manifest.json``, mapping source names to hashed names.
+
+StaticAssets serves those under ``/assets/`` with
+``Cache-Control: immutable`` and picks the best precompressed variant from
+Accept-Encoding. It also rewrites index.html to reference the hashed names.
+index.html itself is served ``no-cache`` with an ETag, so a new build is
+picked up on the next load.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from pipeline.output_store import get_output_store
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only builds without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ASSETS = ("app.js", "style.css")
+ASSET_URL_PREFIX = "/assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def build(static_dir: Path, dist_dir: Path | None = None) -> dict[str, str]:
+    """Write hashed + precompressed copies of ASSETS; return the manifest.
+
+    Files are written atomically, the hashed asset last, so an interrupted
+    build never leaves a truncated file that later builds would keep.
+    """
+    store = get_output_store()
+    dist_dir = dist_dir or static_dir / "dist"
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    manifest: dict[str, str] = {}
+    for name in ASSETS:
+        src = static_dir / name
+        if not src.exists():
+            continue
+        data = src.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, suffix = name.rsplit(".", 1)
+        hashed = f"{stem}.{digest}.{suffix}"
+        manifest[name] = hashed
+        target = dist_dir / hashed
+        if not target.exists():
+            store.write_bytes(dist_dir / f"{hashed}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                store.write_bytes(dist_dir / f"{hashed}.br", brotli.compress(data, quality=11))
+            store.write_bytes(target, data)
+
+    # Drop builds of older sources.
+    keep = set(manifest.values())
+    for path in dist_dir.iterdir():
+        base = path.name.removesuffix(".gz").removesuffix(".br")
+        if path.name != "manifest.json" and base not in keep:
+            path.unlink(missing_ok=True)
+
+    store.write_json(dist_dir / "manifest.json", manifest)
+    logger.info(
+        "Static assets built: %s%s",
+        ", ".join(manifest.values()),
+        "" if brotli is not None else " (gzip only — install brotli for .br)",
+    )
+    return manifest
+
+
+def _accepted(request: Request) -> set[str]:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(token.lower())
+    return accepted
+
+
+class StaticAssets:
+    """Serves the built assets and the index.html that references them."""
+
+    def __init__(self, static_dir: Path, dist_dir: Path | None = None):
+        self.static_dir = static_dir
+        self.dist_dir = dist_dir or static_dir / "dist"
+        self.manifest: dict[str, str] = {}
+        self._index: dict[str, bytes] = {}  # encoding ("" = identity) -> body
+        self._index_etag = ""
+
+    def load(self, rebuild: bool = True):
+        """Load the manifest (rebuilding if sources changed) and render index.html."""
+        manifest_path = self.dist_dir / "manifest.json"
+        try:
+            self.manifest = json.loads(manifest_path.read_text("utf-8"))
+        except (OSError, ValueError):
+            self.manifest = {}
+        if rebuild and self._stale():
+            try:
+                self.manifest = build(self.static_dir, self.dist_dir)
+            except OSError as exc:
+                logger.warning("Static asset build failed (%s) — serving unhashed files", exc)
+                self.manifest = {}
+        self._render_index()
+
+    def _stale(self) -> bool:
+        for name in ASSETS:
+            src = self.static_dir / name
+            if not src.exists():
+                continue
+            hashed = self.manifest.get(name)
+            if not hashed or not (self.dist_dir / hashed).exists():
+                return True
+            digest = hashlib.sha256(src.read_bytes()).hexdigest()[:12]
+            if f".{digest}." not in hashed:
+                return True
+        return False
+
+    def _render_index(self):
+        html = (self.static_dir / "index.html").read_text("utf-8")
+        for name, hashed in self.manifest.items():
+            html = html.replace(f"/static/{name}", f"{ASSET_URL_PREFIX}{hashed}")
+        body = html.encode("utf-8")
+        self._index = {"": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self._index["br"] = brotli.compress(body, quality=11)
+        self._index_etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+    def index_response(self, request: Request) -> Response:
+        headers = {"ETag": self._index_etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == self._index_etag:
+            return Response(status_code=304, headers=headers)
+        accepted = _accepted(request)
+        for encoding, _suffix in _ENCODINGS:
+            if encoding in accepted and encoding in self._index:
+                headers["Content-Encoding"] = encoding
+                return Response(self._index[encoding], media_type="text/html", headers=headers)
+        return Response(self._index[""], media_type="text/html", headers=headers)
+
+    def asset_response(self, name: str, request: Request) -> Response | None:
+        """Precompressed immutable response for a hashed asset (None if unknown)."""
+        if name not in self.manifest.values():
+            return None
+        path = self.dist_dir / name
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        accepted = _accepted(request)
+        for encoding, suffix in _ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if encoding in accepted and variant.exists():
+                headers["Content-Encoding"] = encoding
+                return FileResponse(variant, media_type=media_type, headers=headers)
+        return FileResponse(path, media_type=media_type, headers=headers)
@@ -18,6 +18,7 @@ from pathlib import Path
 from typing import Any
 
 import config
+from pipeline.serialization import raw_json
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +38,26 @@ def _get_conn() -> sqlite3.Connection:
     return _local.conn
 
 
-def init_db():
-    """Create tables if they don't exist. Call once at startup."""
+# Version of the database schema *and* the on-disk outputs layout, kept in
+# ``PRAGMA user_version``. Bump it whenever init_db's DDL changes or a new
+# one-time startup migration is added; databases already at this version
+# skip the DDL, the ALTER probes and the caller's layout migrations.
+SCHEMA_VERSION = 1
+
+
+def init_db() -> int:
+    """Create/upgrade tables if the schema is behind. Call once at startup.
+
+    Returns the version the database was at. When it is below
+    SCHEMA_VERSION the caller runs its one-time migrations and then calls
+    ``set_schema_version(SCHEMA_VERSION)``.
+    """
     conn = _get_conn()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        logger.info("SQLite database ready: %s (schema v%d)", DB_PATH, version)
+        return version
+
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS brands (
             slug            TEXT    PRIMARY KEY,
@@ -76,6 +94,55 @@ def init_db():
 
         CREATE INDEX IF NOT EXISTS idx_agent_outputs_run
             ON agent_outputs(run_id);
+
+        CREATE TABLE IF NOT EXISTS copywriter_scripts (
+            fingerprint     TEXT    PRIMARY KEY,
+            brand_slug      TEXT    NOT NULL DEFAULT '',
+            angle_id        TEXT    NOT NULL DEFAULT '',
+            provider        TEXT    NOT NULL DEFAULT '',
+            model           TEXT    NOT NULL DEFAULT '',
+            script_json     TEXT    NOT NULL,
+            hit_count       INTEGER NOT NULL DEFAULT 0,
+            created_at      TEXT    NOT NULL DEFAULT (datetime('now', 'localtime'))
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_copywriter_scripts_brand
+            ON copywriter_scripts(brand_slug);
+
+        CREATE TABLE IF NOT EXISTS branches (
+            brand_slug            TEXT    NOT NULL,
+            id                    TEXT    NOT NULL,
+            label                 TEXT    NOT NULL DEFAULT '',
+            created_at            TEXT    NOT NULL DEFAULT (datetime('now', 'localtime')),
+            inputs_json           TEXT    NOT NULL DEFAULT '{}',
+            temperature           REAL,
+            model_overrides_json  TEXT    NOT NULL DEFAULT '{}',
+            status                TEXT    NOT NULL DEFAULT 'pending',
+            completed_agents_json TEXT    NOT NULL DEFAULT '[]',
+            failed_agents_json    TEXT    NOT NULL DEFAULT '[]',
+            available_agents      TEXT    NOT NULL DEFAULT '',
+            PRIMARY KEY (brand_slug, id)
+        );
+
+        CREATE TABLE IF NOT EXISTS jobs (
+            id              TEXT    PRIMARY KEY,
+            kind            TEXT    NOT NULL,
+            brand_slug      TEXT    NOT NULL DEFAULT '',
+            agent_slug      TEXT    NOT NULL DEFAULT '',
+            status          TEXT    NOT NULL DEFAULT 'queued',
+            request_json    TEXT    NOT NULL DEFAULT '{}',
+            result_json     TEXT,
+            error_message   TEXT,
+            progress        TEXT    NOT NULL DEFAULT '',
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            created_at      TEXT    NOT NULL DEFAULT (datetime('now', 'localtime')),
+            started_at      TEXT,
+            finished_at     TEXT,
+            elapsed_seconds REAL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_jobs_status
+            ON jobs(status, created_at);
     """)
 
     # Migration: add brand_slug column if missing (existing DBs)
@@ -87,7 +154,15 @@ def init_db():
         pass  # Column already exists
 
     conn.commit()
-    logger.info("SQLite database initialized: %s", DB_PATH)
+    logger.info("SQLite database initialized: %s (schema v%d -> v%d)", DB_PATH, version, SCHEMA_VERSION)
+    return version
+
+
+def set_schema_version(version: int):
+    """Record that the schema and layout migrations up to ``version`` are done."""
+    conn = _get_conn()
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+    conn.commit()
 
 
 # ---------------------------------------------------------------------------
@@ -209,8 +284,10 @@ def touch_brand(slug: str):
 def delete_brand(slug: str) -> bool:
     """Delete a brand. Returns True if found."""
     conn = _get_conn()
-    # Also delete associated pipeline runs
+    # Also delete associated pipeline runs and reusable scripts
     conn.execute("DELETE FROM pipeline_runs WHERE brand_slug=?", (slug,))
+    conn.execute("DELETE FROM copywriter_scripts WHERE brand_slug=?", (slug,))
+    conn.execute("DELETE FROM branches WHERE brand_slug=?", (slug,))
     cur = conn.execute("DELETE FROM brands WHERE slug=?", (slug,))
     conn.commit()
     return cur.rowcount > 0
@@ -228,6 +305,304 @@ def get_or_create_brand(brand_name: str, product_name: str, brief_inputs: dict)
     return create_brand(brand_name, product_name, brief_inputs)
 
 
+# ---------------------------------------------------------------------------
+# Branches (Phase 2+ directions, one row per brand × branch)
+# ---------------------------------------------------------------------------
+
+# Branch dict field -> (column, stored as JSON)
+_BRANCH_FIELDS: dict[str, tuple[str, bool]] = {
+    "label": ("label", False),
+    "created_at": ("created_at", False),
+    "inputs": ("inputs_json", True),
+    "temperature": ("temperature", False),
+    "model_overrides": ("model_overrides_json", True),
+    "status": ("status", False),
+    "completed_agents": ("completed_agents_json", True),
+    "failed_agents": ("failed_agents_json", True),
+}
+
+
+def _branch_from_row(row: sqlite3.Row) -> dict:
+    branch: dict[str, Any] = {"id": row["id"]}
+    for field, (column, is_json) in _BRANCH_FIELDS.items():
+        value = row[column]
+        if is_json:
+            try:
+                value = json.loads(value)
+            except (TypeError, ValueError):
+                value = {} if column in ("inputs_json", "model_overrides_json") else []
+        branch[field] = value
+    branch["available_agents"] = [a for a in (row["available_agents"] or "").split(",") if a]
+    return branch
+
+
+def _branch_values(fields: dict) -> dict[str, Any]:
+    values = {}
+    for field, value in fields.items():
+        if field not in _BRANCH_FIELDS:
+            raise ValueError(f"Unknown branch field: {field}")
+        column, is_json = _BRANCH_FIELDS[field]
+        values[column] = json.dumps(value, default=str) if is_json else value
+    return values
+
+
+def list_branches(brand_slug: str) -> list[dict]:
+    """All branches of a brand in creation order (with ``available_agents``)."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT * FROM branches WHERE brand_slug=? ORDER BY rowid",
+        (brand_slug,),
+    ).fetchall()
+    return [_branch_from_row(r) for r in rows]
+
+
+def get_branch(brand_slug: str, branch_id: str) -> dict | None:
+    """Get one branch, or None."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT * FROM branches WHERE brand_slug=? AND id=?",
+        (brand_slug, branch_id),
+    ).fetchone()
+    return _branch_from_row(row) if row else None
+
+
+def count_branches(brand_slug: str) -> int:
+    conn = _get_conn()
+    return conn.execute("SELECT COUNT(*) FROM branches WHERE brand_slug=?", (brand_slug,)).fetchone()[0]
+
+
+def create_branch(brand_slug: str, branch: dict):
+    """Insert a branch dict (``id`` plus any of the branch fields)."""
+    conn = _get_conn()
+    values = _branch_values({k: v for k, v in branch.items() if k not in ("id", "available_agents")})
+    values["available_agents"] = ",".join(branch.get("available_agents") or [])
+    columns = ["brand_slug", "id", *values]
+    conn.execute(
+        f"INSERT INTO branches ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        (brand_slug, branch["id"], *values.values()),
+    )
+    conn.commit()
+
+
+def update_branch(brand_slug: str, branch_id: str, updates: dict) -> bool:
+    """Update only the given fields of one branch. Returns True if found."""
+    if not updates:
+        return get_branch(brand_slug, branch_id) is not None
+    conn = _get_conn()
+    values = _branch_values(updates)
+    assignments = ", ".join(f"{column}=?" for column in values)
+    cur = conn.execute(
+        f"UPDATE branches SET {assignments} WHERE brand_slug=? AND id=?",
+        (*values.values(), brand_slug, branch_id),
+    )
+    conn.commit()
+    return cur.rowcount > 0
+
+
+def delete_branch(brand_slug: str, branch_id: str) -> bool:
+    """Delete one branch. Returns True if found."""
+    conn = _get_conn()
+    cur = conn.execute("DELETE FROM branches WHERE brand_slug=? AND id=?", (brand_slug, branch_id))
+    conn.commit()
+    return cur.rowcount > 0
+
+
+def clear_branches(brand_slug: str) -> list[str]:
+    """Delete all of a brand's branches. Returns the deleted branch IDs."""
+    conn = _get_conn()
+    ids = [r["id"] for r in conn.execute(
+        "SELECT id FROM branches WHERE brand_slug=? ORDER BY rowid", (brand_slug,),
+    ).fetchall()]
+    conn.execute("DELETE FROM branches WHERE brand_slug=?", (brand_slug,))
+    conn.commit()
+    return ids
+
+
+def mark_branch_output(brand_slug: str, branch_id: str, agent_slug: str, available: bool = True):
+    """Record that a branch's ``{agent_slug}_output.json`` was written (or removed).
+
+    The read-modify-write runs under BEGIN IMMEDIATE, so concurrent saves
+    for the same branch (a rerun and a branch step, two scheduler threads)
+    serialise instead of losing an update.
+    """
+    conn = _get_conn()
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT available_agents FROM branches WHERE brand_slug=? AND id=?",
+            (brand_slug, branch_id),
+        ).fetchone()
+        agents = [a for a in ((row["available_agents"] if row else "") or "").split(",") if a]
+        if row and available and agent_slug not in agents:
+            agents.append(agent_slug)
+        elif row and not available and agent_slug in agents:
+            agents.remove(agent_slug)
+        else:
+            conn.rollback()
+            return
+        conn.execute(
+            "UPDATE branches SET available_agents=? WHERE brand_slug=? AND id=?",
+            (",".join(sorted(agents)), brand_slug, branch_id),
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def migrate_branch_manifests(output_dir: Path) -> int:
+    """One-time import of ``<brand>/branches/manifest.json`` files.
+
+    Each imported manifest is renamed to ``manifest.json.migrated`` so it is
+    never read again. Returns the number of branches imported.
+    """
+    imported = 0
+    for manifest in sorted(output_dir.glob("*/branches/manifest.json")):
+        brand_slug = manifest.parent.parent.name
+        try:
+            branches = json.loads(manifest.read_text("utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable branch manifest: %s", manifest)
+            continue
+        for b in branches if isinstance(branches, list) else []:
+            if not isinstance(b, dict) or not b.get("id") or get_branch(brand_slug, b["id"]):
+                continue
+            bdir = manifest.parent / b["id"]
+            fields = {k: v for k, v in b.items() if k in _BRANCH_FIELDS and v is not None}
+            fields["id"] = b["id"]
+            fields["available_agents"] = sorted(
+                p.name.removesuffix("_output.json") for p in bdir.glob("*_output.json")
+            )
+            create_branch(brand_slug, fields)
+            imported += 1
+        manifest.rename(manifest.with_name("manifest.json.migrated"))
+    if imported:
+        logger.info("Migrated %d branches from manifest files into SQLite", imported)
+    return imported
+
+
+# ---------------------------------------------------------------------------
+# Background jobs (e.g. agent reruns) — persisted so they survive restarts
+# ---------------------------------------------------------------------------
+
+JOB_ACTIVE_STATUSES = ("queued", "running")
+
+
+def _job_from_row(row: sqlite3.Row) -> dict:
+    job: dict[str, Any] = {
+        "id": row["id"],
+        "kind": row["kind"],
+        "brand_slug": row["brand_slug"],
+        "agent_slug": row["agent_slug"],
+        "status": row["status"],
+        "progress": row["progress"],
+        "attempts": row["attempts"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "elapsed_seconds": row["elapsed_seconds"],
+    }
+    try:
+        job["request"] = json.loads(row["request_json"])
+    except (TypeError, ValueError):
+        job["request"] = {}
+    if row["result_json"]:
+        try:
+            job["result"] = json.loads(row["result_json"])
+        except ValueError:
+            job["result"] = None
+    if row["error_message"]:
+        job["error"] = row["error_message"]
+    return job
+
+
+def create_job(job_id: str, kind: str, request: dict, brand_slug: str = "", agent_slug: str = "") -> dict:
+    """Insert a queued job. Returns it."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT INTO jobs (id, kind, brand_slug, agent_slug, request_json) VALUES (?,?,?,?,?)",
+        (job_id, kind, brand_slug, agent_slug, json.dumps(request, default=str)),
+    )
+    conn.commit()
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> dict | None:
+    conn = _get_conn()
+    row = conn.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+    return _job_from_row(row) if row else None
+
+
+def list_jobs(status: str | None = None, brand_slug: str | None = None, limit: int = 50) -> list[dict]:
+    """Jobs, newest first, optionally filtered by status and brand."""
+    conn = _get_conn()
+    where, params = [], []
+    if status:
+        where.append("status=?")
+        params.append(status)
+    if brand_slug is not None:
+        where.append("brand_slug=?")
+        params.append(brand_slug)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+    rows = conn.execute(
+        f"SELECT * FROM jobs {clause} ORDER BY created_at DESC, rowid DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    return [_job_from_row(r) for r in rows]
+
+
+def start_job(job_id: str):
+    conn = _get_conn()
+    conn.execute(
+        """
+        UPDATE jobs SET status='running', attempts=attempts+1,
+            started_at=datetime('now','localtime'), progress=''
+        WHERE id=?
+        """,
+        (job_id,),
+    )
+    conn.commit()
+
+
+def update_job_progress(job_id: str, progress: str):
+    conn = _get_conn()
+    conn.execute("UPDATE jobs SET progress=? WHERE id=?", (progress, job_id))
+    conn.commit()
+
+
+def finish_job(job_id: str, status: str, elapsed: float, result: dict | None = None, error: str | None = None):
+    """Mark a job completed/failed with its result or error."""
+    conn = _get_conn()
+    conn.execute(
+        """
+        UPDATE jobs SET status=?, result_json=?, error_message=?, elapsed_seconds=?,
+            finished_at=datetime('now','localtime')
+        WHERE id=?
+        """,
+        (status, json.dumps(result, default=str) if result is not None else None, error, round(elapsed, 1), job_id),
+    )
+    conn.commit()
+
+
+def requeue_interrupted_jobs() -> int:
+    """Put jobs left 'running' by a previous process back in the queue."""
+    conn = _get_conn()
+    cur = conn.execute("UPDATE jobs SET status='queued', progress='Requeued after restart' WHERE status='running'")
+    conn.commit()
+    return cur.rowcount
+
+
+def queued_jobs() -> list[dict]:
+    """Queued jobs, oldest first."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT * FROM jobs WHERE status='queued' ORDER BY created_at, rowid",
+    ).fetchall()
+    return [_job_from_row(r) for r in rows]
+
+
 # ---------------------------------------------------------------------------
 # Pipeline runs
 # ---------------------------------------------------------------------------
@@ -287,11 +662,12 @@ def delete_run(run_id: int) -> bool:
     return cur.rowcount > 0
 
 
-def list_runs(limit: int = 50) -> list[dict]:
-    """List recent runs, newest first."""
+def list_runs(limit: int = 50, brand_slug: str | None = None) -> list[dict]:
+    """List recent runs, newest first (only ``brand_slug``'s runs if given)."""
     conn = _get_conn()
+    clause, params = ("WHERE COALESCE(r.brand_slug, '')=?", [brand_slug]) if brand_slug is not None else ("", [])
     rows = conn.execute(
-        """
+        f"""
         SELECT
             r.id,
             r.created_at,
@@ -302,10 +678,11 @@ def list_runs(limit: int = 50) -> list[dict]:
             r.brand_slug,
             (SELECT COUNT(*) FROM agent_outputs ao WHERE ao.run_id = r.id AND ao.status='completed') AS agent_count
         FROM pipeline_runs r
+        {clause}
         ORDER BY r.id DESC
         LIMIT ?
         """,
-        (limit,),
+        (*params, limit),
     ).fetchall()
 
     results = []
@@ -386,6 +763,63 @@ def get_run(run_id: int) -> dict | None:
     }
 
 
+def get_run_json(run_id: int) -> str | None:
+    """Same document as get_run(), as JSON text.
+
+    Stored ``output_json`` columns are spliced in verbatim instead of being
+    decoded and re-encoded, which dominates the cost for large runs.
+    """
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT * FROM pipeline_runs WHERE id=?", (run_id,)
+    ).fetchone()
+    if not row:
+        return None
+
+    agents = conn.execute(
+        """
+        SELECT agent_slug, agent_name, status, output_json, error_message, elapsed_seconds, created_at
+        FROM agent_outputs
+        WHERE run_id=?
+        ORDER BY id
+        """,
+        (run_id,),
+    ).fetchall()
+
+    agent_parts = []
+    for a in agents:
+        entry: dict[str, Any] = {
+            "agent_slug": a["agent_slug"],
+            "agent_name": a["agent_name"],
+            "status": a["status"],
+            "elapsed_seconds": a["elapsed_seconds"],
+            "created_at": a["created_at"],
+        }
+        if a["error_message"]:
+            entry["error"] = a["error_message"]
+        part = json.dumps(entry)
+        if a["output_json"]:
+            part = f'{part[:-1]}, "data": {a["output_json"]}}}'
+        agent_parts.append(part)
+
+    inputs = {}
+    try:
+        inputs = json.loads(row["inputs_json"])
+    except Exception:
+        pass
+
+    head = json.dumps({
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "phases": row["phases"],
+        "status": row["status"],
+        "elapsed_seconds": row["elapsed_seconds"],
+        "label": row["label"] or "",
+        "inputs": inputs,
+    })
+    return f'{head[:-1]}, "agents": [{", ".join(agent_parts)}]}}'
+
+
 # ---------------------------------------------------------------------------
 # Agent outputs
 # ---------------------------------------------------------------------------
@@ -411,9 +845,55 @@ def save_agent_output(
             agent_slug,
             agent_name,
             status,
-            json.dumps(output) if output else None,
+            raw_json(output).decode("utf-8") if output else None,
             error,
             round(elapsed, 1),
         ),
     )
     conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Copywriter script store (reuse by job fingerprint)
+# ---------------------------------------------------------------------------
+
+def get_cached_script(fingerprint: str) -> dict | None:
+    """Return a previously written Agent 04 script for this job fingerprint."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT script_json FROM copywriter_scripts WHERE fingerprint=?",
+        (fingerprint,),
+    ).fetchone()
+    if not row:
+        return None
+    try:
+        script = json.loads(row["script_json"])
+    except Exception:
+        return None
+    conn.execute(
+        "UPDATE copywriter_scripts SET hit_count=hit_count+1 WHERE fingerprint=?",
+        (fingerprint,),
+    )
+    conn.commit()
+    return script if isinstance(script, dict) else None
+
+
+def save_cached_script(
+    fingerprint: str,
+    script: dict,
+    brand_slug: str = "",
+    angle_id: str = "",
+    provider: str = "",
+    model: str = "",
+):
+    """Store an Agent 04 script under its job fingerprint (latest write wins)."""
+    conn = _get_conn()
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO copywriter_scripts
+            (fingerprint, brand_slug, angle_id, provider, model, script_json)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (fingerprint, brand_slug, angle_id, provider, model, json.dumps(script)),
+    )
+    conn.commit()
@@ -0,0 +1,641 @@
+"""Durable work queue shared by the API server and stand-alone workers.
+
+The API server enqueues tasks (agent runs, copywriter/hook shards) and
+waits on their results; ``worker.py`` processes on this or other machines
+lease and run them. Semantics, identical across backends:
+
+  - ``enqueue()`` is idempotent per ``idempotency_key``: re-enqueueing the
+    same key returns the existing task instead of a duplicate.
+  - ``lease()`` hands a ready task to one worker for ``lease_seconds`` and
+    issues a fresh ``lease_token``. The worker ``heartbeat()``s to extend
+    it; a lease that expires (crashed or partitioned worker) puts the task
+    back in the queue, or fails it once ``max_attempts`` leases were used.
+  - ``complete()`` commits a result only for the current lease token, and
+    repeating the same commit is a no-op that still reports success, so a
+    worker can retry a commit whose acknowledgement it lost. A stale
+    worker's result (its lease expired and was re-issued) is rejected.
+  - ``fail()`` retries with backoff until ``max_attempts``.
+  - ``cancel()`` drops a queued task; for a leased one, the worker's next
+    heartbeat returns False and it aborts.
+
+Backends: SQLiteWorkQueue (single host, or several workers sharing the DB
+file), MemoryWorkQueue (in-process stand-in for tests), or any class named
+as ``"module:Class"`` in WORK_QUEUE_BACKEND that implements WorkQueue.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import config
+from pipeline.cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+QUEUED, LEASED, COMPLETED, FAILED, CANCELLED = "queued", "leased", "completed", "failed", "cancelled"
+FINAL_STATUSES = frozenset({COMPLETED, FAILED, CANCELLED})
+
+
+class WorkQueueError(RuntimeError):
+    """A queued task failed, was cancelled, or could not be waited on."""
+
+
+class WorkQueue(ABC):
+    """Backend interface. Tasks are plain dicts (see ``_task_dict``)."""
+
+    @abstractmethod
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        idempotency_key: str | None = None,
+        priority: int = 0,
+        max_attempts: int | None = None,
+    ) -> dict[str, Any]: ...
+
+    @abstractmethod
+    def lease(self, worker_id: str, kinds: list[str] | None = None, lease_seconds: float | None = None) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def heartbeat(self, task_id: str, lease_token: str, lease_seconds: float | None = None, progress: str | None = None) -> bool: ...
+
+    @abstractmethod
+    def complete(self, task_id: str, lease_token: str, result: dict[str, Any]) -> bool: ...
+
+    @abstractmethod
+    def fail(self, task_id: str, lease_token: str, error: str, retry: bool = True) -> str: ...
+
+    @abstractmethod
+    def cancel(self, task_id: str) -> bool: ...
+
+    @abstractmethod
+    def get(self, task_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def list(self, status: str | None = None, limit: int = 50) -> list[dict[str, Any]]: ...
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(60.0, 2.0 ** max(0, attempts - 1))
+
+
+def _lease_seconds(value: float | None) -> float:
+    return float(value if value is not None else config.WORK_QUEUE_LEASE_SECONDS)
+
+
+# ---------------------------------------------------------------------------
+# In-memory backend
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _MemoryTask:
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    idempotency_key: str | None
+    priority: int
+    max_attempts: int
+    status: str = QUEUED
+    attempts: int = 0
+    available_at: float = field(default_factory=time.time)
+    worker_id: str | None = None
+    lease_token: str | None = None
+    lease_expires_at: float | None = None
+    progress: str = ""
+    cancel_requested: bool = False
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+
+class MemoryWorkQueue(WorkQueue):
+    """Thread-safe in-process queue with the same semantics as SQLite."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tasks: dict[str, _MemoryTask] = {}
+        self._keys: dict[str, str] = {}
+
+    def enqueue(self, kind, payload, *, idempotency_key=None, priority=0, max_attempts=None):
+        with self._lock:
+            if idempotency_key and idempotency_key in self._keys:
+                return self._dict(self._tasks[self._keys[idempotency_key]])
+            task = _MemoryTask(
+                id=secrets.token_hex(8),
+                kind=kind,
+                payload=json.loads(json.dumps(payload, default=str)),
+                idempotency_key=idempotency_key,
+                priority=priority,
+                max_attempts=max_attempts or config.WORK_QUEUE_MAX_ATTEMPTS,
+                available_at=self._clock(),
+                created_at=self._clock(),
+            )
+            self._tasks[task.id] = task
+            if idempotency_key:
+                self._keys[idempotency_key] = task.id
+            return self._dict(task)
+
+    def lease(self, worker_id, kinds=None, lease_seconds=None):
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            ready = [
+                t for t in self._tasks.values()
+                if t.status == QUEUED and t.available_at <= now and (not kinds or t.kind in kinds)
+            ]
+            if not ready:
+                return None
+            task = min(ready, key=lambda t: (-t.priority, t.created_at))
+            task.status = LEASED
+            task.attempts += 1
+            task.worker_id = worker_id
+            task.lease_token = secrets.token_hex(8)
+            task.lease_expires_at = now + _lease_seconds(lease_seconds)
+            task.progress = ""
+            return self._dict(task)
+
+    def heartbeat(self, task_id, lease_token, lease_seconds=None, progress=None):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.status != LEASED or task.lease_token != lease_token or task.cancel_requested:
+                return False
+            task.lease_expires_at = self._clock() + _lease_seconds(lease_seconds)
+            if progress is not None:
+                task.progress = progress
+            return True
+
+    def complete(self, task_id, lease_token, result):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.lease_token != lease_token:
+                return False
+            if task.status == COMPLETED:
+                return True
+            if task.status != LEASED:
+                return False
+            task.status = COMPLETED
+            task.result = json.loads(json.dumps(result, default=str))
+            task.finished_at = self._clock()
+            return True
+
+    def fail(self, task_id, lease_token, error, retry=True):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.lease_token != lease_token or task.status != LEASED:
+                return task.status if task else FAILED
+            task.error = error
+            if task.cancel_requested:
+                task.status, task.finished_at = CANCELLED, self._clock()
+            elif retry and task.attempts < task.max_attempts:
+                task.status = QUEUED
+                task.available_at = self._clock() + _retry_delay(task.attempts)
+            else:
+                task.status, task.finished_at = FAILED, self._clock()
+            return task.status
+
+    def cancel(self, task_id):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.status in FINAL_STATUSES:
+                return False
+            if task.status == QUEUED:
+                task.status, task.finished_at = CANCELLED, self._clock()
+            else:
+                task.cancel_requested = True
+            return True
+
+    def get(self, task_id):
+        with self._lock:
+            self._expire(self._clock())
+            task = self._tasks.get(task_id)
+            return self._dict(task) if task else None
+
+    def list(self, status=None, limit=50):
+        with self._lock:
+            tasks = [t for t in self._tasks.values() if not status or t.status == status]
+            tasks.sort(key=lambda t: t.created_at, reverse=True)
+            return [self._dict(t) for t in tasks[:limit]]
+
+    def _expire(self, now: float):
+        for task in self._tasks.values():
+            if task.status == LEASED and task.lease_expires_at is not None and task.lease_expires_at < now:
+                if task.cancel_requested:
+                    task.status, task.finished_at = CANCELLED, now
+                elif task.attempts >= task.max_attempts:
+                    task.status, task.finished_at = FAILED, now
+                    task.error = f"Lease expired after {task.attempts} attempt(s)"
+                else:
+                    task.status, task.available_at = QUEUED, now
+
+    @staticmethod
+    def _dict(task: _MemoryTask) -> dict[str, Any]:
+        return {
+            "id": task.id, "kind": task.kind, "payload": task.payload,
+            "idempotency_key": task.idempotency_key, "priority": task.priority,
+            "status": task.status, "attempts": task.attempts, "max_attempts": task.max_attempts,
+            "worker_id": task.worker_id, "lease_token": task.lease_token,
+            "lease_expires_at": task.lease_expires_at, "progress": task.progress,
+            "cancel_requested": task.cancel_requested, "result": task.result,
+            "error": task.error, "created_at": task.created_at, "finished_at": task.finished_at,
+        }
+
+
+# ---------------------------------------------------------------------------
+# SQLite backend
+# ---------------------------------------------------------------------------
+
+class SQLiteWorkQueue(WorkQueue):
+    """Queue in a SQLite file; leases are taken inside BEGIN IMMEDIATE."""
+
+    def __init__(self, db_path: Path | str, clock: Callable[[], float] = time.time):
+        self.db_path = str(db_path)
+        self._clock = clock
+        self._local = threading.local()
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS work_tasks (
+                id                TEXT    PRIMARY KEY,
+                kind              TEXT    NOT NULL,
+                payload_json      TEXT    NOT NULL,
+                idempotency_key   TEXT    UNIQUE,
+                priority          INTEGER NOT NULL DEFAULT 0,
+                status            TEXT    NOT NULL DEFAULT 'queued',
+                attempts          INTEGER NOT NULL DEFAULT 0,
+                max_attempts      INTEGER NOT NULL DEFAULT 3,
+                available_at      REAL    NOT NULL,
+                worker_id         TEXT,
+                lease_token       TEXT,
+                lease_expires_at  REAL,
+                progress          TEXT    NOT NULL DEFAULT '',
+                cancel_requested  INTEGER NOT NULL DEFAULT 0,
+                result_json       TEXT,
+                error             TEXT,
+                created_at        REAL    NOT NULL,
+                finished_at       REAL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_work_tasks_ready
+                ON work_tasks(status, available_at);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def enqueue(self, kind, payload, *, idempotency_key=None, priority=0, max_attempts=None):
+        now = self._clock()
+
+        def _insert(conn):
+            if idempotency_key:
+                row = conn.execute("SELECT * FROM work_tasks WHERE idempotency_key=?", (idempotency_key,)).fetchone()
+                if row:
+                    return row
+            task_id = secrets.token_hex(8)
+            conn.execute(
+                """
+                INSERT INTO work_tasks (id, kind, payload_json, idempotency_key, priority,
+                    max_attempts, available_at, created_at)
+                VALUES (?,?,?,?,?,?,?,?)
+                """,
+                (task_id, kind, json.dumps(payload, default=str), idempotency_key, priority,
+                 max_attempts or config.WORK_QUEUE_MAX_ATTEMPTS, now, now),
+            )
+            return conn.execute("SELECT * FROM work_tasks WHERE id=?", (task_id,)).fetchone()
+
+        return _task_dict(self._write(_insert))
+
+    def lease(self, worker_id, kinds=None, lease_seconds=None):
+        now = self._clock()
+
+        def _lease(conn):
+            self._expire(conn, now)
+            clause, params = "", []
+            if kinds:
+                clause = f"AND kind IN ({','.join('?' * len(kinds))})"
+                params = list(kinds)
+            row = conn.execute(
+                f"""
+                SELECT id FROM work_tasks
+                WHERE status='queued' AND available_at<=? {clause}
+                ORDER BY priority DESC, created_at, rowid LIMIT 1
+                """,
+                (now, *params),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE work_tasks SET status='leased', attempts=attempts+1, worker_id=?,
+                    lease_token=?, lease_expires_at=?, progress=''
+                WHERE id=?
+                """,
+                (worker_id, secrets.token_hex(8), now + _lease_seconds(lease_seconds), row["id"]),
+            )
+            return conn.execute("SELECT * FROM work_tasks WHERE id=?", (row["id"],)).fetchone()
+
+        row = self._write(_lease)
+        return _task_dict(row) if row else None
+
+    def heartbeat(self, task_id, lease_token, lease_seconds=None, progress=None):
+        cur = self._conn().execute(
+            """
+            UPDATE work_tasks SET lease_expires_at=?, progress=COALESCE(?, progress)
+            WHERE id=? AND lease_token=? AND status='leased' AND cancel_requested=0
+            """,
+            (self._clock() + _lease_seconds(lease_seconds), progress, task_id, lease_token),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, task_id, lease_token, result):
+        def _complete(conn):
+            cur = conn.execute(
+                """
+                UPDATE work_tasks SET status='completed', result_json=?, finished_at=?
+                WHERE id=? AND lease_token=? AND status='leased'
+                """,
+                (json.dumps(result, default=str), self._clock(), task_id, lease_token),
+            )
+            if cur.rowcount == 1:
+                return True
+            row = conn.execute(
+                "SELECT 1 FROM work_tasks WHERE id=? AND lease_token=? AND status='completed'",
+                (task_id, lease_token),
+            ).fetchone()
+            return row is not None
+
+        return self._write(_complete)
+
+    def fail(self, task_id, lease_token, error, retry=True):
+        now = self._clock()
+
+        def _fail(conn):
+            row = conn.execute("SELECT * FROM work_tasks WHERE id=?", (task_id,)).fetchone()
+            if row is None:
+                return FAILED
+            if row["lease_token"] != lease_token or row["status"] != LEASED:
+                return row["status"]
+            if row["cancel_requested"]:
+                status, available_at, finished = CANCELLED, row["available_at"], now
+            elif retry and row["attempts"] < row["max_attempts"]:
+                status, available_at, finished = QUEUED, now + _retry_delay(row["attempts"]), None
+            else:
+                status, available_at, finished = FAILED, row["available_at"], now
+            conn.execute(
+                "UPDATE work_tasks SET status=?, error=?, available_at=?, finished_at=? WHERE id=?",
+                (status, error, available_at, finished, task_id),
+            )
+            return status
+
+        return self._write(_fail)
+
+    def cancel(self, task_id):
+        now = self._clock()
+
+        def _cancel(conn):
+            cur = conn.execute(
+                "UPDATE work_tasks SET status='cancelled', finished_at=? WHERE id=? AND status='queued'",
+                (now, task_id),
+            )
+            if cur.rowcount:
+                return True
+            cur = conn.execute(
+                "UPDATE work_tasks SET cancel_requested=1 WHERE id=? AND status='leased'", (task_id,),
+            )
+            return cur.rowcount == 1
+
+        return self._write(_cancel)
+
+    def get(self, task_id):
+        row = self._conn().execute("SELECT * FROM work_tasks WHERE id=?", (task_id,)).fetchone()
+        if row is not None and row["status"] == LEASED and row["lease_expires_at"] < self._clock():
+            self._write(lambda conn: self._expire(conn, self._clock()))
+            row = self._conn().execute("SELECT * FROM work_tasks WHERE id=?", (task_id,)).fetchone()
+        return _task_dict(row) if row else None
+
+    def list(self, status=None, limit=50):
+        clause, params = ("WHERE status=?", [status]) if status else ("", [])
+        rows = self._conn().execute(
+            f"SELECT * FROM work_tasks {clause} ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [_task_dict(r) for r in rows]
+
+    @staticmethod
+    def _expire(conn: sqlite3.Connection, now: float):
+        """Return expired leases to the queue (or fail/cancel them)."""
+        conn.execute(
+            """
+            UPDATE work_tasks SET status='cancelled', finished_at=?
+            WHERE status='leased' AND lease_expires_at<? AND cancel_requested=1
+            """,
+            (now, now),
+        )
+        conn.execute(
+            """
+            UPDATE work_tasks SET status='failed', finished_at=?,
+                error='Lease expired after ' || attempts || ' attempt(s)'
+            WHERE status='leased' AND lease_expires_at<? AND attempts>=max_attempts
+            """,
+            (now, now),
+        )
+        conn.execute(
+            "UPDATE work_tasks SET status='queued', available_at=? WHERE status='leased' AND lease_expires_at<?",
+            (now, now),
+        )
+
+
+def _task_dict(row: sqlite3.Row) -> dict[str, Any]:
+    task = dict(row)
+    task["payload"] = json.loads(task.pop("payload_json") or "{}")
+    raw = task.pop("result_json")
+    task["result"] = json.loads(raw) if raw else None
+    task["cancel_requested"] = bool(task["cancel_requested"])
+    return task
+
+
+# ---------------------------------------------------------------------------
+# Workers and waiting
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TaskContext:
+    """What a task handler gets besides the payload."""
+
+    task: dict[str, Any]
+    cancel_token: CancelToken
+    _progress: list[str | None] = field(default_factory=lambda: [None])
+
+    def progress(self, text: str):
+        """Report a status line; sent with the next heartbeat."""
+        self._progress[0] = text
+
+
+TaskHandler = Callable[[dict[str, Any], TaskContext], dict[str, Any]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{secrets.token_hex(3)}"
+
+
+class Worker:
+    """Leases tasks of the registered kinds and runs them one at a time."""
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        handlers: dict[str, TaskHandler],
+        worker_id: str | None = None,
+        lease_seconds: float | None = None,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handlers = dict(handlers)
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = _lease_seconds(lease_seconds)
+        self.poll_interval = poll_interval
+
+    def run_forever(self, stop: threading.Event | None = None):
+        stop = stop or threading.Event()
+        logger.info("Worker %s polling for %s", self.worker_id, ", ".join(sorted(self.handlers)))
+        while not stop.is_set():
+            if not self.run_once():
+                stop.wait(self.poll_interval)
+
+    def run_once(self) -> bool:
+        """Lease and run one task. Returns False if none was ready."""
+        task = self.queue.lease(self.worker_id, list(self.handlers), self.lease_seconds)
+        if task is None:
+            return False
+        ctx = TaskContext(task=task, cancel_token=CancelToken())
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(task, ctx, done), daemon=True)
+        beat.start()
+        logger.info("Task %s (%s) leased, attempt %d", task["id"], task["kind"], task["attempts"])
+        try:
+            result = self.handlers[task["kind"]](task["payload"], ctx)
+        except Exception as exc:
+            done.set()
+            beat.join()
+            if ctx.cancel_token.cancelled:
+                logger.info("Task %s (%s) stopped: %s", task["id"], task["kind"], exc)
+            else:
+                logger.exception("Task %s (%s) failed", task["id"], task["kind"])
+            status = self.queue.fail(task["id"], task["lease_token"], f"{type(exc).__name__}: {exc}",
+                                     retry=not ctx.cancel_token.cancelled)
+            logger.info("Task %s is now %s", task["id"], status)
+            return True
+        done.set()
+        beat.join()
+        for attempt in range(3):
+            try:
+                if not self.queue.complete(task["id"], task["lease_token"], result):
+                    logger.warning("Task %s: lease lost, result discarded", task["id"])
+                break
+            except Exception:
+                # Commits are idempotent per lease token, so retrying is safe.
+                logger.exception("Task %s: committing result failed (attempt %d)", task["id"], attempt + 1)
+                time.sleep(1.0)
+        else:
+            logger.error("Task %s (%s): result could not be committed, giving up", task["id"], task["kind"])
+            try:
+                status = self.queue.fail(task["id"], task["lease_token"], "Result could not be committed")
+                logger.info("Task %s is now %s", task["id"], status)
+            except Exception:
+                # The lease expires and the task is re-run or failed there.
+                logger.exception("Task %s: marking it failed also failed", task["id"])
+        return True
+
+    def _heartbeat(self, task: dict[str, Any], ctx: TaskContext, done: threading.Event):
+        # Often enough to keep the lease and to pass progress along promptly.
+        interval = max(0.5, min(5.0, self.lease_seconds / 3))
+        while not done.wait(interval):
+            progress, ctx._progress[0] = ctx._progress[0], None
+            try:
+                alive = self.queue.heartbeat(task["id"], task["lease_token"], self.lease_seconds, progress)
+            except Exception:
+                logger.exception("Task %s: heartbeat failed", task["id"])
+                continue
+            if not alive:
+                logger.warning("Task %s: lease lost or cancelled — aborting", task["id"])
+                ctx.cancel_token.cancel("Task cancelled")
+                return
+
+
+def wait_for_result(
+    queue: WorkQueue,
+    task_id: str,
+    cancel_check: Callable[[], bool] | None = None,
+    on_progress: Callable[[str], None] | None = None,
+    poll_interval: float = 0.5,
+) -> dict[str, Any]:
+    """Block until ``task_id`` finishes; returns its result or raises WorkQueueError."""
+    last_progress = ""
+    cancel_sent = False
+    while True:
+        task = queue.get(task_id)
+        if task is None:
+            raise WorkQueueError(f"Task {task_id} disappeared from the queue")
+        if on_progress and task["progress"] and task["progress"] != last_progress:
+            last_progress = task["progress"]
+            on_progress(last_progress)
+        if task["status"] == COMPLETED:
+            return task["result"] or {}
+        if task["status"] in (FAILED, CANCELLED):
+            raise WorkQueueError(f"Task {task_id} {task['status']}: {task['error'] or 'no error recorded'}")
+        if cancel_check is not None and not cancel_sent and cancel_check():
+            queue.cancel(task_id)
+            cancel_sent = True
+        time.sleep(poll_interval)
+
+
+_queue: WorkQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_work_queue() -> WorkQueue | None:
+    """The configured queue backend, or None when WORK_QUEUE_BACKEND is unset."""
+    global _queue
+    backend = config.WORK_QUEUE_BACKEND
+    if not backend:
+        return None
+    with _queue_lock:
+        if _queue is None:
+            if backend == "sqlite":
+                _queue = SQLiteWorkQueue(config.WORK_QUEUE_DB)
+            elif backend == "memory":
+                _queue = MemoryWorkQueue()
+            else:
+                module_name, _, class_name = backend.partition(":")
+                cls = getattr(importlib.import_module(module_name), class_name)
+                _queue = cls()
+            logger.info("Work queue backend: %s", type(_queue).__name__)
+    return _queue
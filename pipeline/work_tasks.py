@@ -0,0 +1,171 @@
+"""Task kinds for the work queue (pipeline/work_queue.py).
+
+``agent_run`` covers every agent execution the server hands off: pipeline
+agents, reruns, and the parallel copywriter / hook shards (each shard is
+one agent run). Agent 1A's deep-research polling happens inside its run,
+so it moves to the worker along with it.
+
+The worker runs the agent against a scratch output directory and returns
+the output JSON, usage and stream timings in the task result. The API
+server writes the file into the real brand/branch directory itself
+(``run_agent_remote``), so workers don't need to share the outputs volume.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import secrets
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable
+
+from pipeline.base_agent import BaseAgent
+from pipeline.llm import (
+    active_api_key,
+    add_stream_stats,
+    begin_usage_scope,
+    collect_stream_stats,
+    get_usage_log,
+    merge_usage,
+    reset_stream_stats,
+    use_api_key,
+)
+from pipeline.output_store import get_output_store
+from pipeline.progress import ProgressReporter, current_reporter, forward_progress, use_progress_reporter
+from pipeline.provider_pool import find_pool_member
+from pipeline.serialization import JSONDocument, loads, model_bytes
+from pipeline.work_queue import TaskContext, WorkQueue, wait_for_result
+
+logger = logging.getLogger(__name__)
+
+AGENT_RUN = "agent_run"
+
+
+def agent_ref(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _agent_class(ref: str) -> type[BaseAgent]:
+    """Resolve an ``agents.<module>:<Class>`` reference from a task payload."""
+    module_name, _, class_name = ref.partition(":")
+    if not module_name.startswith("agents."):
+        raise ValueError(f"Refusing to load agent outside the agents package: {ref}")
+    cls = getattr(importlib.import_module(module_name), class_name, None)
+    if not (isinstance(cls, type) and issubclass(cls, BaseAgent)):
+        raise ValueError(f"Not an agent class: {ref}")
+    return cls
+
+
+def run_agent_task(payload: dict[str, Any], ctx: TaskContext) -> dict[str, Any]:
+    """Worker side of ``agent_run``."""
+    cls = _agent_class(payload["agent"])
+    inputs = dict(payload.get("inputs") or {})
+    if payload.get("skip_deep_research"):
+        inputs["_skip_deep_research"] = True
+    inputs["_cancel_token"] = ctx.cancel_token
+
+    key_id = payload.get("key_id") or ""
+    member = find_pool_member(key_id) if key_id else None
+    if key_id and member is None:
+        logger.warning("Pool key %s is not configured on this worker — using the default key", key_id)
+
+    begin_usage_scope()
+    reset_stream_stats()
+    # Progress events ride on heartbeats as JSON; the server re-tags them.
+    progress = payload.get("progress")
+    reporter = ProgressReporter(lambda e: ctx.progress(json.dumps(e)), **progress) if progress else None
+    with use_progress_reporter(reporter):
+        with tempfile.TemporaryDirectory(prefix="agent_run_") as scratch:
+            agent = cls(
+                provider=payload.get("provider"),
+                model=payload.get("model"),
+                temperature=payload.get("temperature"),
+                output_dir=Path(scratch),
+            )
+            key = use_api_key(member.provider, member.key_id, member.api_key) if member else nullcontext()
+            with key:
+                result = agent.run(inputs)
+            saved = agent.last_output_raw is not None
+            raw = agent.last_output_raw if saved else model_bytes(result)
+    return {
+        "output": raw.decode("utf-8"),
+        "saved": saved,
+        "usage": get_usage_log(),
+        "stream_stats": collect_stream_stats(),
+    }
+
+
+TASK_HANDLERS = {AGENT_RUN: run_agent_task}
+
+
+def _forward_task_progress(progress: str):
+    try:
+        event = json.loads(progress)
+    except ValueError:
+        event = {"message": progress}
+    if isinstance(event, dict):
+        forward_progress(event)
+
+
+def run_agent_remote(
+    queue: WorkQueue,
+    cls: type,
+    inputs: dict[str, Any],
+    output_dir: Path,
+    provider: str | None = None,
+    model: str | None = None,
+    temperature: float | None = None,
+    skip_deep_research: bool = False,
+    cancel_check: Callable[[], bool] | None = None,
+    idempotency_key: str | None = None,
+) -> tuple[JSONDocument, bool]:
+    """Server side of ``agent_run``: enqueue, wait, then commit the output locally.
+
+    Returns (output document, whether it was saved to ``output_dir``).
+    Progress events go to the current progress reporter and usage to
+    the current usage scope, as if the agent had run in this thread.
+    ``idempotency_key`` names this agent run (e.g. run/job id + slug); a
+    repeated enqueue with the same key joins the existing task.
+    """
+    active = active_api_key()
+    reporter = current_reporter()
+    payload = {
+        "agent": agent_ref(cls),
+        "slug": cls.slug,
+        # Cancel tokens / abort checks stay here; cancellation goes through the queue.
+        "inputs": {k: v for k, v in inputs.items() if not callable(v)},
+        "provider": provider,
+        "model": model,
+        "temperature": temperature,
+        "skip_deep_research": skip_deep_research,
+        "key_id": active[1] if active else "",
+        "progress": (
+            {"expected_chars": reporter.expected_chars, "interval": reporter.interval}
+            if reporter is not None else None
+        ),
+    }
+    key = idempotency_key or f"{cls.slug}:{secrets.token_hex(8)}"
+    for attempt in range(3):
+        try:
+            task = queue.enqueue(AGENT_RUN, payload, idempotency_key=key)
+            break
+        except Exception:
+            # Enqueues are idempotent per key, so retrying can't duplicate the run.
+            if attempt == 2:
+                raise
+            logger.warning("Queueing %s failed (attempt %d), retrying", cls.slug, attempt + 1, exc_info=True)
+            time.sleep(1.0)
+    logger.info("Queued %s as task %s", cls.slug, task["id"])
+    result = wait_for_result(queue, task["id"], cancel_check=cancel_check, on_progress=_forward_task_progress)
+
+    raw = result["output"].encode("utf-8")
+    saved = bool(result.get("saved"))
+    if saved:
+        get_output_store().write_bytes(output_dir / f"{cls.slug}_output.json", raw)
+    merge_usage(result.get("usage") or [])
+    add_stream_stats(result.get("stream_stats") or [])
+    return JSONDocument(loads(raw), raw), saved
@@ -0,0 +1,396 @@
+"""Backpressure-aware WebSocket fan-out.
+
+broadcast() used to await ``ws.send_json`` for each client in turn, so one
+slow or half-dead browser tab delayed every event for everyone, and the
+pipeline coroutine that called broadcast() with it.
+
+WebSocketHub gives every client a bounded send queue drained by its own
+writer task. ``publish()`` is synchronous and never waits on a socket:
+
+  - Coalescing: a queued ``stream_progress`` message for the same run,
+    agent and job is replaced by the newer one, and queued ``server_log``
+    batches are merged, so a slow client gets the latest state rather than
+    a backlog.
+  - Drop-oldest: when a queue is full, the oldest low-value message
+    (progress ticks, log lines) is dropped to make room.
+  - A client whose queue is full of messages that can't be dropped, or whose
+    send stalls past ``send_timeout``, is disconnected. The browser
+    reconnects and receives a fresh ``state_sync``.
+
+Clients can also narrow what they receive with topic subscriptions (see
+Subscription): messages tagged with a brand, run or branch the client isn't
+showing are filtered out here, before they are queued.
+
+Every non-ephemeral event gets a sequence number (``seq``) and is kept in a
+bounded replay buffer. A reconnecting client sends the ``epoch`` and last
+``seq`` it saw. ``resume()`` then queues only the events it missed, and the
+client needs a full snapshot only on a cold start, after a server restart,
+or once it has fallen out of the buffer.
+
+Each message object is encoded to JSON once (``hub.encode()``) no matter
+how many clients it goes to; only per-client copies (merged log batches,
+level-filtered logs) are encoded separately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+from collections import OrderedDict, deque
+from typing import Any
+
+from pipeline.serialization import dumps_text
+
+logger = logging.getLogger(__name__)
+
+# High-frequency messages where only the latest value matters, keyed by the
+# fields that identify "the same" stream.
+_COALESCE_KEYS: dict[str, tuple[str, ...]] = {
+    "stream_progress": ("run_id", "slug", "job_key"),
+}
+# Messages whose payload lists are concatenated when coalesced.
+_MERGE_LINES = frozenset({"server_log"})
+# Messages that may be discarded under backpressure.
+_DROPPABLE = frozenset({"stream_progress", "server_log"})
+
+_MAX_MERGED_LINES = 300
+# Encoded messages remembered by identity, so fan-out encodes each once.
+_ENCODE_CACHE_SIZE = 64
+
+# Subscription dimensions -> message field they match on.
+TOPIC_FIELDS: dict[str, str] = {
+    "brand_slug": "brand_slug",
+    "run_id": "run_id",
+    "branch_id": "branch_id",
+}
+
+LOG_LEVELS: dict[str, int] = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+
+class Subscription:
+    """A client's topic filter.
+
+    Each dimension (brand_slug, run_id, branch_id) is either unfiltered
+    (None: everything) or a set of accepted values. Messages that don't carry
+    a dimension's field (global events) always pass. ``log_level`` drops
+    ``server_log`` lines below that level.
+
+    Protocol (client -> server, JSON text frames):
+
+        {"type": "subscribe",   "topics": {"brand_slug": ["acme"]}, "log_level": "info"}
+        {"type": "unsubscribe", "topics": {"brand_slug": ["acme"]}}
+        {"type": "unsubscribe", "topics": {"run_id": "*"}}   # drop the filter
+
+    ``subscribe`` adds values, ``unsubscribe`` removes them; "*" (or null)
+    resets a dimension to unfiltered.
+    """
+
+    def __init__(self):
+        self.topics: dict[str, set[str] | None] = {dim: None for dim in TOPIC_FIELDS}
+        self.log_level = logging.DEBUG
+
+    def subscribe(self, topics: dict[str, Any] | None = None, log_level: str | None = None):
+        for dim, values in self._normalise(topics):
+            if values is None:
+                self.topics[dim] = None
+            else:
+                self.topics[dim] = (self.topics[dim] or set()) | values
+        if log_level is not None:
+            self.log_level = LOG_LEVELS.get(str(log_level).lower(), self.log_level)
+
+    def unsubscribe(self, topics: dict[str, Any] | None = None):
+        for dim, values in self._normalise(topics):
+            current = self.topics[dim]
+            if values is None:
+                self.topics[dim] = None
+            elif current is not None:
+                current -= values
+
+    def accepts(self, msg: dict) -> bool:
+        for dim, field_name in TOPIC_FIELDS.items():
+            accepted = self.topics[dim]
+            if accepted is None:
+                continue
+            value = msg.get(field_name)
+            if value is None or value == "":
+                continue
+            if str(value) not in accepted:
+                return False
+        return True
+
+    def filter_log(self, msg: dict) -> dict | None:
+        """Drop ``server_log`` lines below ``log_level`` (None if none left)."""
+        levels = msg.get("levels")
+        if self.log_level <= logging.DEBUG or not levels:
+            return msg
+        keep = [i for i, lvl in enumerate(levels) if lvl >= self.log_level]
+        if not keep:
+            return None
+        if len(keep) == len(levels):
+            return msg
+        lines = msg.get("lines") or []
+        return {
+            **msg,
+            "lines": [lines[i] for i in keep if i < len(lines)],
+            "levels": [levels[i] for i in keep],
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "topics": {
+                dim: sorted(values) if values is not None else None
+                for dim, values in self.topics.items()
+            },
+            "log_level": logging.getLevelName(self.log_level).lower(),
+        }
+
+    @staticmethod
+    def _normalise(topics: dict[str, Any] | None):
+        for dim, raw in (topics or {}).items():
+            if dim not in TOPIC_FIELDS:
+                continue
+            if raw is None or raw == "*":
+                yield dim, None
+                continue
+            if not isinstance(raw, (list, tuple, set)):
+                raw = [raw]
+            yield dim, {str(v) for v in raw if v is not None and v != ""}
+
+
+class _ClientChannel:
+    """One client's bounded send queue and writer task."""
+
+    def __init__(self, hub: "WebSocketHub", ws: Any):
+        self.hub = hub
+        self.ws = ws
+        self.queue: deque[dict] = deque()
+        self.pending: dict[tuple, dict] = {}  # coalesce key -> queued message
+        self.subscription = Subscription()
+        # False until the client has resumed or received its snapshot; until
+        # then numbered events are held back (they arrive via the replay).
+        self.synced = False
+        self.wakeup = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self.task = asyncio.create_task(self._writer())
+
+    def enqueue(self, msg: dict):
+        if self.closed or not self.subscription.accepts(msg):
+            return
+        if not self.synced and "seq" in msg:
+            return
+        kind = msg.get("type")
+        if kind == "server_log":
+            msg = self.subscription.filter_log(msg)
+            if msg is None:
+                return
+        key = self._coalesce_key(kind, msg)
+        if key is not None and key in self.pending:
+            queued = self.pending[key]
+            if kind in _MERGE_LINES:
+                lines = queued["lines"] + list(msg.get("lines") or [])
+                queued["lines"] = lines[-_MAX_MERGED_LINES:]
+                if "levels" in queued:
+                    levels = queued["levels"] + list(msg.get("levels") or [])
+                    queued["levels"] = levels[-_MAX_MERGED_LINES:]
+                if "log_seq" in msg:
+                    queued["log_seq"] = msg["log_seq"]
+            else:
+                queued.clear()
+                queued.update(msg)
+            self.coalesced += 1
+            return
+
+        if len(self.queue) >= self.hub.max_queue and not self._drop_oldest():
+            logger.warning(
+                "WebSocket client send queue full (%d undroppable messages) — disconnecting",
+                len(self.queue),
+            )
+            self.close()
+            return
+
+        if key is not None:
+            # Copy: merging mutates the queued message, and other clients
+            # share the original dict.
+            if kind in _MERGE_LINES:
+                msg = {**msg, "lines": list(msg.get("lines") or [])}
+                if "levels" in msg:
+                    msg["levels"] = list(msg["levels"])
+            else:
+                msg = dict(msg)
+            self.pending[key] = msg
+        self.queue.append(msg)
+        self.wakeup.set()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.pending.clear()
+        self.hub._discard(self)
+        if not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+        asyncio.create_task(self._close_socket())
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            **self.subscription.snapshot(),
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    @staticmethod
+    def _coalesce_key(kind: str | None, msg: dict) -> tuple | None:
+        if kind in _MERGE_LINES:
+            return (kind, msg.get("run_id"), msg.get("branch_id"))
+        fields = _COALESCE_KEYS.get(kind or "")
+        if fields is None:
+            return None
+        return (kind, *(msg.get(f) for f in fields))
+
+    def _drop_oldest(self) -> bool:
+        for i, queued in enumerate(self.queue):
+            if queued.get("type") in _DROPPABLE:
+                del self.queue[i]
+                key = self._coalesce_key(queued.get("type"), queued)
+                if key is not None and self.pending.get(key) is queued:
+                    del self.pending[key]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _writer(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.queue:
+                    msg = self.queue.popleft()
+                    key = self._coalesce_key(msg.get("type"), msg)
+                    if key is not None and self.pending.get(key) is msg:
+                        del self.pending[key]
+                    text = self.hub.encode(msg)
+                    await asyncio.wait_for(self.ws.send_text(text), timeout=self.hub.send_timeout)
+                    self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            logger.warning("WebSocket send stalled for %ss — disconnecting client", self.hub.send_timeout)
+            self.close()
+        except Exception:
+            self.close()
+
+    async def _close_socket(self):
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+
+class WebSocketHub:
+    """Registry of connected clients with non-blocking fan-out and replay."""
+
+    def __init__(self, max_queue: int = 256, send_timeout: float = 10.0, replay_size: int = 1000):
+        self.max_queue = max(8, int(max_queue))
+        self.send_timeout = float(send_timeout)
+        self._clients: dict[int, _ClientChannel] = {}
+        # Changes on every server start, so seqs from a previous process are
+        # never mistaken for this one's.
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self._history: deque[dict] = deque(maxlen=max(1, int(replay_size)))
+        # id(msg) -> (msg, text). Holding msg keeps its id from being reused.
+        self._encoded: OrderedDict[int, tuple[dict, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def add(self, ws: Any) -> _ClientChannel:
+        channel = _ClientChannel(self, ws)
+        self._clients[id(ws)] = channel
+        return channel
+
+    def remove(self, ws: Any):
+        channel = self._clients.get(id(ws))
+        if channel is not None:
+            channel.close()
+
+    def publish(self, msg: dict):
+        """Queue ``msg`` for every client. Never blocks.
+
+        Non-ephemeral events are numbered and kept for ``resume()``; progress
+        ticks and log batches are not (logs have their own replay).
+        """
+        if msg.get("type") not in _DROPPABLE:
+            self.seq += 1
+            msg = {**msg, "seq": self.seq}
+            self._history.append(msg)
+        for channel in list(self._clients.values()):
+            channel.enqueue(msg)
+
+    def encode(self, msg: dict) -> str:
+        """JSON text for ``msg``, shared by every client sending the same object.
+
+        Messages must not be mutated once handed to a writer; the channels
+        copy before merging, so shared originals never are.
+        """
+        cached = self._encoded.get(id(msg))
+        if cached is not None and cached[0] is msg:
+            self._encoded.move_to_end(id(msg))
+            return cached[1]
+        text = dumps_text(msg)
+        self._encoded[id(msg)] = (msg, text)
+        if len(self._encoded) > _ENCODE_CACHE_SIZE:
+            self._encoded.popitem(last=False)
+        return text
+
+    def resume(self, channel: _ClientChannel, epoch: str | None, last_seq: int | None) -> bool:
+        """Queue the events a reconnecting client missed.
+
+        Returns False when the gap can't be filled from the buffer (different
+        epoch, unknown seq, or events already evicted); the caller should send
+        a full snapshot instead.
+        """
+        if epoch != self.epoch or last_seq is None:
+            return False
+        try:
+            last_seq = int(last_seq)
+        except (TypeError, ValueError):
+            return False
+        if last_seq > self.seq:
+            return False
+        oldest = self._history[0]["seq"] if self._history else self.seq + 1
+        if last_seq < oldest - 1:
+            return False
+        for msg in self._history:
+            if msg["seq"] > last_seq:
+                channel.enqueue(msg)
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "max_queue": self.max_queue,
+            "send_timeout": self.send_timeout,
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "replay_buffered": len(self._history),
+            "channels": [c.snapshot() for c in self._clients.values()],
+        }
+
+    def _discard(self, channel: _ClientChannel):
+        if self._clients.get(id(channel.ws)) is channel:
+            del self._clients[id(channel.ws)]
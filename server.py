@@ -12,39 +12,36 @@ Usage:
 from __future__ import annotations
 
 import asyncio
-from collections import deque
+import functools
+import hashlib
 import json
 import logging
-import queue as queue_mod
 import shutil
+import threading
 import time
 import traceback
 from datetime import date, datetime
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
 from typing import Any, Optional
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 import config
-from agents.agent_01a_foundation_research import Agent01AFoundationResearch
-from agents.agent_02_idea_generator import Agent02IdeaGenerator
-from agents.agent_04_copywriter import Agent04Copywriter
-from agents.agent_05_hook_specialist import Agent05HookSpecialist
 
 # ---------------------------------------------------------------------------
 # Branch storage (brand-scoped)
 # ---------------------------------------------------------------------------
 
 def _brand_output_dir(brand_slug: str) -> Path:
-    """Return the output directory for a brand."""
-    d = config.OUTPUT_DIR / brand_slug
-    d.mkdir(parents=True, exist_ok=True)
-    return d
+    """Return the output directory for a brand (created by the first write)."""
+    return config.OUTPUT_DIR / brand_slug
 
 
 def _brand_branches_dir(brand_slug: str) -> Path:
@@ -52,64 +49,46 @@ def _brand_branches_dir(brand_slug: str) -> Path:
     return _brand_output_dir(brand_slug) / "branches"
 
 
-def _brand_branches_manifest(brand_slug: str) -> Path:
-    return _brand_branches_dir(brand_slug) / "manifest.json"
-
-
 def _load_branches(brand_slug: str | None = None) -> list[dict]:
-    """Load all branches from a brand's manifest file."""
+    """Load all branches of a brand (one indexed query)."""
     if not brand_slug:
         brand_slug = pipeline_state.get("active_brand_slug") or ""
     if not brand_slug:
         return []
-    manifest = _brand_branches_manifest(brand_slug)
-    if manifest.exists():
-        try:
-            return json.loads(manifest.read_text("utf-8"))
-        except (json.JSONDecodeError, OSError):
-            return []
-    return []
-
-
-def _save_branches(brand_slug: str, branches: list[dict]):
-    """Save branches to a brand's manifest file."""
-    bdir = _brand_branches_dir(brand_slug)
-    bdir.mkdir(parents=True, exist_ok=True)
-    _brand_branches_manifest(brand_slug).write_text(json.dumps(branches, indent=2), "utf-8")
+    return storage_list_branches(brand_slug)
 
 
 def _get_branch(branch_id: str, brand_slug: str | None = None) -> dict | None:
     """Get a branch by ID."""
     if not brand_slug:
         brand_slug = pipeline_state.get("active_brand_slug") or ""
-    for b in _load_branches(brand_slug):
-        if b["id"] == branch_id:
-            return b
-    return None
+    return storage_get_branch(brand_slug, branch_id)
 
 
 def _update_branch(branch_id: str, updates: dict, brand_slug: str | None = None):
-    """Update a branch's fields and save."""
+    """Update a branch's fields (row-level, only the given columns)."""
     if not brand_slug:
         brand_slug = pipeline_state.get("active_brand_slug") or ""
-    branches = _load_branches(brand_slug)
-    for b in branches:
-        if b["id"] == branch_id:
-            b.update(updates)
-            break
-    _save_branches(brand_slug, branches)
+    storage_update_branch(brand_slug, branch_id, updates)
 
 
-def _clear_all_branches(brand_slug: str):
+async def _clear_all_branches(brand_slug: str):
     """Remove all branches and their output directories. Called when Phase 1 starts (new pipeline)."""
-    for b in _load_branches(brand_slug):
-        bdir = _brand_branches_dir(brand_slug) / b["id"]
-        if bdir.exists():
-            shutil.rmtree(bdir, ignore_errors=True)
-    _save_branches(brand_slug, [])
+    for branch_id in await run_io(storage_clear_branches, brand_slug):
+        await output_store.aremove_tree(_brand_branches_dir(brand_slug) / branch_id)
     logger.info("Cleared all branches for brand %s", brand_slug)
 
 
+def _record_output_saved(output_dir: Path | None, slug: str):
+    """Keep a branch's ``available_agents`` in sync after writing its output file."""
+    if output_dir is None or output_dir.parent.name != "branches":
+        return
+    brand_dir = output_dir.parent.parent
+    if brand_dir.parent != config.OUTPUT_DIR:
+        return
+    storage_mark_branch_output(brand_dir.name, output_dir.name, slug)
+
+
 def _branch_output_dir(brand_slug: str, branch_id: str) -> Path:
     """Return the output directory for a branch within a brand."""
     return _brand_branches_dir(brand_slug) / branch_id
@@ -117,10 +96,7 @@ def _branch_output_dir(brand_slug: str, branch_id: str) -> Path:
 
 def _load_branch_output(brand_slug: str, branch_id: str, slug: str) -> dict | None:
     """Load an agent output from a specific branch directory."""
-    path = _branch_output_dir(brand_slug, branch_id) / f"{slug}_output.json"
-    if path.exists():
-        return json.loads(path.read_text("utf-8"))
-    return None
+    return output_cache.read_json(_branch_output_dir(brand_slug, branch_id) / f"{slug}_output.json")
 
 
 def _migrate_flat_outputs_to_brand():
@@ -169,16 +145,47 @@ def _migrate_flat_outputs_to_brand():
     logger.info("Migrated %d flat outputs to brand directory: %s", moved, brand_slug)
 
 
-from pipeline.llm import reset_usage, get_usage_summary
-from pipeline.scraper import scrape_website
+from pipeline.agent_processes import get_agent_processes
+from pipeline.agent_registry import AGENTS
+from pipeline.cancellation import CancelToken
+from pipeline.chat_sessions import ChatTurn, ReplyStreamParser, get_chat_sessions
+from pipeline.executors import executors_snapshot, get_executor, run_cpu, run_io, shutdown_executors
+from pipeline.jobs import JobRunner
+from pipeline.json_patch import JSONPatchError, apply_patch
+from pipeline.speculative_edit import rewrite_document
+from pipeline.progress import ProgressReporter, use_progress_reporter
+from pipeline.provider_pool import PoolMember, ProviderPool, get_provider_pool
+from pipeline.run_manager import PipelineStateProxy, RunManager, RunState, current_run
+from pipeline.scheduler import Priority, get_scheduler
+from pipeline.serialization import encode_document, encode_model
+from pipeline.static_assets import StaticAssets
+from pipeline.log_channel import LogChannel
+from pipeline.output_cache import combined_etag, get_output_cache
+from pipeline.output_store import get_output_store
+from pipeline.work_queue import Worker, get_work_queue
+from pipeline.work_tasks import TASK_HANDLERS, run_agent_remote
+from pipeline.ws_fanout import WebSocketHub
+from pipeline.llm import (
+    LLMCancelled,
+    begin_usage_scope,
+    collect_stream_stats,
+    get_usage_summary,
+    reset_stream_stats,
+    reset_usage,
+    use_api_key,
+)
 from pipeline.storage import (
+    SCHEMA_VERSION,
     init_db,
+    set_schema_version,
     create_run,
     complete_run,
     fail_run,
     save_agent_output,
+    get_cached_script,
+    save_cached_script,
     list_runs,
-    get_run,
+    get_run_json,
     update_run_label,
     delete_run,
     # Brand system
@@ -188,6 +195,19 @@ from pipeline.storage import (
     touch_brand,
     delete_brand as storage_delete_brand,
     _slugify,
+    # Branches
+    list_branches as storage_list_branches,
+    get_branch as storage_get_branch,
+    count_branches,
+    create_branch as storage_create_branch,
+    update_branch as storage_update_branch,
+    delete_branch as storage_delete_branch,
+    clear_branches as storage_clear_branches,
+    mark_branch_output as storage_mark_branch_output,
+    migrate_branch_manifests,
+    # Background jobs
+    get_job,
+    list_jobs,
 )
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -220,8 +240,14 @@ def _check_api_keys() -> list[str]:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    init_db()
-    _migrate_flat_outputs_to_brand()
+    # Stray to_thread / run_in_executor(None, ...) calls use the bounded IO pool.
+    asyncio.get_running_loop().set_default_executor(get_executor("io"))
+
+    # Layout migrations scan the outputs tree; only run them on upgrade.
+    if init_db() < SCHEMA_VERSION:
+        _migrate_flat_outputs_to_brand()
+        migrate_branch_manifests(config.OUTPUT_DIR)
+        set_schema_version(SCHEMA_VERSION)
     key_warnings = _check_api_keys()
     if key_warnings:
         logger.warning("=" * 60)
@@ -240,45 +266,68 @@ async def lifespan(app: FastAPI):
     ws_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
     logging.getLogger().addHandler(ws_handler)
 
-    # Start background log broadcaster
-    broadcaster_task = asyncio.create_task(_log_broadcaster())
+    # Deliver log lines from worker threads on this loop
+    log_channel.start()
+
+    # Hash + precompress dashboard assets if the sources changed
+    static_assets.load(rebuild=config.STATIC_BUILD_ON_START)
+
+    # Pick up reruns queued (or interrupted) before a restart
+    job_runner.start()
+
+    # In-process work-queue workers (remote ones run `python worker.py`)
+    work_queue = get_work_queue()
+    local_workers_stop = threading.Event()
+    if work_queue is not None:
+        for i in range(config.WORK_QUEUE_LOCAL_WORKERS):
+            threading.Thread(
+                target=Worker(work_queue, TASK_HANDLERS, worker_id=f"server-{i}").run_forever,
+                args=(local_workers_stop,),
+                name=f"work-queue-{i}",
+                daemon=True,
+            ).start()
 
     yield
 
     # Shutdown
-    broadcaster_task.cancel()
+    local_workers_stop.set()
+    await job_runner.stop()
+    get_agent_processes().shutdown()
     logging.getLogger().removeHandler(ws_handler)
+    log_channel.stop()
+    get_scheduler().shutdown()
+    shutdown_executors()
+    output_store.flush()
 
 
 app = FastAPI(title="Creative Maker Pipeline", version="1.0.0", lifespan=lifespan)
+# Compress dynamic responses (agent outputs, run history) above the threshold.
+app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MINIMUM_SIZE)
 
 # ---------------------------------------------------------------------------
 # State
 # ---------------------------------------------------------------------------
 
-pipeline_state: dict[str, Any] = {
-    "running": False,
-    "abort_requested": False,
-    "abort_generation": 0,  # monotonic abort token for cancelling background thread work
-    "pipeline_task": None,  # asyncio.Task reference for cancellation
-    "current_phase": None,
-    "current_agent": None,
-    "completed_agents": [],
-    "failed_agents": [],
-    "start_time": None,
-    "log": [],
-    "run_id": None,  # current SQLite run_id
-    "phase_gate": None,  # asyncio.Event — set when user approves next phase
-    "waiting_for_approval": False,  # True while paused between phases
-    "selected_concepts": [],  # user-selected video concepts from Phase 2
-    "active_branch": None,  # currently running branch ID (None = main pipeline)
-    "active_brand_slug": None,  # current brand slug (scopes outputs + branches)
-    "copywriter_failed_jobs": [],  # failed per-concept jobs from parallel Agent 04
-    "copywriter_parallel_context": None,  # context for rewriting only failed jobs
-    "copywriter_rewrite_in_progress": False,  # guard to block Continue during rewrite
-}
-
-ws_clients: list[WebSocket] = []
+run_manager = RunManager(max_concurrent=config.MAX_CONCURRENT_RUNS)
+
+# Parsed output files + directory indexes, invalidated by in-process writers
+# (see pipeline/output_cache.py).
+output_cache = get_output_cache()
+output_store = get_output_store()
+chat_sessions = get_chat_sessions()
+
+# Dict-like view of the run bound to the current context (a run's task and
+# its worker threads, or a handler that called run_manager.bind()); falls
+# back to the shared session state. See pipeline/run_manager.py.
+pipeline_state = PipelineStateProxy(run_manager)
+
+# Connected dashboards. Each client has its own bounded send queue and writer
+# task, so broadcasting never waits on a slow socket (pipeline/ws_fanout.py).
+ws_hub = WebSocketHub(
+    max_queue=config.WS_CLIENT_QUEUE_SIZE,
+    send_timeout=config.WS_SEND_TIMEOUT,
+    replay_size=config.WS_REPLAY_BUFFER,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -286,15 +335,21 @@ ws_clients: list[WebSocket] = []
 # ---------------------------------------------------------------------------
 
 async def broadcast(msg: dict):
-    """Send a message to all connected WebSocket clients."""
-    dead = []
-    for ws in ws_clients:
-        try:
-            await ws.send_json(msg)
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        ws_clients.remove(ws)
+    """Queue a message for all connected WebSocket clients.
+
+    Messages sent from inside a run are tagged with its run_id, brand_slug
+    and branch_id, which clients' topic subscriptions filter on. This never
+    waits on a socket; slow clients get coalesced/dropped progress updates.
+    """
+    run = current_run.get()
+    if run is not None and run.run_id is not None:
+        tags = {
+            "run_id": run.run_id,
+            "brand_slug": run.get("active_brand_slug") or "",
+            "branch_id": run.get("active_branch"),
+        }
+        msg = {**{k: v for k, v in tags.items() if v is not None}, **msg}
+    ws_hub.publish(msg)
 
 
 def _add_log(message: str, level: str = "info"):
@@ -312,70 +367,61 @@ def _add_log(message: str, level: str = "info"):
 # Live server-log streaming (captures Python logs → WebSocket)
 # ---------------------------------------------------------------------------
 
-_log_queue: queue_mod.Queue = queue_mod.Queue(maxsize=1000)
-_recent_server_logs: deque[str] = deque(maxlen=500)
+# Event-driven: worker threads feed lines, the loop flushes them to ws_hub in
+# small time/size windows and keeps a per-run replayable ring buffer on disk.
+log_channel = LogChannel(
+    ws_hub.publish,
+    flush_interval=config.LOG_FLUSH_INTERVAL_MS / 1000,
+    max_batch=config.LOG_FLUSH_MAX_LINES,
+    ring_size=config.RUN_LOG_RING_SIZE,
+    persist_dir=config.RUN_LOG_DIR,
+)
 
 
 class _WSLogHandler(logging.Handler):
-    """Captures pipeline log messages and queues them for WebSocket streaming."""
+    """Captures pipeline log messages and feeds them to the log channel."""
 
     _SKIP_LOGGERS = frozenset({
         "uvicorn.access", "uvicorn.error", "uvicorn", "websockets",
         "websockets.server", "websockets.protocol",
     })
+    _SKIP_TEMPLATES = ("WebSocket /ws", "connection open", "connection closed")
 
     def emit(self, record: logging.LogRecord):
         try:
             if record.name in self._SKIP_LOGGERS:
                 return
-            msg = self.format(record)
-            # Skip HTTP access lines and WS connection noise
-            if ("HTTP/1.1" in msg and '- "' in msg):
+            # Check the unformatted template so skipped records are never formatted.
+            template = record.msg if isinstance(record.msg, str) else ""
+            if any(skip in template for skip in self._SKIP_TEMPLATES):
                 return
-            if any(skip in msg for skip in ("WebSocket /ws", "connection open", "connection closed")):
+            msg = self.format(record)
+            if "HTTP/1.1" in msg and '- "' in msg:
                 return
-            _recent_server_logs.append(msg)
-            _log_queue.put_nowait(msg)
-        except (queue_mod.Full, Exception):
-            pass
-
-
-async def _log_broadcaster():
-    """Background task: drain log queue and broadcast to WS clients."""
-    while True:
-        batch: list[str] = []
-        try:
-            while len(batch) < 30:
-                batch.append(_log_queue.get_nowait())
-        except queue_mod.Empty:
+            # Tag with the run that logged it so clients can filter by topic.
+            log_channel.feed(record.levelno, _run_topic(current_run.get()), msg)
+        except Exception:
             pass
 
-        if batch and ws_clients:
-            await broadcast({"type": "server_log", "lines": batch})
 
-        await asyncio.sleep(0.5)
+def _run_topic(run: RunState | None) -> tuple:
+    """(run_id, brand_slug, branch_id) of a run, or empty for server-wide lines."""
+    if run is None or run.run_id is None:
+        return ()
+    return (run.run_id, run.get("active_brand_slug") or "", run.get("active_branch"))
 
 
 def _reset_server_log_stream():
-    """Clear buffered server log tail/queue so each run starts with a clean terminal."""
-    _recent_server_logs.clear()
-    try:
-        while True:
-            _log_queue.get_nowait()
-    except queue_mod.Empty:
-        pass
+    """Clear the server log tail so each run starts with a clean terminal."""
+    log_channel.clear_tail()
 
 
 # ---------------------------------------------------------------------------
 # Agent runner helpers (sync, called in thread)
 # ---------------------------------------------------------------------------
 
-AGENT_CLASSES = {
-    "agent_01a": Agent01AFoundationResearch,
-    "agent_02": Agent02IdeaGenerator,
-    "agent_04": Agent04Copywriter,
-    "agent_05": Agent05HookSpecialist,
-}
+# Agent classes import on first lookup (see pipeline/agent_registry.py).
+AGENT_CLASSES = AGENTS
 
 AGENT_META = {
     "agent_01a": {"name": "Foundation Research", "phase": 1, "icon": "🔬"},
@@ -405,10 +451,108 @@ def _load_output(slug: str, brand_slug: str | None = None) -> dict | None:
         base = _brand_output_dir(brand_slug)
     else:
         base = config.OUTPUT_DIR
-    path = base / f"{slug}_output.json"
-    if path.exists():
-        return json.loads(path.read_text("utf-8"))
-    return None
+    return output_cache.read_json(base / f"{slug}_output.json")
+
+
+def _available_agents(directory: Path, slugs: Any = None) -> list[str]:
+    """Agent slugs with an output file in ``directory`` (cached index, no per-file stat)."""
+    present = output_cache.listing(directory)
+    return [slug for slug in (slugs or AGENT_META) if f"{slug}_output.json" in present]
+
+
+def _cache_headers(etag: str, last_modified: float | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def _not_modified(request: Request, etag: str, last_modified: float | None) -> bool:
+    """True if the client's conditional headers show its copy is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {t.strip() for t in if_none_match.split(",")}
+        return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+_MAX_PAGE = 100
+
+
+def _resolve_json_path(data: Any, path: str) -> Any:
+    """Follow a dotted path (``angles.0.concepts``) into parsed JSON; KeyError if absent."""
+    node = data
+    for part in (p for p in path.split(".") if p):
+        if isinstance(node, list):
+            try:
+                node = node[int(part)]
+            except (ValueError, IndexError):
+                raise KeyError(part) from None
+        elif isinstance(node, dict) and part in node:
+            node = node[part]
+        else:
+            raise KeyError(part)
+    return node
+
+
+async def _output_file_response(
+    file_path: Path,
+    slug: str,
+    request: Request,
+    *,
+    json_path: str = "",
+    offset: int = 0,
+    limit: int = 0,
+    not_found: str,
+    extra: dict | None = None,
+) -> Response:
+    """Serve an output file: raw bytes passthrough, or a page of a sub-resource."""
+    info = await output_cache.ainfo(file_path)
+    if info is not None and _not_modified(request, info.etag, info.mtime):
+        return _not_modified_response(info.etag)
+    meta = AGENT_META.get(slug, {"name": slug, "phase": 0, "icon": ""})
+    envelope = {"slug": slug, "name": meta["name"], "phase": meta["phase"], **(extra or {})}
+
+    if not json_path:
+        cached = await output_cache.aread_raw(file_path)
+        if cached is None or not cached[0].strip():
+            return JSONResponse({"error": not_found}, status_code=404)
+        raw, info = cached
+        # The stored document is spliced in as-is — no decode/re-encode.
+        head = json.dumps(envelope)[:-1].encode()
+        return Response(
+            head + b', "data": ' + raw + b"}",
+            media_type="application/json",
+            headers=_cache_headers(info.etag, info.mtime),
+        )
+
+    cached = await output_cache.aread(file_path)
+    if cached is None:
+        return JSONResponse({"error": not_found}, status_code=404)
+    data, info = cached
+    try:
+        node = _resolve_json_path(data, json_path)
+    except KeyError as exc:
+        return JSONResponse({"error": f"No '{exc.args[0]}' in {slug} output"}, status_code=404)
+    body = {**envelope, "path": json_path}
+    if isinstance(node, list):
+        offset = max(0, offset)
+        limit = min(max(1, limit or _MAX_PAGE), _MAX_PAGE)
+        body.update(total=len(node), offset=offset, limit=limit, items=node[offset:offset + limit])
+    else:
+        body["data"] = node
+    return JSONResponse(body, headers=_cache_headers(info.etag, info.mtime))
 
 
 def _run_agent_sync(
@@ -420,11 +564,43 @@ def _run_agent_sync(
     output_dir: Path | None = None,
     temperature: float | None = None,
     abort_check=None,
+    cancel_token: CancelToken | None = None,
+    task_key: str | None = None,
 ) -> dict | None:
-    """Run a single agent synchronously. Returns the output dict or None."""
+    """Run a single agent synchronously. Returns the output dict or None.
+
+    ``task_key`` identifies this run when it goes through the work queue.
+    """
     cls = AGENT_CLASSES.get(slug)
     if not cls:
         return None
+    work_queue = get_work_queue()
+    if work_queue is not None:
+        output_dir = output_dir or config.OUTPUT_DIR
+        document, saved = run_agent_remote(
+            work_queue, cls, inputs, output_dir, provider, model, temperature,
+            skip_deep_research, cancel_check=cancel_token or abort_check,
+            idempotency_key=task_key,
+        )
+        if saved:
+            _record_output_saved(output_dir, slug)
+        return document
+    processes = get_agent_processes()
+    if processes.enabled:
+        agent_inputs = dict(inputs)
+        if skip_deep_research:
+            agent_inputs["_skip_deep_research"] = True
+        cancel_check = cancel_token or abort_check
+        output_dir = output_dir or config.OUTPUT_DIR
+        document, saved = processes.run(
+            cls,
+            agent_inputs,
+            {"provider": provider, "model": model, "output_dir": output_dir, "temperature": temperature},
+            cancel_check=cancel_check,
+        )
+        if saved:
+            _record_output_saved(output_dir, slug)
+        return document
     agent = cls(provider=provider, model=model, output_dir=output_dir, temperature=temperature)
     # Use a shallow copy so per-agent flags don't leak to other agents
     agent_inputs = dict(inputs)
@@ -432,8 +608,29 @@ def _run_agent_sync(
         agent_inputs["_skip_deep_research"] = True
     if abort_check:
         agent_inputs["_abort_check"] = abort_check
+    if cancel_token is not None:
+        agent_inputs["_cancel_token"] = cancel_token
     result = agent.run(agent_inputs)
-    return json.loads(result.model_dump_json())
+    if agent.last_output is not None:
+        _record_output_saved(output_dir, slug)
+    # The agent already serialized the result when saving it; reuse that.
+    return agent.last_output if agent.last_output is not None else encode_model(result)
+
+
+def _run_copywriter_job_sync(
+    job_inputs: dict,
+    member: PoolMember,
+    job_dir: Path,
+    cancel_token: CancelToken | None = None,
+) -> tuple[dict | None, list[dict[str, Any]]]:
+    """Run one parallel Agent 04 job on a pool member; also return its LLM stream timings."""
+    reset_stream_stats()
+    with use_api_key(member.provider, member.key_id, member.api_key):
+        result = _run_agent_sync(
+            "agent_04", job_inputs, member.provider, member.model, False, job_dir, None,
+            cancel_token=cancel_token, task_key=f"{job_dir.parent.name}:{job_dir.name}",
+        )
+    return result, collect_stream_stats()
 
 
 def _auto_load_upstream(inputs: dict, needed: list[str], sync_foundation_identity: bool = False, brand_slug: str | None = None):
@@ -596,6 +793,39 @@ def _resolve_copywriter_jobs(inputs: dict[str, Any]) -> list[dict[str, Any]]:
     return jobs
 
 
+@functools.cache
+def _copywriter_prompt_hash() -> str:
+    from prompts.agent_04_system import SYSTEM_PROMPT
+
+    return hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+
+def _copywriter_job_fingerprint(
+    job: dict[str, Any],
+    base_inputs: dict[str, Any],
+    provider: str,
+    model: str,
+) -> str:
+    """Stable fingerprint of everything that shapes one Agent 04 script.
+
+    Covers the angle, video concept, foundation brief, brand/product identity,
+    the provider/model that writes the script and the system prompt.
+    batch_id is deliberately left out so scripts stay reusable across days.
+    """
+    payload = {
+        "prompt": _copywriter_prompt_hash(),
+        "provider": provider,
+        "model": model,
+        "brand_name": _norm_identity_value(base_inputs.get("brand_name")),
+        "product_name": _norm_identity_value(base_inputs.get("product_name")),
+        "angle": job.get("angle"),
+        "video_concept": job.get("video_concept"),
+        "foundation_brief": base_inputs.get("foundation_brief"),
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 def _build_copywriter_output(inputs: dict[str, Any], scripts: list[dict[str, Any]]) -> dict[str, Any]:
     """Build the aggregated Agent 04 output from per-script results."""
     scripts_by_funnel: dict[str, int] = {}
@@ -645,27 +875,95 @@ async def _run_copywriter_jobs_parallel(
     provider: str,
     model: str,
     jobs_dir: Path,
-    max_parallel: int = 4,
+    pool: ProviderPool | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    """Run one Agent 04 call per concept in parallel, with bounded concurrency."""
-    jobs_dir.mkdir(parents=True, exist_ok=True)
-    sem = asyncio.Semaphore(max_parallel)
+    """Run one Agent 04 call per concept in parallel, with adaptive concurrency.
+
+    Jobs are spread across the provider pool for the provider/model (see
+    pipeline.provider_pool); each member's parallelism is governed by its own
+    AIMD limiter (see pipeline.concurrency) instead of a fixed semaphore.
+    """
+    if pool is None:
+        pool = get_provider_pool(provider, model)
     lock = asyncio.Lock()
+    output_sizes: list[int] = []
     successes: list[dict[str, Any]] = []
     failures: list[dict[str, Any]] = []
     done = 0
     total = len(jobs)
 
-    async def _run_one(job: dict[str, Any]):
+    brand_slug = pipeline_state.get("active_brand_slug") or ""
+
+    async def _report_progress():
         nonlocal done
+        async with lock:
+            done += 1
+            ok_count = len(successes)
+            fail_count = len(failures)
+            progress_msg = (
+                f"Parallel scripts {done}/{total} complete "
+                f"({ok_count} ok, {fail_count} failed) — parallelism {pool.limit}"
+            )
+
+        await broadcast({
+            "type": "stream_progress",
+            "slug": "agent_04",
+            "message": progress_msg,
+            "concurrency": pool.snapshot(),
+        })
+
+    # Scripts are cached under the model that actually wrote them, so a job
+    # can reuse a script from any model this pool may serve it with.
+    pool_models = list(dict.fromkeys((m.provider, m.model) for m in pool.members))
+
+    async def _find_cached_script(job: dict[str, Any]) -> tuple[dict[str, Any], str, str] | None:
+        for member_provider, member_model in pool_models:
+            fingerprint = _copywriter_job_fingerprint(job, base_inputs, member_provider, member_model)
+            script = await run_io(get_cached_script, fingerprint)
+            if script:
+                return script, member_provider, member_model
+        return None
+
+    async def _run_one(job: dict[str, Any]):
         if pipeline_state["abort_requested"]:
             raise PipelineAborted("Pipeline aborted by user")
 
-        async with sem:
+        cached = await _find_cached_script(job) if config.COPYWRITER_SCRIPT_REUSE else None
+        if cached:
+            cached_script, cached_provider, cached_model = cached
+            successes.append({
+                "job_index": int(job.get("job_index", 0)),
+                "job_key": str(job.get("job_key", "")),
+                "script": cached_script,
+                "elapsed": 0.0,
+                "reused": True,
+                "provider": cached_provider,
+                "model": cached_model,
+            })
+            job_dir = jobs_dir / f"{job.get('job_key', 'job')}_{int(time.time() * 1000)}"
+            try:
+                await output_store.awrite_json(job_dir / "job_result.json", {
+                    "status": "reused",
+                    "job": job,
+                    "elapsed": 0.0,
+                    "script_id": cached_script.get("script_id") if isinstance(cached_script, dict) else None,
+                    "provider": cached_provider,
+                    "model": cached_model,
+                })
+            except OSError:
+                pass
+            await _report_progress()
+            return
+
+        member = await pool.acquire()
+        job_error: BaseException | None = None
+        job_aborted = False
+        job_ttft: float | None = None
+        job_started = time.time()
+        try:
             if pipeline_state["abort_requested"]:
                 raise PipelineAborted("Pipeline aborted by user")
 
-            job_started = time.time()
             job_inputs = dict(base_inputs)
             angle = dict(job.get("angle") or {})
             angle["video_concepts"] = [job.get("video_concept", {})]
@@ -677,31 +975,50 @@ async def _run_copywriter_jobs_parallel(
 
             run_tag = str(int(time.time() * 1000))
             job_dir = jobs_dir / f"{job.get('job_key', 'job')}_{run_tag}"
-            job_dir.mkdir(parents=True, exist_ok=True)
+            await output_store.aensure_dir(job_dir)
 
             status_payload: dict[str, Any]
+            # Each job reports its own stream, keyed by job; ETA from earlier jobs' sizes.
+            expected = round(sum(output_sizes) / len(output_sizes)) if output_sizes else None
+            reporter = _progress_reporter("agent_04", loop, job_key=str(job.get("job_key", "")), expected_chars=expected)
             try:
-                result = await loop.run_in_executor(
-                    None,
-                    _run_agent_sync,
-                    "agent_04",
-                    job_inputs,
-                    provider,
-                    model,
-                    False,
-                    job_dir,
-                    None,
-                )
+                with use_progress_reporter(reporter):
+                    result, stream_stats = await get_scheduler().run(
+                        _run_copywriter_job_sync,
+                        job_inputs,
+                        member,
+                        job_dir,
+                        pipeline_state.get("cancel_token"),
+                        priority=Priority.GATE,
+                        brand=brand_slug,
+                        label=f"agent_04:{job.get('job_key', 'job')}",
+                    )
+                if getattr(result, "raw", None):
+                    output_sizes.append(len(result.raw))
+                ttfts = [s["ttft"] for s in stream_stats if s.get("ttft") is not None]
+                job_ttft = ttfts[0] if ttfts else None
                 scripts = result.get("scripts") if isinstance(result, dict) else None
                 if not isinstance(scripts, list) or not scripts:
                     raise ValueError("Copywriter job returned no script")
 
                 script = scripts[0]
+                await run_io(
+                    save_cached_script,
+                    _copywriter_job_fingerprint(job, base_inputs, member.provider, member.model),
+                    script,
+                    brand_slug=brand_slug,
+                    angle_id=str(job.get("angle_id") or ""),
+                    provider=member.provider,
+                    model=member.model,
+                )
                 success = {
                     "job_index": int(job.get("job_index", 0)),
                     "job_key": str(job.get("job_key", "")),
                     "script": script,
                     "elapsed": round(time.time() - job_started, 1),
+                    "provider": member.provider,
+                    "model": member.model,
+                    "key_id": member.key_id,
                 }
                 successes.append(success)
                 status_payload = {
@@ -709,10 +1026,17 @@ async def _run_copywriter_jobs_parallel(
                     "job": job,
                     "elapsed": success["elapsed"],
                     "script_id": script.get("script_id"),
+                    "provider": member.provider,
+                    "model": member.model,
+                    "key_id": member.key_id,
                 }
             except PipelineAborted:
                 raise
+            except LLMCancelled as exc:
+                # The run's cancel token fired mid-stream: an abort, not a failed script.
+                raise PipelineAborted("Pipeline aborted by user") from exc
             except Exception as exc:
+                job_error = exc
                 failure = {
                     "job_index": int(job.get("job_index", 0)),
                     "job_key": str(job.get("job_key", "")),
@@ -732,27 +1056,23 @@ async def _run_copywriter_jobs_parallel(
                 }
 
             try:
-                (job_dir / "job_result.json").write_text(
-                    json.dumps(status_payload, indent=2),
-                    encoding="utf-8",
-                )
+                await output_store.awrite_json(job_dir / "job_result.json", status_payload)
             except OSError:
                 pass
+        except BaseException:
+            # Abort / task cancellation: free the slot without scoring the job.
+            job_aborted = True
+            raise
+        finally:
+            pool.release(
+                member,
+                latency=time.time() - job_started,
+                ttft=job_ttft,
+                error=job_error,
+                aborted=job_aborted,
+            )
 
-            async with lock:
-                done += 1
-                ok_count = len(successes)
-                fail_count = len(failures)
-                progress_msg = (
-                    f"Parallel scripts {done}/{total} complete "
-                    f"({ok_count} ok, {fail_count} failed)"
-                )
-
-            await broadcast({
-                "type": "stream_progress",
-                "slug": "agent_04",
-                "message": progress_msg,
-            })
+        await _report_progress()
 
     tasks = [asyncio.create_task(_run_one(job)) for job in jobs]
     await asyncio.gather(*tasks)
@@ -770,7 +1090,7 @@ async def _run_copywriter_parallel_async(
     model: str | None = None,
     output_dir: Path | None = None,
 ) -> dict | None:
-    """Run Agent 04 as one parallel job per selected concept (max concurrency 4)."""
+    """Run Agent 04 as one parallel job per selected concept (adaptive concurrency)."""
     slug = "agent_04"
     meta = AGENT_META[slug]
 
@@ -802,7 +1122,8 @@ async def _run_copywriter_parallel_async(
             "error": err,
             "elapsed": 0.0,
         })
-        save_agent_output(
+        await run_io(
+            save_agent_output,
             run_id=run_id,
             agent_slug=slug,
             agent_name=meta["name"],
@@ -812,14 +1133,16 @@ async def _run_copywriter_parallel_async(
         )
         return None
 
-    max_parallel = 4
+    pool = get_provider_pool(final_provider, final_model)
     base_output_dir = output_dir or config.OUTPUT_DIR
     jobs_dir = base_output_dir / "agent_04_jobs" / f"run_{run_id}"
 
     pipeline_state["current_agent"] = slug
     _add_log(
         f"Starting {meta['icon']} {meta['name']} [{model_label}] — "
-        f"{total_jobs} scripts in parallel (max {max_parallel})..."
+        f"{total_jobs} scripts in parallel (adaptive, currently {pool.limit}"
+        + (f" across {len(pool.members)} keys" if len(pool.members) > 1 else "")
+        + ")..."
     )
     await broadcast({
         "type": "agent_start",
@@ -837,13 +1160,14 @@ async def _run_copywriter_parallel_async(
         provider=final_provider,
         model=final_model,
         jobs_dir=jobs_dir,
-        max_parallel=max_parallel,
+        pool=pool,
     )
     elapsed = time.time() - started
 
     success_scripts = [s["script"] for s in successes]
     fail_count = len(failures)
     ok_count = len(success_scripts)
+    reused_count = sum(1 for s in successes if s.get("reused"))
 
     pipeline_state["copywriter_failed_jobs"] = failures
     pipeline_state["copywriter_parallel_context"] = {
@@ -861,18 +1185,15 @@ async def _run_copywriter_parallel_async(
     }
 
     try:
-        (base_output_dir / "agent_04_parallel_meta.json").write_text(
-            json.dumps({
-                "generated_at": datetime.now().isoformat(),
-                "run_id": run_id,
-                "total_jobs": total_jobs,
-                "succeeded_jobs": ok_count,
-                "failed_jobs": fail_count,
-                "failures": failures,
-                "model": {"provider": final_provider, "model": final_model},
-            }, indent=2),
-            encoding="utf-8",
-        )
+        await output_store.awrite_json(base_output_dir / "agent_04_parallel_meta.json", {
+            "generated_at": datetime.now().isoformat(),
+            "run_id": run_id,
+            "total_jobs": total_jobs,
+            "succeeded_jobs": ok_count,
+            "failed_jobs": fail_count,
+            "failures": failures,
+            "model": {"provider": final_provider, "model": final_model},
+        })
     except OSError:
         pass
 
@@ -887,7 +1208,8 @@ async def _run_copywriter_parallel_async(
             "error": err,
             "elapsed": round(elapsed, 1),
         })
-        save_agent_output(
+        await run_io(
+            save_agent_output,
             run_id=run_id,
             agent_slug=slug,
             agent_name=meta["name"],
@@ -897,9 +1219,9 @@ async def _run_copywriter_parallel_async(
         )
         return None
 
-    result = _build_copywriter_output(inputs, success_scripts)
-    output_path = base_output_dir / "agent_04_output.json"
-    output_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    result = await run_cpu(encode_document, _build_copywriter_output(inputs, success_scripts))
+    output_path = await output_store.awrite_bytes(base_output_dir / "agent_04_output.json", result.raw)
+    await run_io(_record_output_saved, base_output_dir, slug)
     logger.info("Output saved: %s", output_path)
 
     pipeline_state["completed_agents"].append(slug)
@@ -910,6 +1232,8 @@ async def _run_copywriter_parallel_async(
         else f"${cost_summary['total_cost']:.4f}"
     )
     fail_suffix = f", {fail_count} failed" if fail_count else ""
+    if reused_count:
+        fail_suffix += f", {reused_count} reused"
     _add_log(
         f"Completed {meta['icon']} {meta['name']} in {elapsed:.1f}s — "
         f"{ok_count}/{total_jobs} scripts succeeded{fail_suffix} — running total: {cost_str}",
@@ -923,9 +1247,11 @@ async def _run_copywriter_parallel_async(
         "cost": cost_summary,
         "parallel_jobs": total_jobs,
         "failed_jobs": fail_count,
+        "reused_jobs": reused_count,
     })
 
-    save_agent_output(
+    await run_io(
+        save_agent_output,
         run_id=run_id,
         agent_slug=slug,
         agent_name=meta["name"],
@@ -936,6 +1262,47 @@ async def _run_copywriter_parallel_async(
     return result
 
 
+def _progress_reporter(
+    slug: str,
+    loop,
+    job_key: str = "",
+    expected_chars: int | None = None,
+    brand_slug: str | None = None,
+) -> ProgressReporter:
+    """Reporter that broadcasts ``stream_progress`` events for ``slug``.
+
+    Tagged with the current run (if any); ``brand_slug`` tags events from
+    work outside a run, such as reruns.
+    """
+    run = current_run.get()
+    base = {"type": "stream_progress"}
+    if brand_slug:
+        base["brand_slug"] = brand_slug
+
+    def _sink(event: dict[str, Any]):
+        # Called from LLM threads; broadcast from the loop.
+        asyncio.run_coroutine_threadsafe(broadcast({**base, **event}), loop)
+
+    return ProgressReporter(
+        _sink,
+        slug=slug,
+        run_id=run.run_id if run is not None else None,
+        job_key=job_key,
+        expected_chars=expected_chars,
+    )
+
+
+def _expected_output_chars(slug: str, output_dir: Path | None) -> int | None:
+    """Size of the agent's previous output, as the expected size of this one."""
+    if output_dir is None:
+        brand_slug = pipeline_state.get("active_brand_slug") or ""
+        output_dir = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
+    try:
+        return (output_dir / f"{slug}_output.json").stat().st_size or None
+    except OSError:
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Pipeline execution (runs in background task)
 # ---------------------------------------------------------------------------
@@ -988,95 +1355,89 @@ async def _run_single_agent_async(slug: str, inputs: dict, loop, run_id: int, pr
         "provider": final_provider,
     })
 
-    # Set up streaming progress callback to broadcast to frontend
-    from pipeline.llm import set_stream_progress_callback
-
-    def _on_stream_progress(msg):
-        """Called from LLM thread during streaming — fire-and-forget broadcast."""
+    # Structured streaming progress for this agent (scoped to this call)
+    with use_progress_reporter(_progress_reporter(
+        slug, loop, expected_chars=_expected_output_chars(slug, output_dir),
+    )):
+        start = time.time()
         try:
-            asyncio.run_coroutine_threadsafe(
-                broadcast({"type": "stream_progress", "slug": slug, "message": msg}),
-                loop,
-            )
-        except Exception:
-            pass
-
-    set_stream_progress_callback(_on_stream_progress)
+            run_abort_generation = int(pipeline_state.get("abort_generation", 0))
+            cancel_token = pipeline_state.get("cancel_token")
 
-    start = time.time()
-    try:
-        run_abort_generation = int(pipeline_state.get("abort_generation", 0))
+            def _abort_check() -> bool:
+                return bool(
+                    pipeline_state.get("abort_requested")
+                    or int(pipeline_state.get("abort_generation", 0)) != run_abort_generation
+                )
 
-        def _abort_check() -> bool:
-            return bool(
-                pipeline_state.get("abort_requested")
-                or int(pipeline_state.get("abort_generation", 0)) != run_abort_generation
+            result = await get_scheduler().run(
+                _run_agent_sync,
+                slug,
+                inputs,
+                agent_provider,
+                agent_model,
+                skip_deep_research,
+                output_dir,
+                temperature,
+                _abort_check,
+                cancel_token,
+                f"run_{run_id}:{slug}:{int(start * 1000)}",
+                priority=Priority.GATE,
+                brand=pipeline_state.get("active_brand_slug") or "",
+                label=slug,
             )
+            elapsed = time.time() - start
+            pipeline_state["completed_agents"].append(slug)
 
-        result = await loop.run_in_executor(
-            None,
-            _run_agent_sync,
-            slug,
-            inputs,
-            agent_provider,
-            agent_model,
-            skip_deep_research,
-            output_dir,
-            temperature,
-            _abort_check,
-        )
-        elapsed = time.time() - start
-        pipeline_state["completed_agents"].append(slug)
-
-        # Get running cost totals
-        cost_summary = get_usage_summary()
-        cost_str = f"${cost_summary['total_cost']:.2f}" if cost_summary['total_cost'] >= 0.01 else f"${cost_summary['total_cost']:.4f}"
-        _add_log(f"Completed {meta['icon']} {meta['name']} in {elapsed:.1f}s — running total: {cost_str}", "success")
-        await broadcast({
-            "type": "agent_complete",
-            "slug": slug,
-            "name": meta["name"],
-            "elapsed": round(elapsed, 1),
-            "cost": cost_summary,
-        })
+            # Get running cost totals
+            cost_summary = get_usage_summary()
+            cost_str = f"${cost_summary['total_cost']:.2f}" if cost_summary['total_cost'] >= 0.01 else f"${cost_summary['total_cost']:.4f}"
+            _add_log(f"Completed {meta['icon']} {meta['name']} in {elapsed:.1f}s — running total: {cost_str}", "success")
+            await broadcast({
+                "type": "agent_complete",
+                "slug": slug,
+                "name": meta["name"],
+                "elapsed": round(elapsed, 1),
+                "cost": cost_summary,
+            })
 
-        # Save to SQLite
-        save_agent_output(
-            run_id=run_id,
-            agent_slug=slug,
-            agent_name=meta["name"],
-            output=result,
-            elapsed=elapsed,
-        )
+            # Save to SQLite
+            await run_io(
+                save_agent_output,
+                run_id=run_id,
+                agent_slug=slug,
+                agent_name=meta["name"],
+                output=result,
+                elapsed=elapsed,
+            )
 
-        return result
-    except Exception as e:
-        elapsed = time.time() - start
-        pipeline_state["failed_agents"].append(slug)
-        err = str(e)
-        _add_log(f"Failed {meta['icon']} {meta['name']}: {err}", "error")
-        logger.exception("Agent %s failed", slug)
-        await broadcast({
-            "type": "agent_error",
-            "slug": slug,
-            "name": meta["name"],
-            "error": err,
-            "elapsed": round(elapsed, 1),
-        })
+            return result
+        except Exception as e:
+            elapsed = time.time() - start
+            pipeline_state["failed_agents"].append(slug)
+            err = str(e)
+            _add_log(f"Failed {meta['icon']} {meta['name']}: {err}", "error")
+            logger.exception("Agent %s failed", slug)
+            await broadcast({
+                "type": "agent_error",
+                "slug": slug,
+                "name": meta["name"],
+                "error": err,
+                "elapsed": round(elapsed, 1),
+            })
 
-        # Save failure to SQLite
-        save_agent_output(
-            run_id=run_id,
-            agent_slug=slug,
-            agent_name=meta["name"],
-            output=None,
-            elapsed=elapsed,
-            error=err,
-        )
+            # Save failure to SQLite
+            await run_io(
+                save_agent_output,
+                run_id=run_id,
+                agent_slug=slug,
+                agent_name=meta["name"],
+                output=None,
+                elapsed=elapsed,
+                error=err,
+            )
 
-        return None
-    finally:
-        set_stream_progress_callback(None)
+            return None
 
 
 async def _wait_for_agent_gate(completed_slug: str, next_slug: str, next_name: str, show_concept_selection: bool = False, phase: int = 0):
@@ -1105,7 +1466,9 @@ async def _wait_for_agent_gate(completed_slug: str, next_slug: str, next_name: s
         "show_concept_selection": show_concept_selection,
         "copywriter_failed_count": copywriter_failed_count,
     })
-    await pipeline_state["phase_gate"].wait()
+    # Don't hold a MAX_CONCURRENT_RUNS slot while waiting on the user.
+    async with run_manager.parked():
+        await pipeline_state["phase_gate"].wait()
     pipeline_state["waiting_for_approval"] = False
 
     if pipeline_state["abort_requested"]:
@@ -1120,11 +1483,34 @@ async def _wait_for_agent_gate(completed_slug: str, next_slug: str, next_name: s
     await broadcast({"type": "phase_gate_cleared"})
 
 
-async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | None = None, model: str | None = None, model_overrides: dict | None = None, brand_slug: str | None = None):
-    """Execute requested pipeline phases sequentially, gating between every agent."""
+def _resolve_db_run(phases: list[int], inputs: dict, brand_slug: str) -> int:
+    """Pick the SQLite run a new pipeline run should write to.
+
+    Reuse the brand's most recent run when continuing later phases (e.g.
+    Phase 3 after Phase 1+2) unless that run is still live; otherwise create
+    a new run.
+    """
+    if 1 not in phases:
+        recent = [
+            r for r in list_runs(limit=50)
+            if not brand_slug or r.get("brand_slug") == brand_slug
+        ]
+        if recent and not run_manager.is_active(recent[0]["id"]):
+            run_id = recent[0]["id"]
+            logger.info("Continuing most recent run #%d with phases %s", run_id, phases)
+            return run_id
+    return create_run(phases, inputs, brand_slug=brand_slug)
+
+
+async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | None = None, model: str | None = None, model_overrides: dict | None = None, brand_slug: str | None = None, run_id: int | None = None):
+    """Execute requested pipeline phases sequentially, gating between every agent.
+
+    Runs inside its RunManager task, so ``pipeline_state`` is this run's state.
+    """
     loop = asyncio.get_event_loop()
     pipeline_state["running"] = True
     pipeline_state["abort_requested"] = False
+    pipeline_state["cancel_token"] = CancelToken()
     pipeline_state["model_overrides"] = model_overrides or {}
     pipeline_state["completed_agents"] = []
     pipeline_state["failed_agents"] = []
@@ -1139,35 +1525,21 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
     # Brand-scoped output directory
     output_dir = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
 
-    # Keep live terminal scoped to this run only.
-    _reset_server_log_stream()
+    # Keep live terminal scoped to this run only (unless other runs are live).
+    if run_manager.running_count() <= 1:
+        _reset_server_log_stream()
 
-    # Reset the LLM cost tracker for this run
+    # Fresh LLM cost tracker for this run (separate from concurrent runs)
+    pipeline_state["usage_scope"] = begin_usage_scope()
     reset_usage()
 
     # New pipeline (Phase 1 included) → clear stale branches from previous runs
     if 1 in phases and brand_slug:
-        _clear_all_branches(brand_slug)
-
-    # Reuse existing run if continuing later phases (e.g. Phase 3 after Phase 1+2)
-    # Only create a new run if Phase 1 is included or no prior run exists
-    existing_run_id = pipeline_state.get("run_id")
-    if 1 not in phases and existing_run_id:
-        run_id = existing_run_id
-        logger.info("Continuing existing run #%d with phases %s", run_id, phases)
-    elif 1 not in phases:
-        # Server may have restarted — find the most recent run from DB
-        recent = list_runs(limit=1)
-        if recent:
-            run_id = recent[0]["id"]
-            pipeline_state["run_id"] = run_id
-            logger.info("Resuming most recent run #%d with phases %s", run_id, phases)
-        else:
-            run_id = create_run(phases, inputs, brand_slug=brand_slug or "")
-            pipeline_state["run_id"] = run_id
-    else:
-        run_id = create_run(phases, inputs, brand_slug=brand_slug or "")
-        pipeline_state["run_id"] = run_id
+        await _clear_all_branches(brand_slug)
+
+    if run_id is None:
+        run_id = await run_io(_resolve_db_run, phases, inputs, brand_slug or "")
+    pipeline_state["run_id"] = run_id
 
     await broadcast({"type": "pipeline_start", "phases": phases, "run_id": run_id, "brand_slug": brand_slug or ""})
 
@@ -1178,8 +1550,13 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             _add_log(f"🌐 Scraping website: {website_url}")
             await broadcast({"type": "phase_start", "phase": 0})
             try:
-                scrape_result = await loop.run_in_executor(
-                    None, scrape_website, website_url, provider or "openai", model,
+                from pipeline.scraper import clean_page, extract_intel, fetch_page
+
+                # Only the extraction is LLM work; fetch and cleanup don't queue behind it.
+                page_text = await run_cpu(clean_page, await run_io(fetch_page, website_url))
+                scrape_result = await get_scheduler().run(
+                    extract_intel, website_url, page_text, provider or "openai", model,
+                    priority=Priority.GATE, brand=brand_slug or "", label="scrape",
                 )
                 inputs["website_intel"] = scrape_result
 
@@ -1222,7 +1599,7 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
                 _add_log("Phase 1 failed — Agent 1A is required", "error")
                 await broadcast({"type": "pipeline_error", "message": error_detail})
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
+                await run_io(fail_run, run_id, total)
                 return
 
             inputs["foundation_brief"] = r1a
@@ -1243,19 +1620,19 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             _add_log("═══ PHASE 2 — IDEATION ═══")
             await broadcast({"type": "phase_start", "phase": 2})
 
-            foundation_err = _ensure_foundation_for_creative_engine(inputs, brand_slug=brand_slug)
+            foundation_err = await run_io(_ensure_foundation_for_creative_engine, inputs, brand_slug=brand_slug)
             if foundation_err:
                 _add_log(f"Phase 2 blocked — {foundation_err}", "error")
                 await broadcast({"type": "pipeline_error", "message": foundation_err})
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
+                await run_io(fail_run, run_id, total)
                 return
 
             r02 = await _run_single_agent_async("agent_02", inputs, loop, run_id, provider, model, output_dir=output_dir)
             if not r02:
                 _add_log("Phase 2 failed — Creative Engine is required", "error")
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
+                await run_io(fail_run, run_id, total)
                 return
             inputs["idea_brief"] = r02
 
@@ -1275,7 +1652,8 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             _add_log("═══ PHASE 3 — SCRIPTING ═══")
             await broadcast({"type": "phase_start", "phase": 3})
 
-            _auto_load_upstream(
+            await run_io(
+                _auto_load_upstream,
                 inputs,
                 ["foundation_brief", "idea_brief"],
                 sync_foundation_identity=True,
@@ -1292,7 +1670,7 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             r04 = await _run_copywriter_parallel_async(inputs, loop, run_id, provider, model, output_dir=output_dir)
             if not r04:
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
+                await run_io(fail_run, run_id, total)
                 return
             inputs["copywriter_brief"] = r04
 
@@ -1303,12 +1681,12 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             r05 = await _run_single_agent_async("agent_05", inputs, loop, run_id, provider, model, output_dir=output_dir)
             if not r05:
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
+                await run_io(fail_run, run_id, total)
                 return
             inputs["hook_brief"] = r05
 
         total = time.time() - pipeline_state["start_time"]
-        complete_run(run_id, total)
+        await run_io(complete_run, run_id, total)
         final_cost = get_usage_summary()
         cost_str = f"${final_cost['total_cost']:.2f}" if final_cost['total_cost'] >= 0.01 else f"${final_cost['total_cost']:.4f}"
         _add_log(f"Pipeline complete in {total:.1f}s — total cost: {cost_str}", "success")
@@ -1322,7 +1700,7 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
 
     except (PipelineAborted, asyncio.CancelledError):
         total = time.time() - pipeline_state["start_time"]
-        fail_run(run_id, total)
+        await run_io(fail_run, run_id, total)
         abort_cost = get_usage_summary()
         _add_log(f"🛑 Pipeline aborted by user — cost so far: ${abort_cost['total_cost']:.4f}", "warning")
         logger.info("Pipeline aborted by user after %.1fs", total)
@@ -1338,7 +1716,7 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
             pass  # broadcast already sent or task fully cancelled
     except Exception as e:
         total = time.time() - pipeline_state["start_time"]
-        fail_run(run_id, total)
+        await run_io(fail_run, run_id, total)
         err_cost = get_usage_summary()
         _add_log(f"Pipeline error: {e}", "error")
         logger.exception("Pipeline failed")
@@ -1349,7 +1727,6 @@ async def run_pipeline_phases(phases: list[int], inputs: dict, provider: str | N
         pipeline_state["pipeline_task"] = None
         pipeline_state["current_phase"] = None
         pipeline_state["current_agent"] = None
-        pipeline_state["run_id"] = None
         pipeline_state["copywriter_rewrite_in_progress"] = False
 
 
@@ -1366,12 +1743,7 @@ class RunRequest(BaseModel):
 
 @app.post("/api/run")
 async def api_run(req: RunRequest):
-    """Kick off pipeline phases."""
-    if pipeline_state["running"]:
-        return JSONResponse(
-            {"error": "Pipeline is already running"}, status_code=409
-        )
-
+    """Kick off pipeline phases (queued FIFO when MAX_CONCURRENT_RUNS are busy)."""
     inputs = {k: v for k, v in req.inputs.items() if v}
 
     # Brand name is required only when starting Phase 1 from brief.
@@ -1391,13 +1763,12 @@ async def api_run(req: RunRequest):
             inputs,
         )
         # Save brief.json to the brand's output directory
-        brand_dir = _brand_output_dir(brand_slug)
-        (brand_dir / "brief.json").write_text(json.dumps(inputs, indent=2, default=str), "utf-8")
+        await output_store.awrite_json(_brand_output_dir(brand_slug) / "brief.json", inputs)
 
     # Starting at Phase 2 without Phase 1 requires valid saved Foundation Research.
     if 2 in req.phases and 1 not in req.phases:
         preflight_inputs = dict(inputs)
-        foundation_err = _ensure_foundation_for_creative_engine(preflight_inputs, brand_slug=brand_slug)
+        foundation_err = await run_io(_ensure_foundation_for_creative_engine, preflight_inputs, brand_slug=brand_slug)
         if foundation_err:
             return JSONResponse({"error": foundation_err}, status_code=400)
 
@@ -1414,19 +1785,62 @@ async def api_run(req: RunRequest):
         override_model = "gemini-2.5-flash"
 
     model_overrides = req.model_overrides if not req.quick_mode else {}
-    task = asyncio.create_task(run_pipeline_phases(req.phases, inputs, override_provider, override_model, model_overrides, brand_slug=brand_slug))
-    pipeline_state["pipeline_task"] = task
-    return {"status": "started", "phases": req.phases, "quick_mode": req.quick_mode, "brand_slug": brand_slug}
+    run_id = await run_io(_resolve_db_run, req.phases, inputs, brand_slug)
+    state = RunState(run_id, brand_slug=brand_slug)
+    run_manager.submit(
+        state,
+        lambda: run_pipeline_phases(
+            req.phases, inputs, override_provider, override_model, model_overrides,
+            brand_slug=brand_slug, run_id=run_id,
+        ),
+    )
+    if brand_slug:
+        pipeline_state["active_brand_slug"] = brand_slug
+    status = await _announce_submitted_run(state)
+    return {
+        "status": status,
+        "run_id": run_id,
+        "queue_position": run_manager.queue_position(state) if status == "queued" else None,
+        "phases": req.phases,
+        "quick_mode": req.quick_mode,
+        "brand_slug": brand_slug,
+    }
+
+
+async def _announce_submitted_run(state: RunState) -> str:
+    """Broadcast run_queued for a run that has to wait; return its status."""
+    if not run_manager.will_wait(state):
+        return "started"
+    position = run_manager.queue_position(state)
+    logger.info("Run #%s queued (position %s)", state.run_id, position)
+    await broadcast({
+        "type": "run_queued",
+        "run_id": state.run_id,
+        "brand_slug": state.get("active_brand_slug") or "",
+        "branch_id": state.get("active_branch"),
+        "queue_position": position,
+    })
+    return "queued"
 
 
 @app.post("/api/abort")
-async def api_abort():
-    """Abort the currently running pipeline immediately."""
+async def api_abort(run_id: Optional[int] = None):
+    """Abort a running (or queued) pipeline immediately."""
+    state = run_manager.bind(run_id)
+    if run_manager.cancel_queued(state):
+        _add_log("🛑 Queued run cancelled", "warning")
+        await broadcast({"type": "pipeline_aborted", "message": "Queued run cancelled"})
+        return {"status": "cancelled", "run_id": state.run_id}
     if not pipeline_state["running"]:
         return JSONResponse({"error": "No pipeline is running"}, status_code=409)
 
     pipeline_state["abort_generation"] = int(pipeline_state.get("abort_generation", 0)) + 1
     pipeline_state["abort_requested"] = True
+    # Close in-flight provider streams now rather than letting worker threads
+    # run their current LLM call to completion after the task is cancelled.
+    cancel_token = pipeline_state.get("cancel_token")
+    if cancel_token is not None:
+        cancel_token.cancel("Pipeline aborted by user")
     _add_log("🛑 Abort requested — stopping pipeline now...", "warning")
     await broadcast({
         "type": "pipeline_aborting",
@@ -1438,7 +1852,7 @@ async def api_abort():
     if task and not task.done():
         task.cancel()
 
-    return {"status": "aborting"}
+    return {"status": "aborting", "run_id": state.run_id}
 
 
 class RerunRequest(BaseModel):
@@ -1449,18 +1863,40 @@ class RerunRequest(BaseModel):
     model: Optional[str] = None
 
 
-@app.post("/api/rerun")
+@app.post("/api/rerun", status_code=202)
 async def api_rerun(req: RerunRequest):
-    """Rerun a single agent independently.
+    """Queue a rerun of a single agent; returns a job id immediately.
 
-    Auto-loads upstream outputs from disk so the agent has the context it needs.
-    Useful for retrying a failed agent without restarting the entire pipeline.
+    The job auto-loads upstream outputs from disk so the agent has the
+    context it needs — useful for retrying a failed agent without
+    restarting the entire pipeline. Progress and completion arrive as
+    ``job_update`` WebSocket events; poll ``GET /api/jobs/{job_id}`` otherwise.
     """
     if req.slug not in AGENT_CLASSES:
         return JSONResponse(
             {"error": f"Unknown agent: {req.slug}"}, status_code=400
         )
 
+    brand_slug = pipeline_state.get("active_brand_slug") or ""
+    if req.slug == "agent_02":
+        # Fail fast on a missing foundation instead of queueing a doomed job.
+        probe = {k: v for k, v in req.inputs.items() if v}
+        await run_io(_auto_load_upstream, probe, ["foundation_brief"], sync_foundation_identity=True, brand_slug=brand_slug)
+        foundation_err = await run_io(_ensure_foundation_for_creative_engine, probe, brand_slug=brand_slug)
+        if foundation_err:
+            return JSONResponse({"error": foundation_err}, status_code=400)
+
+    job = await job_runner.submit("rerun", req.model_dump(), brand_slug=brand_slug, agent_slug=req.slug)
+    return {"job_id": job["id"], "status": job["status"], "slug": req.slug}
+
+
+async def _run_rerun_job(job: dict, progress) -> dict:
+    """Job handler for /api/rerun: run one agent against the brand's outputs."""
+    req = RerunRequest(**job["request"])
+    brand_slug = job["brand_slug"]
+    # Cost for this rerun only; the scheduler thread inherits the scope.
+    begin_usage_scope()
+
     inputs = {k: v for k, v in req.inputs.items() if v}
 
     if not inputs.get("batch_id"):
@@ -1480,70 +1916,104 @@ async def api_rerun(req: RerunRequest):
         skip_deep_research = True
 
     # Auto-load upstream outputs from disk (brand-scoped)
-    brand_slug = pipeline_state.get("active_brand_slug") or ""
     needed = ["foundation_brief", "idea_brief",
               "copywriter_brief", "hook_brief"]
-    _auto_load_upstream(inputs, needed, sync_foundation_identity=True, brand_slug=brand_slug)
+    await run_io(_auto_load_upstream, inputs, needed, sync_foundation_identity=True, brand_slug=brand_slug)
 
     if req.slug == "agent_02":
-        foundation_err = _ensure_foundation_for_creative_engine(inputs, brand_slug=brand_slug)
+        foundation_err = await run_io(_ensure_foundation_for_creative_engine, inputs, brand_slug=brand_slug)
         if foundation_err:
-            return JSONResponse({"error": foundation_err}, status_code=400)
+            raise ValueError(foundation_err)
 
-    # Run the single agent in a thread pool
     rerun_output_dir = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
-    loop = asyncio.get_event_loop()
     start = time.time()
+    await progress(f"Running {AGENT_META.get(req.slug, {}).get('name', req.slug)}")
 
-    try:
-        result = await loop.run_in_executor(
-            None,
+    reporter = _progress_reporter(
+        req.slug, asyncio.get_running_loop(), job_key=job["id"], brand_slug=brand_slug,
+        expected_chars=_expected_output_chars(req.slug, rerun_output_dir),
+    )
+    with use_progress_reporter(reporter):
+        result = await get_scheduler().run(
             lambda: _run_agent_sync(
                 req.slug, inputs, override_provider, override_model,
                 skip_deep_research, output_dir=rerun_output_dir,
+                task_key=f"job_{job['id']}:{req.slug}",
             ),
+            priority=Priority.BACKGROUND,
+            brand=brand_slug or "",
+            label=f"rerun:{req.slug}",
+        )
+    elapsed = round(time.time() - start, 1)
+
+    if result is None:
+        raise RuntimeError(f"Agent {req.slug} returned no output")
+
+    cost = get_usage_summary()
+
+    # Save to SQLite so it persists across refreshes, under the brand's
+    # most recent run (jobs run outside any pipeline run).
+    run_id = None
+    recent_runs = await run_io(list_runs, limit=1, brand_slug=brand_slug or "")
+    if recent_runs:
+        run_id = recent_runs[0]["id"]
+    if run_id:
+        meta = AGENT_META.get(req.slug, {})
+        await run_io(
+            save_agent_output,
+            run_id=run_id,
+            agent_slug=req.slug,
+            agent_name=meta.get("name", req.slug),
+            output=result,
+            elapsed=elapsed,
         )
-        elapsed = round(time.time() - start, 1)
+        logger.info("Rerun output saved to SQLite (run_id=%d)", run_id)
 
-        if result is None:
-            return JSONResponse(
-                {"error": f"Agent {req.slug} returned no output"}, status_code=500
-            )
+    return {
+        "status": "completed",
+        "slug": req.slug,
+        "elapsed": elapsed,
+        "cost": cost,
+    }
 
-        # Get cost data
-        from pipeline.llm import get_usage_summary
-        cost = get_usage_summary()
 
-        # Save to SQLite so it persists across refreshes
-        # Use current pipeline run_id, or fall back to most recent run
-        run_id = pipeline_state.get("run_id")
-        if not run_id:
-            recent_runs = list_runs(limit=1)
-            if recent_runs:
-                run_id = recent_runs[0]["id"]
-        if run_id:
-            meta = AGENT_META.get(req.slug, {})
-            save_agent_output(
-                run_id=run_id,
-                agent_slug=req.slug,
-                agent_name=meta.get("name", req.slug),
-                output=result,
-                elapsed=elapsed,
-            )
-            logger.info("Rerun output saved to SQLite (run_id=%d)", run_id)
+def _publish_job(job: dict | None):
+    if job is not None:
+        ws_hub.publish({"type": "job_update", "job": job, "brand_slug": job["brand_slug"]})
+
+
+job_runner = JobRunner(_publish_job, max_concurrent=config.JOB_MAX_CONCURRENT)
+job_runner.register("rerun", _run_rerun_job)
+
+
+@app.get("/api/jobs")
+async def api_list_jobs(status: str = "", brand: Optional[str] = None, limit: int = 50):
+    """Recent background jobs (reruns), newest first."""
+    return await run_io(list_jobs, status=status or None, brand_slug=brand, limit=min(max(1, limit), 200))
 
-        return {
-            "status": "completed",
-            "slug": req.slug,
-            "elapsed": elapsed,
-            "cost": cost,
-        }
-    except Exception as e:
-        elapsed = round(time.time() - start, 1)
-        logger.exception("Rerun failed for %s", req.slug)
-        return JSONResponse(
-            {"error": str(e), "elapsed": elapsed}, status_code=500
-        )
+
+@app.get("/api/work-queue")
+async def api_work_queue(status: str = "", limit: int = 50):
+    """Recent work-queue tasks (agent runs handed to workers), newest first."""
+    work_queue = get_work_queue()
+    if work_queue is None:
+        return {"enabled": False, "tasks": []}
+    tasks = await run_io(work_queue.list, status or None, min(max(1, limit), 200))
+    for task in tasks:
+        # Payload inputs and results can be megabytes; the listing is for status.
+        task.pop("payload", None)
+        task.pop("result", None)
+        task.pop("lease_token", None)
+    return {"enabled": True, "backend": type(work_queue).__name__, "tasks": tasks}
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_get_job(job_id: str):
+    """Status, progress and result of one background job."""
+    job = await run_io(get_job, job_id)
+    if not job:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return job
 
 
 # ---------------------------------------------------------------------------
@@ -1557,13 +2027,14 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     slug: str
     message: str
-    history: list[ChatMessage] = []
+    session_id: Optional[str] = None
+    history: list[ChatMessage] = []  # only used to seed a new session
     provider: Optional[str] = None
     model: Optional[str] = None
 
 _CHAT_SYSTEM_TEMPLATE = """You are an AI assistant helping a user analyze and refine the output of a creative advertising pipeline agent called "{agent_name}".
 
-## Current Agent Output (JSON)
+## Agent Output at the Start of This Conversation (JSON)
 ```json
 {output_json}
 ```
@@ -1575,107 +2046,309 @@ _CHAT_SYSTEM_TEMPLATE = """You are an AI assistant helping a user analyze and re
 ## When Making Changes
 When the user asks you to change the output, do BOTH:
 - Briefly explain what you changed
-- Return the FULL modified JSON wrapped in <modified_output> and </modified_output> tags
+- Return an RFC 6902 JSON Patch (a JSON array of operations) wrapped in <json_patch> and </json_patch> tags
 
-IMPORTANT: The JSON inside <modified_output> must be the COMPLETE valid output — not a partial diff. Only include these tags when the user explicitly asks for changes.
+Example:
+<json_patch>
+[{{"op": "replace", "path": "/angles/0/headline", "value": "New headline"}}]
+</json_patch>
+
+Paths are JSON Pointers into the output above. Patches you returned earlier in this conversation have already been applied, so build on them. Only touch what the user asked to change, and only include the tags when the user explicitly asks for changes.
 
 ## Style
 Be concise and direct. No fluff."""
 
+# Keep the embedded output under ~80K chars of context.
+_CHAT_MAX_OUTPUT_CHARS = 80_000
+# Turns of client-supplied history used to seed a fresh session.
+_CHAT_SEED_TURNS = 20
 
-@app.post("/api/chat")
-async def api_chat(req: ChatRequest):
-    """Chat with an agent's output — ask questions or request modifications."""
-    from pipeline.llm import call_llm
 
-    # Load the agent's output
-    output = _load_output(req.slug)
-    if not output:
-        return JSONResponse({"error": f"No output found for {req.slug}"}, status_code=404)
+def _output_schema(slug: str) -> type[BaseModel] | None:
+    cls = AGENT_CLASSES.get(slug)
+    if cls is None:
+        return None
+    try:
+        return cls().output_schema
+    except Exception:
+        return None
+
 
-    meta = AGENT_META.get(req.slug, {"name": req.slug})
+def _start_chat_session(slug: str, brand_slug: str, output: dict, etag: str, history: list[ChatMessage]):
+    """New session with the output snapshot frozen into its system prompt."""
+    meta = AGENT_META.get(slug, {"name": slug})
     output_json = json.dumps(output, indent=2)
+    if len(output_json) > _CHAT_MAX_OUTPUT_CHARS:
+        output_json = output_json[:_CHAT_MAX_OUTPUT_CHARS] + "\n... (truncated)"
+    schema = _output_schema(slug)
+    if schema is not None:
+        try:
+            schema.model_validate(output)
+        except Exception:
+            # The stored output predates the schema; don't block edits on it.
+            logger.info("Chat: %s output doesn't validate against %s — patches won't be schema-checked", slug, schema.__name__)
+            schema = None
+    session = chat_sessions.create(
+        slug, brand_slug,
+        system_prompt=_CHAT_SYSTEM_TEMPLATE.format(agent_name=meta["name"], output_json=output_json),
+        document=output,
+        source_etag=etag,
+        schema=schema,
+    )
+    for msg in history[-_CHAT_SEED_TURNS:]:
+        session.turns.append(ChatTurn("user" if msg.role == "user" else "assistant", msg.content))
+    return session
 
-    # Truncate if extremely large (keep under ~80K chars for context)
-    if len(output_json) > 80000:
-        output_json = output_json[:80000] + "\n... (truncated)"
 
-    system_prompt = _CHAT_SYSTEM_TEMPLATE.format(
-        agent_name=meta["name"],
-        output_json=output_json,
-    )
+def _extract_tagged(text: str, tag: str) -> tuple[str, str] | None:
+    """(text before the tag, tag body without code fences), or None."""
+    open_tag, close_tag = f"<{tag}>", f"</{tag}>"
+    if open_tag not in text or close_tag not in text:
+        return None
+    start = text.index(open_tag)
+    body = text[start + len(open_tag):text.index(close_tag)].strip()
+    if body.startswith("```"):
+        body = body[body.index("\n") + 1:] if "\n" in body else ""
+    if body.endswith("```"):
+        body = body[:-3].strip()
+    return text[:start].strip(), body
 
-    # Build conversation into user prompt (since call_llm only takes system + user)
-    conversation_parts = []
-    for msg in req.history[-20:]:  # Keep last 20 messages for context
-        role_label = "User" if msg.role == "user" else "Assistant"
-        conversation_parts.append(f"{role_label}: {msg.content}")
-    conversation_parts.append(f"User: {req.message}")
-    user_prompt = "\n\n".join(conversation_parts)
 
-    # Default to Gemini 3.0 Pro for chat (1M context + strong reasoning)
-    provider = req.provider or "google"
-    model = req.model or "gemini-3.0-pro"
+def _apply_chat_edit(session, response_text: str) -> tuple[str, Any, list | None, str | None]:
+    """Parse an edit out of a chat reply and apply it to the session document.
 
-    loop = asyncio.get_event_loop()
+    Returns (display text, new document or None, patch or None, error or None).
+    A reply with a full <modified_output> (older prompt style) is still accepted.
+    """
+    patch = None
+    display = response_text
+    tagged = _extract_tagged(response_text, "json_patch")
+    try:
+        if tagged is not None:
+            display, body = tagged
+            patch = json.loads(body)
+            if isinstance(patch, dict):
+                patch = [patch]
+            document = apply_patch(session.document, patch)
+        else:
+            tagged = _extract_tagged(response_text, "modified_output")
+            if tagged is None:
+                return response_text, None, None, None
+            display, body = tagged
+            document = json.loads(body)
+    except (json.JSONDecodeError, JSONPatchError) as e:
+        return display, None, patch, f"Edit could not be applied: {e}"
+    error = session.validate(document)
+    if error:
+        return display, None, patch, f"Edit rejected — result doesn't match the {session.slug} schema: {error}"
+    return display or "Changes applied.", document, patch, None
+
+
+async def _rewrite_chat_document(session, user_prompt: str, reply: str, error: str, provider: str, model: str, llm) -> tuple[Any, str]:
+    """Fallback when a chat patch fails: rewrite the document, paying only for changes.
+
+    Uses predicted outputs where the model supports them, else span edits
+    (pipeline/speculative_edit.py). Returns (document or None, mode).
+    """
+    request_prompt = (
+        f"{user_prompt}\n\nAssistant: {reply}\n\n[{error}]\n\n"
+        "User: That patch could not be applied. Make the same change as described below."
+    )
     try:
-        response_text = await loop.run_in_executor(
-            None,
-            lambda: call_llm(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                provider=provider,
-                model=model,
-                temperature=0.5,
-                max_tokens=16_000,
+        document, mode = await get_scheduler().run(
+            lambda: rewrite_document(
+                session.system_prompt, request_prompt, session.document, provider, model,
+                llm=llm, temperature=0.3, max_tokens=32_000,
             ),
+            priority=Priority.INTERACTIVE,
+            brand=session.brand_slug,
+            label=f"chat-rewrite:{session.slug}",
         )
     except Exception as e:
-        logger.exception("Chat LLM call failed for %s", req.slug)
-        return JSONResponse({"error": str(e)}, status_code=500)
+        logger.warning("Chat: full-document rewrite failed for %s: %s", session.slug, e)
+        return None, "rewrite"
+    schema_error = await run_cpu(session.validate, document)
+    if schema_error:
+        logger.warning("Chat: rewritten %s output doesn't match its schema: %s", session.slug, schema_error)
+        return None, mode
+    return document, mode
 
-    # Check if the response contains a modified output
-    modified_output = None
-    display_text = response_text
 
-    if "<modified_output>" in response_text and "</modified_output>" in response_text:
-        # Extract the modified JSON
-        start = response_text.index("<modified_output>") + len("<modified_output>")
-        end = response_text.index("</modified_output>")
-        json_str = response_text[start:end].strip()
+def _resolve_chat_session(req: ChatRequest):
+    """The request's chat session, or a new one over the current output (None if no output)."""
+    brand_slug = pipeline_state.get("active_brand_slug") or ""
+    base = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
+    path = base / f"{req.slug}_output.json"
+    info = output_cache.info(path)
+
+    session = chat_sessions.get(req.slug, req.session_id, brand_slug)
+    if session is not None and (info is None or info.etag != session.source_etag):
+        # The output changed outside this session (rerun, another tab) —
+        # start over from the new version.
+        chat_sessions.drop(req.slug, session.session_id)
+        session = None
+    if session is None:
+        output = output_cache.read_json(path)
+        if not output or info is None:
+            return None
+        session = _start_chat_session(req.slug, brand_slug, output, info.etag, req.history)
+    return session
+
+
+async def _chat_turn(req: ChatRequest, session, on_delta=None) -> tuple[dict, int]:
+    """Run one chat turn in ``session``; returns (response body, HTTP status).
+
+    ``on_delta`` receives reply text chunks as they stream (on a worker thread).
+    """
+    from pipeline.llm import call_llm
 
-        # Strip markdown fences if present
-        if json_str.startswith("```"):
-            first_nl = json_str.index("\n")
-            json_str = json_str[first_nl + 1:]
-        if json_str.endswith("```"):
-            json_str = json_str[:-3].strip()
+    # Default to Gemini 3.0 Pro for chat (1M context + strong reasoning)
+    provider = req.provider or "google"
+    model = req.model or "gemini-3.0-pro"
 
+    async with session.lock:
+        user_prompt = session.prompt(req.message)
         try:
-            modified_output = json.loads(json_str)
-            # Remove the raw JSON block from the display text
-            display_text = response_text[:response_text.index("<modified_output>")].strip()
-            if not display_text:
-                display_text = "Changes applied."
-        except json.JSONDecodeError as e:
-            logger.warning("Failed to parse modified output JSON: %s", e)
-            # Leave the full response as-is if parsing fails
-            display_text = response_text
+            response_text = await get_scheduler().run(
+                lambda: call_llm(
+                    system_prompt=session.system_prompt,
+                    user_prompt=user_prompt,
+                    provider=provider,
+                    model=model,
+                    temperature=0.5,
+                    max_tokens=16_000,
+                    cache_system=True,
+                    on_delta=on_delta,
+                ),
+                priority=Priority.INTERACTIVE,
+                brand=session.brand_slug,
+                label=f"chat:{req.slug}",
+            )
+        except Exception as e:
+            logger.exception("Chat LLM call failed for %s", req.slug)
+            return {"error": str(e), "session_id": session.session_id}, 500
+
+        display_text, document, patch, edit_error = await run_cpu(_apply_chat_edit, session, response_text)
+        edit_mode = "patch" if patch is not None else "full"
+        note = ""
+        if edit_error:
+            logger.warning("Chat: %s — retrying as a full-document rewrite", edit_error)
+            document, edit_mode = await _rewrite_chat_document(
+                session, user_prompt, response_text, edit_error, provider, model, call_llm,
+            )
+            if document is not None:
+                note = f"[Patch could not be applied; the edit was made as a full-document rewrite instead ({edit_mode}).]"
+                edit_error = None
+                patch = None
+            else:
+                note = f"[{edit_error}]"
+        # Tell the model next turn how (or whether) this edit landed.
+        session.record(req.message, f"{response_text}\n\n{note}" if note else response_text)
+        if document is not None:
+            session.document = document
 
     result = {
         "response": display_text,
-        "has_changes": modified_output is not None,
+        "session_id": session.session_id,
+        "has_changes": document is not None,
     }
+    if document is not None:
+        result["modified_output"] = document
+        result["edit_mode"] = edit_mode
+        if patch is not None:
+            result["patch"] = patch
+    if edit_error:
+        result["edit_error"] = edit_error
+    return result, 200
 
-    if modified_output is not None:
-        result["modified_output"] = modified_output
 
-    return result
+@app.post("/api/chat")
+async def api_chat(req: ChatRequest):
+    """Chat with an agent's output — ask questions or request modifications.
+
+    Conversation state lives in a server-side session (``session_id`` is
+    returned and should be sent back); edits are RFC 6902 patches applied
+    to the session's working copy of the output.
+    """
+    session = await run_cpu(_resolve_chat_session, req)
+    if session is None:
+        return JSONResponse({"error": f"No output found for {req.slug}"}, status_code=404)
+    body, status = await _chat_turn(req, session)
+    return body if status == 200 else JSONResponse(body, status_code=status)
+
+
+# Turns outlive a disconnected stream; keep them referenced until done.
+_chat_stream_tasks: set[asyncio.Task] = set()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def api_chat_stream(req: ChatRequest):
+    """/api/chat as Server-Sent Events, forwarding reply text as it streams.
+
+    Events: ``session`` (session_id), ``delta`` (visible text; edit blocks
+    are held back), ``edit`` (an edit block, parsed as soon as it closes),
+    then ``done`` with the same body /api/chat returns, or ``error``.
+    """
+    session = await run_cpu(_resolve_chat_session, req)
+    if session is None:
+        return JSONResponse({"error": f"No output found for {req.slug}"}, status_code=404)
+
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def on_delta(text: str):
+        loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+    async def run_turn():
+        try:
+            return await _chat_turn(req, session, on_delta=on_delta)
+        finally:
+            chunks.put_nowait(None)
+
+    async def events():
+        turn = asyncio.create_task(run_turn())
+        _chat_stream_tasks.add(turn)
+        turn.add_done_callback(_chat_stream_tasks.discard)
+        parser = ReplyStreamParser()
+        try:
+            yield _sse("session", {"session_id": session.session_id})
+            while (chunk := await chunks.get()) is not None:
+                visible, blocks = parser.feed(chunk)
+                if visible:
+                    yield _sse("delta", {"text": visible})
+                for tag, block in blocks:
+                    edit: dict[str, Any] = {"tag": tag}
+                    try:
+                        edit["value"] = json.loads(_extract_tagged(f"<{tag}>{block}</{tag}>", tag)[1])
+                    except json.JSONDecodeError as e:
+                        edit["error"] = str(e)
+                    yield _sse("edit", edit)
+            body, status = await turn
+            yield _sse("done" if status == 200 else "error", body)
+        finally:
+            if not turn.done():
+                # Client went away mid-stream; the turn still completes and
+                # is recorded in the session.
+                logger.info("Chat stream for %s closed before the reply finished", req.slug)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Content-Encoding: identity makes GZipMiddleware pass the stream
+        # through uncompressed on Starlette versions that would otherwise
+        # buffer it.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
 
 
 class ChatApplyRequest(BaseModel):
     slug: str
-    output: dict
+    output: Optional[dict] = None
+    session_id: Optional[str] = None  # saves the session's working document instead
 
 
 @app.post("/api/chat/apply")
@@ -1683,14 +2356,23 @@ async def api_chat_apply(req: ChatApplyRequest):
     """Apply a modified output from a chat session — saves to disk."""
     if req.slug not in AGENT_META:
         return JSONResponse({"error": f"Unknown agent: {req.slug}"}, status_code=400)
-    if not req.output:
-        return JSONResponse({"error": "No output provided"}, status_code=400)
 
     brand_slug = pipeline_state.get("active_brand_slug") or ""
+    session = chat_sessions.get(req.slug, req.session_id, brand_slug)
+    output = session.document if session is not None else req.output
+    if not output:
+        return JSONResponse({"error": "No output provided"}, status_code=400)
+
     base = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
     path = base / f"{req.slug}_output.json"
-    path.write_text(json.dumps(req.output, indent=2), encoding="utf-8")
-    logger.info("Chat: applied modified output for %s (%d chars, brand=%s)", req.slug, len(json.dumps(req.output)), brand_slug)
+    doc = await run_cpu(encode_document, output)
+    await output_store.awrite_bytes(path, doc.raw)
+    if session is not None:
+        # The file now matches the session's document; keep the session.
+        session.document = output
+        info = await output_cache.ainfo(path)
+        session.source_etag = info.etag if info else ""
+    logger.info("Chat: applied modified output for %s (%d bytes, brand=%s)", req.slug, len(doc.raw), brand_slug)
 
     return {"ok": True, "slug": req.slug}
 
@@ -1702,8 +2384,9 @@ class ConceptSelectionRequest(BaseModel):
 
 
 @app.post("/api/select-concepts")
-async def api_select_concepts(req: ConceptSelectionRequest):
+async def api_select_concepts(req: ConceptSelectionRequest, run_id: Optional[int] = None):
     """Save user's video concept selections and continue pipeline."""
+    run_manager.bind(run_id)
     pipeline_state["selected_concepts"] = req.selected
     logger.info("User selected %d video concepts", len(req.selected))
 
@@ -1742,16 +2425,8 @@ class CreateBranchRequest(BaseModel):
 async def api_list_branches(brand: str = ""):
     """List all branches with their status."""
     brand_slug = brand or pipeline_state.get("active_brand_slug") or ""
-    branches = _load_branches(brand_slug)
-    # Enrich each branch with output availability
-    for b in branches:
-        bdir = _branch_output_dir(brand_slug, b["id"])
-        available_agents = []
-        for slug in ["agent_02", "agent_04", "agent_05"]:
-            if (bdir / f"{slug}_output.json").exists():
-                available_agents.append(slug)
-        b["available_agents"] = available_agents
-    return branches
+    # available_agents is maintained on save, so this is a single query.
+    return await run_io(_load_branches, brand_slug)
 
 
 @app.post("/api/branches")
@@ -1760,8 +2435,7 @@ async def api_create_branch(req: CreateBranchRequest, brand: str = ""):
     brand_slug = (brand or req.brand or pipeline_state.get("active_brand_slug") or "").strip()
     if not brand_slug:
         return JSONResponse({"error": "No active brand selected"}, status_code=400)
-    branches = _load_branches(brand_slug)
-    branch_num = len(branches) + 1
+    branch_num = count_branches(brand_slug) + 1
     branch_id = f"b{branch_num}_{int(time.time())}"
 
     label = req.label.strip() or f"Branch {branch_num}"
@@ -1780,10 +2454,10 @@ async def api_create_branch(req: CreateBranchRequest, brand: str = ""):
         "status": "pending",
         "completed_agents": [],
         "failed_agents": [],
+        "available_agents": [],
     }
-    branches.append(branch)
-    _save_branches(brand_slug, branches)
-    _branch_output_dir(brand_slug, branch_id).mkdir(parents=True, exist_ok=True)
+    await run_io(storage_create_branch, brand_slug, branch)
+    await output_store.aensure_dir(_branch_output_dir(brand_slug, branch_id))
 
     logger.info("Created branch %s: %s (brand: %s)", branch_id, label, brand_slug)
     await broadcast({"type": "branch_created", "branch": branch})
@@ -1796,19 +2470,11 @@ async def api_delete_branch(branch_id: str, brand: str = ""):
     brand_slug = (brand or pipeline_state.get("active_brand_slug") or "").strip()
     if not brand_slug:
         return JSONResponse({"error": "No active brand selected"}, status_code=400)
-    branches = _load_branches(brand_slug)
-    found = False
-    branches = [b for b in branches if b["id"] != branch_id or not (found := True)]
-    if not found:
+    if not await run_io(storage_delete_branch, brand_slug, branch_id):
         return JSONResponse({"error": "Branch not found"}, status_code=404)
 
-    _save_branches(brand_slug, branches)
-
     # Remove output directory
-    import shutil
-    bdir = _branch_output_dir(brand_slug, branch_id)
-    if bdir.exists():
-        shutil.rmtree(bdir, ignore_errors=True)
+    await output_store.aremove_tree(_branch_output_dir(brand_slug, branch_id))
 
     logger.info("Deleted branch %s (brand: %s)", branch_id, brand_slug)
     await broadcast({"type": "branch_deleted", "branch_id": branch_id})
@@ -1826,28 +2492,29 @@ async def api_rename_branch(branch_id: str, body: RenameBranchRequest, brand: st
     brand_slug = (brand or body.brand or pipeline_state.get("active_brand_slug") or "").strip()
     if not brand_slug:
         return JSONResponse({"error": "No active brand selected"}, status_code=400)
-    branch = _get_branch(branch_id, brand_slug)
-    if not branch:
+    if not await run_io(storage_update_branch, brand_slug, branch_id, {"label": body.label.strip()}):
         return JSONResponse({"error": "Branch not found"}, status_code=404)
-    _update_branch(branch_id, {"label": body.label.strip()}, brand_slug)
     return {"ok": True, "branch_id": branch_id, "label": body.label.strip()}
 
 
 @app.get("/api/branches/{branch_id}/outputs/{slug}")
-async def api_get_branch_output(branch_id: str, slug: str, brand: str = ""):
-    """Get a specific agent's output from a branch."""
+async def api_get_branch_output(
+    branch_id: str,
+    slug: str,
+    request: Request,
+    brand: str = "",
+    path: str = "",
+    offset: int = 0,
+    limit: int = 0,
+):
+    """Get a specific agent's output from a branch (``?path=`` pages like /api/outputs)."""
     brand_slug = brand or pipeline_state.get("active_brand_slug") or ""
-    data = _load_branch_output(brand_slug, branch_id, slug)
-    if not data:
-        return JSONResponse({"error": f"No output for {slug} in branch {branch_id}"}, status_code=404)
-    meta = AGENT_META.get(slug, {"name": slug, "phase": 0, "icon": ""})
-    return {
-        "slug": slug,
-        "name": meta["name"],
-        "phase": meta["phase"],
-        "data": data,
-        "branch_id": branch_id,
-    }
+    return await _output_file_response(
+        _branch_output_dir(brand_slug, branch_id) / f"{slug}_output.json", slug, request,
+        json_path=path, offset=offset, limit=limit,
+        not_found=f"No output for {slug} in branch {branch_id}",
+        extra={"branch_id": branch_id},
+    )
 
 
 class RunBranchRequest(BaseModel):
@@ -1859,16 +2526,17 @@ class RunBranchRequest(BaseModel):
 
 @app.post("/api/branches/{branch_id}/run")
 async def api_run_branch(branch_id: str, req: RunBranchRequest, brand: str = ""):
-    """Run Phase 2+ for a specific branch."""
-    if pipeline_state["running"]:
-        return JSONResponse(
-            {"error": "Pipeline is already running"}, status_code=409
-        )
+    """Run Phase 2+ for a specific branch (queued FIFO when MAX_CONCURRENT_RUNS are busy)."""
+    for live in run_manager.snapshot()["runs"]:
+        if live["branch_id"] == branch_id and live["status"] in ("queued", "running"):
+            return JSONResponse(
+                {"error": "This branch is already running", "run_id": live["run_id"]}, status_code=409
+            )
 
     brand_slug = (brand or req.brand or pipeline_state.get("active_brand_slug") or "").strip()
     if not brand_slug:
         return JSONResponse({"error": "No active brand selected"}, status_code=400)
-    branch = _get_branch(branch_id, brand_slug)
+    branch = await run_io(_get_branch, branch_id, brand_slug)
     if not branch:
         return JSONResponse({"error": "Branch not found"}, status_code=404)
 
@@ -1885,7 +2553,7 @@ async def api_run_branch(branch_id: str, req: RunBranchRequest, brand: str = "")
 
     if 2 in req.phases:
         preflight_inputs = dict(inputs)
-        foundation_err = _ensure_foundation_for_creative_engine(preflight_inputs, brand_slug=brand_slug)
+        foundation_err = await run_io(_ensure_foundation_for_creative_engine, preflight_inputs, brand_slug=brand_slug)
         if foundation_err:
             return JSONResponse({"error": foundation_err}, status_code=400)
 
@@ -1894,11 +2562,22 @@ async def api_run_branch(branch_id: str, req: RunBranchRequest, brand: str = "")
 
     phases = req.phases
 
-    task = asyncio.create_task(
-        run_branch_pipeline(branch_id, phases, inputs, model_overrides, brand_slug=brand_slug)
+    run_id = await run_io(create_run, phases, inputs, brand_slug=brand_slug)
+    state = RunState(run_id, brand_slug=brand_slug, branch_id=branch_id)
+    run_manager.submit(
+        state,
+        lambda: run_branch_pipeline(
+            branch_id, phases, inputs, model_overrides, brand_slug=brand_slug, run_id=run_id,
+        ),
     )
-    pipeline_state["pipeline_task"] = task
-    return {"status": "started", "branch_id": branch_id, "phases": phases}
+    status = await _announce_submitted_run(state)
+    return {
+        "status": status,
+        "run_id": run_id,
+        "queue_position": run_manager.queue_position(state) if status == "queued" else None,
+        "branch_id": branch_id,
+        "phases": phases,
+    }
 
 
 async def run_branch_pipeline(
@@ -1907,13 +2586,18 @@ async def run_branch_pipeline(
     inputs: dict,
     model_overrides: dict | None = None,
     brand_slug: str | None = None,
+    run_id: int | None = None,
 ):
-    """Execute Phase 2+ for a specific branch, saving outputs to the branch directory."""
+    """Execute Phase 2+ for a specific branch, saving outputs to the branch directory.
+
+    Runs inside its RunManager task, so ``pipeline_state`` is this run's state.
+    """
     if not brand_slug:
         brand_slug = pipeline_state.get("active_brand_slug") or ""
     loop = asyncio.get_event_loop()
     pipeline_state["running"] = True
     pipeline_state["abort_requested"] = False
+    pipeline_state["cancel_token"] = CancelToken()
     pipeline_state["model_overrides"] = model_overrides or {}
     pipeline_state["completed_agents"] = []
     pipeline_state["failed_agents"] = []
@@ -1926,19 +2610,21 @@ async def run_branch_pipeline(
     pipeline_state["copywriter_rewrite_in_progress"] = False
     pipeline_state["selected_concepts"] = []
 
-    # Keep live terminal scoped to this branch run only.
-    _reset_server_log_stream()
+    # Keep live terminal scoped to this branch run only (unless other runs are live).
+    if run_manager.running_count() <= 1:
+        _reset_server_log_stream()
 
+    pipeline_state["usage_scope"] = begin_usage_scope()
     reset_usage()
 
-    output_dir = _branch_output_dir(brand_slug, branch_id)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = await output_store.aensure_dir(_branch_output_dir(brand_slug, branch_id))
 
-    # Create a DB run record
-    run_id = create_run(phases, inputs, brand_slug=brand_slug)
+    # Create a DB run record (normally done by the API handler before queueing)
+    if run_id is None:
+        run_id = await run_io(create_run, phases, inputs, brand_slug=brand_slug)
     pipeline_state["run_id"] = run_id
 
-    _update_branch(branch_id, {"status": "running", "completed_agents": [], "failed_agents": []}, brand_slug)
+    await run_io(_update_branch, branch_id, {"status": "running", "completed_agents": [], "failed_agents": []}, brand_slug)
 
     await broadcast({
         "type": "pipeline_start",
@@ -1952,34 +2638,34 @@ async def run_branch_pipeline(
         # Phase 2 — Ideation (Creative Engine)
         if 2 in phases:
             pipeline_state["current_phase"] = 2
-            _add_log(f"═══ PHASE 2 — IDEATION (Branch: {_get_branch(branch_id, brand_slug)['label']}) ═══")
+            branch_data = await run_io(_get_branch, branch_id, brand_slug)
+            _add_log(f"═══ PHASE 2 — IDEATION (Branch: {branch_data['label']}) ═══")
             await broadcast({"type": "phase_start", "phase": 2, "branch_id": branch_id})
 
             # Always load/validate Phase 1 from the shared output directory
-            foundation_err = _ensure_foundation_for_creative_engine(inputs, brand_slug=brand_slug)
+            foundation_err = await run_io(_ensure_foundation_for_creative_engine, inputs, brand_slug=brand_slug)
             if foundation_err:
                 _add_log(f"Phase 2 blocked — {foundation_err}", "error")
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
-                _update_branch(branch_id, {"status": "failed", "failed_agents": ["agent_02"]}, brand_slug)
+                await run_io(fail_run, run_id, total)
+                await run_io(_update_branch, branch_id, {"status": "failed", "failed_agents": ["agent_02"]}, brand_slug)
                 await broadcast({"type": "pipeline_error", "message": foundation_err, "branch_id": branch_id})
                 return
 
             # Use branch-specific temperature for Creative Engine (if set)
-            branch_data = _get_branch(branch_id, brand_slug)
             branch_temp = branch_data.get("temperature") if branch_data else None
 
             r02 = await _run_single_agent_async("agent_02", inputs, loop, run_id, output_dir=output_dir, temperature=branch_temp)
             if not r02:
                 _add_log("Phase 2 failed — Creative Engine is required", "error")
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
-                _update_branch(branch_id, {"status": "failed", "failed_agents": ["agent_02"]}, brand_slug)
+                await run_io(fail_run, run_id, total)
+                await run_io(_update_branch, branch_id, {"status": "failed", "failed_agents": ["agent_02"]}, brand_slug)
                 return
             inputs["idea_brief"] = r02
 
             branch_completed = ["agent_02"]
-            _update_branch(branch_id, {"completed_agents": branch_completed}, brand_slug)
+            await run_io(_update_branch, branch_id, {"completed_agents": branch_completed}, brand_slug)
 
         # Abort check
         if pipeline_state["abort_requested"]:
@@ -1996,9 +2682,9 @@ async def run_branch_pipeline(
             await broadcast({"type": "phase_start", "phase": 3, "branch_id": branch_id})
 
             # Load upstream: Phase 1 from shared, Phase 2 from branch
-            _auto_load_upstream(inputs, ["foundation_brief"], sync_foundation_identity=True, brand_slug=brand_slug)
+            await run_io(_auto_load_upstream, inputs, ["foundation_brief"], sync_foundation_identity=True, brand_slug=brand_slug)
             if "idea_brief" not in inputs or inputs["idea_brief"] is None:
-                data = _load_branch_output(brand_slug, branch_id, "agent_02")
+                data = await run_io(_load_branch_output, brand_slug, branch_id, "agent_02")
                 if data:
                     inputs["idea_brief"] = data
 
@@ -2011,8 +2697,8 @@ async def run_branch_pipeline(
             r04 = await _run_copywriter_parallel_async(inputs, loop, run_id, output_dir=output_dir)
             if not r04:
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
-                _update_branch(branch_id, {"status": "failed", "failed_agents": pipeline_state["failed_agents"]}, brand_slug)
+                await run_io(fail_run, run_id, total)
+                await run_io(_update_branch, branch_id, {"status": "failed", "failed_agents": pipeline_state["failed_agents"]}, brand_slug)
                 return
             inputs["copywriter_brief"] = r04
 
@@ -2023,18 +2709,18 @@ async def run_branch_pipeline(
             r05 = await _run_single_agent_async("agent_05", inputs, loop, run_id, output_dir=output_dir)
             if not r05:
                 total = time.time() - pipeline_state["start_time"]
-                fail_run(run_id, total)
-                _update_branch(branch_id, {"status": "failed", "failed_agents": pipeline_state["failed_agents"]}, brand_slug)
+                await run_io(fail_run, run_id, total)
+                await run_io(_update_branch, branch_id, {"status": "failed", "failed_agents": pipeline_state["failed_agents"]}, brand_slug)
                 return
             inputs["hook_brief"] = r05
 
         total = time.time() - pipeline_state["start_time"]
-        complete_run(run_id, total)
+        await run_io(complete_run, run_id, total)
         final_cost = get_usage_summary()
         cost_str = f"${final_cost['total_cost']:.2f}" if final_cost['total_cost'] >= 0.01 else f"${final_cost['total_cost']:.4f}"
         _add_log(f"Branch pipeline complete in {total:.1f}s — total cost: {cost_str}", "success")
 
-        _update_branch(branch_id, {
+        await run_io(_update_branch, branch_id, {
             "status": "completed",
             "completed_agents": pipeline_state["completed_agents"],
         }, brand_slug)
@@ -2050,8 +2736,8 @@ async def run_branch_pipeline(
 
     except (PipelineAborted, asyncio.CancelledError):
         total = time.time() - pipeline_state["start_time"]
-        fail_run(run_id, total)
-        _update_branch(branch_id, {"status": "failed"}, brand_slug)
+        await run_io(fail_run, run_id, total)
+        await run_io(_update_branch, branch_id, {"status": "failed"}, brand_slug)
         abort_cost = get_usage_summary()
         _add_log(f"Branch pipeline aborted — cost so far: ${abort_cost['total_cost']:.4f}", "warning")
         try:
@@ -2066,8 +2752,8 @@ async def run_branch_pipeline(
             pass
     except Exception as e:
         total = time.time() - pipeline_state["start_time"]
-        fail_run(run_id, total)
-        _update_branch(branch_id, {"status": "failed"}, brand_slug)
+        await run_io(fail_run, run_id, total)
+        await run_io(_update_branch, branch_id, {"status": "failed"}, brand_slug)
         err_cost = get_usage_summary()
         _add_log(f"Branch pipeline error: {e}", "error")
         logger.exception("Branch pipeline failed")
@@ -2078,7 +2764,6 @@ async def run_branch_pipeline(
         pipeline_state["pipeline_task"] = None
         pipeline_state["current_phase"] = None
         pipeline_state["current_agent"] = None
-        pipeline_state["run_id"] = None
         pipeline_state["active_branch"] = None
         pipeline_state["copywriter_rewrite_in_progress"] = False
 
@@ -2088,8 +2773,9 @@ class ContinueRequest(BaseModel):
 
 
 @app.post("/api/continue")
-async def api_continue(req: ContinueRequest = None):
+async def api_continue(req: ContinueRequest = None, run_id: Optional[int] = None):
     """Approve the current phase gate and continue to the next agent."""
+    run_manager.bind(run_id)
     if req is None:
         req = ContinueRequest()
     if pipeline_state.get("copywriter_rewrite_in_progress"):
@@ -2118,8 +2804,11 @@ class RewriteFailedCopywriterRequest(BaseModel):
 
 
 @app.post("/api/rewrite-failed-copywriter")
-async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = None):
+async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = None, run_id: Optional[int] = None):
     """Retry only failed parallel Agent 04 jobs while paused at the phase gate."""
+    run_manager.bind(run_id)
+    if pipeline_state.get("usage_scope") is not None:
+        begin_usage_scope(pipeline_state["usage_scope"])  # bill retries to the run
     if req is None:
         req = RewriteFailedCopywriterRequest()
 
@@ -2143,7 +2832,7 @@ async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = No
     base_inputs = dict(ctx.get("base_inputs") or {})
     brand_slug = pipeline_state.get("active_brand_slug") or ""
     if not base_inputs.get("foundation_brief"):
-        _auto_load_upstream(base_inputs, ["foundation_brief"], sync_foundation_identity=True, brand_slug=brand_slug)
+        await run_io(_auto_load_upstream, base_inputs, ["foundation_brief"], sync_foundation_identity=True, brand_slug=brand_slug)
 
     base_output_dir = Path(ctx.get("output_dir") or (_brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR))
     run_id = int(ctx.get("run_id") or pipeline_state.get("run_id") or 0)
@@ -2182,16 +2871,17 @@ async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = No
             provider=provider,
             model=model,
             jobs_dir=jobs_dir,
-            max_parallel=4,
+            pool=get_provider_pool(provider, model),
         )
 
         new_scripts = [s["script"] for s in successes]
         out_path = base_output_dir / "agent_04_output.json"
         existing_output = {}
         existing_scripts: list[dict[str, Any]] = []
-        if out_path.exists():
+        existing_text = await output_store.aread_text(out_path)
+        if existing_text is not None:
             try:
-                existing_output = json.loads(out_path.read_text("utf-8"))
+                existing_output = json.loads(existing_text)
                 data_scripts = existing_output.get("scripts", [])
                 if isinstance(data_scripts, list):
                     existing_scripts = [s for s in data_scripts if isinstance(s, dict)]
@@ -2205,8 +2895,9 @@ async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = No
             "product_name": existing_output.get("product_name") or base_inputs.get("product_name"),
             "batch_id": existing_output.get("batch_id") or base_inputs.get("batch_id"),
         }
-        merged_output = _build_copywriter_output(merged_inputs, merged_scripts)
-        out_path.write_text(json.dumps(merged_output, indent=2), encoding="utf-8")
+        merged_output = await run_cpu(encode_document, _build_copywriter_output(merged_inputs, merged_scripts))
+        await output_store.awrite_bytes(out_path, merged_output.raw)
+        await run_io(_record_output_saved, base_output_dir, "agent_04")
         logger.info("Output saved: %s", out_path)
 
         elapsed = time.time() - started
@@ -2222,7 +2913,8 @@ async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = No
         }
 
         if run_id:
-            save_agent_output(
+            await run_io(
+                save_agent_output,
                 run_id=run_id,
                 agent_slug="agent_04",
                 agent_name=AGENT_META["agent_04"]["name"],
@@ -2268,9 +2960,12 @@ async def api_rewrite_failed_copywriter(req: RewriteFailedCopywriterRequest = No
 
 
 @app.get("/api/status")
-async def api_status():
-    """Get current pipeline status."""
+async def api_status(run_id: Optional[int] = None):
+    """Get pipeline status for ``run_id`` (default: the newest live run)."""
+    state = run_manager.bind(run_id)
     return {
+        "run_id": state.run_id,
+        "run_status": state.status,
         "running": pipeline_state["running"],
         "current_phase": pipeline_state["current_phase"],
         "current_agent": pipeline_state["current_agent"],
@@ -2282,53 +2977,81 @@ async def api_status():
             else None
         ),
         "log": pipeline_state["log"][-50:],
-        "server_log_tail": list(_recent_server_logs)[-150:],
+        "server_log_tail": log_channel.tail(150),
         "active_brand_slug": pipeline_state.get("active_brand_slug"),
+        "runs": run_manager.snapshot()["runs"],
     }
 
 
+@app.get("/api/active-runs")
+async def api_active_runs():
+    """Live and recently finished runs held by the RunManager, plus queue depth."""
+    return run_manager.snapshot()
+
+
+@app.get("/api/scheduler")
+async def api_scheduler():
+    """LLM scheduler queue depth, running work and wait times per priority class,
+    plus the same for the non-LLM executors (io, cpu)."""
+    return {**get_scheduler().snapshot(), "executors": executors_snapshot()}
+
+
 @app.get("/api/outputs")
-async def api_list_outputs(brand: str = ""):
+async def api_list_outputs(request: Request, brand: str = ""):
     """List all available agent outputs (from disk — brand-scoped)."""
     brand_slug = brand or pipeline_state.get("active_brand_slug") or ""
     base = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
+    present = await output_cache.alisting(base)
+    infos = {
+        slug: await output_cache.ainfo(base / f"{slug}_output.json")
+        if f"{slug}_output.json" in present else None
+        for slug in AGENT_META
+    }
+    etag = combined_etag(infos.items())
+    mtimes = [i.mtime for i in infos.values() if i is not None]
+    if _not_modified(request, etag, max(mtimes) if mtimes else None):
+        return _not_modified_response(etag)
+
     outputs = []
-    for slug in AGENT_META:
-        path = base / f"{slug}_output.json"
+    for slug, info in infos.items():
         meta = AGENT_META[slug]
         entry = {
             "slug": slug,
             "name": meta["name"],
             "phase": meta["phase"],
             "icon": meta["icon"],
-            "available": path.exists(),
+            "available": info is not None,
         }
-        if path.exists():
-            stat = path.stat()
-            entry["size_kb"] = round(stat.st_size / 1024, 1)
-            entry["modified"] = datetime.fromtimestamp(stat.st_mtime).strftime(
+        if info is not None:
+            entry["size_kb"] = round(info.size / 1024, 1)
+            entry["modified"] = datetime.fromtimestamp(info.mtime).strftime(
                 "%Y-%m-%d %H:%M:%S"
             )
         outputs.append(entry)
-    return outputs
+    return JSONResponse(outputs, headers=_cache_headers(etag, max(mtimes) if mtimes else None))
 
 
 @app.get("/api/outputs/{slug}")
-async def api_get_output(slug: str, brand: str = ""):
-    """Get a specific agent's output (from disk — brand-scoped)."""
+async def api_get_output(
+    slug: str,
+    request: Request,
+    brand: str = "",
+    path: str = "",
+    offset: int = 0,
+    limit: int = 0,
+):
+    """Get a specific agent's output (from disk — brand-scoped).
+
+    ``?path=scripts&offset=0&limit=5`` returns just that sub-resource (a page
+    of it when it is a list) instead of the whole document.
+    """
     brand_slug = brand or pipeline_state.get("active_brand_slug") or ""
     base = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
-    path = base / f"{slug}_output.json"
-    if not path.exists():
-        return JSONResponse({"error": f"No output for {slug}"}, status_code=404)
-    data = json.loads(path.read_text("utf-8"))
-    meta = AGENT_META.get(slug, {"name": slug, "phase": 0, "icon": ""})
-    return {
-        "slug": slug,
-        "name": meta["name"],
-        "phase": meta["phase"],
-        "data": data,
-    }
+    return await _output_file_response(
+        base / f"{slug}_output.json", slug, request,
+        json_path=path, offset=offset, limit=limit,
+        not_found=f"No output for {slug}",
+    )
 
 
 @app.get("/api/agent-models")
@@ -2380,10 +3103,8 @@ async def api_sample_input(name: str = "animus"):
         "nord": "sample_input_nord.json",
     }
     filename = filename_map.get(name, "sample_input.json")
-    path = Path(filename)
-    if path.exists():
-        return json.loads(path.read_text())
-    return {}
+    text = await output_store.aread_text(Path(filename))
+    return json.loads(text) if text is not None else {}
 
 
 @app.delete("/api/outputs")
@@ -2393,9 +3114,7 @@ async def api_clear_outputs(brand: str = ""):
     base = _brand_output_dir(brand_slug) if brand_slug else config.OUTPUT_DIR
     count = 0
     for slug in AGENT_META:
-        path = base / f"{slug}_output.json"
-        if path.exists():
-            path.unlink()
+        if await output_store.aremove(base / f"{slug}_output.json"):
             count += 1
     return {"cleared": count}
 
@@ -2410,12 +3129,7 @@ async def api_list_brands_endpoint(limit: int = 50):
     brands = list_brands(limit=limit)
     # Enrich with agent availability
     for b in brands:
-        bdir = config.OUTPUT_DIR / b["slug"]
-        available_agents = [
-            slug for slug in AGENT_META
-            if (bdir / f"{slug}_output.json").exists()
-        ]
-        b["available_agents"] = available_agents
+        b["available_agents"] = _available_agents(config.OUTPUT_DIR / b["slug"])
     return brands
 
 
@@ -2426,11 +3140,7 @@ async def api_get_brand_endpoint(brand_slug_param: str):
     if not brand:
         return JSONResponse({"error": "Brand not found"}, status_code=404)
     # Enrich with agent availability
-    bdir = config.OUTPUT_DIR / brand_slug_param
-    brand["available_agents"] = [
-        slug for slug in AGENT_META
-        if (bdir / f"{slug}_output.json").exists()
-    ]
+    brand["available_agents"] = _available_agents(config.OUTPUT_DIR / brand_slug_param)
     # Load branches for this brand
     brand["branches"] = _load_branches(brand_slug_param)
     return brand
@@ -2445,11 +3155,7 @@ async def api_open_brand(brand_slug_param: str):
     touch_brand(brand_slug_param)
     pipeline_state["active_brand_slug"] = brand_slug_param
     # Enrich with agent availability
-    bdir = config.OUTPUT_DIR / brand_slug_param
-    brand["available_agents"] = [
-        slug for slug in AGENT_META
-        if (bdir / f"{slug}_output.json").exists()
-    ]
+    brand["available_agents"] = _available_agents(config.OUTPUT_DIR / brand_slug_param)
     brand["branches"] = _load_branches(brand_slug_param)
     return brand
 
@@ -2460,9 +3166,7 @@ async def api_delete_brand_endpoint(brand_slug_param: str):
     found = storage_delete_brand(brand_slug_param)
     if not found:
         return JSONResponse({"error": "Brand not found"}, status_code=404)
-    brand_dir = config.OUTPUT_DIR / brand_slug_param
-    if brand_dir.exists():
-        shutil.rmtree(brand_dir, ignore_errors=True)
+    await output_store.aremove_tree(config.OUTPUT_DIR / brand_slug_param)
     if pipeline_state.get("active_brand_slug") == brand_slug_param:
         pipeline_state["active_brand_slug"] = None
     return {"ok": True, "deleted": brand_slug_param}
@@ -2475,16 +3179,22 @@ async def api_delete_brand_endpoint(brand_slug_param: str):
 @app.get("/api/runs")
 async def api_list_runs(limit: int = 50):
     """List past pipeline runs, newest first."""
-    return list_runs(limit=limit)
+    return await run_io(list_runs, limit=limit)
 
 
 @app.get("/api/runs/{run_id}")
 async def api_get_run(run_id: int):
-    """Get a specific run with all its agent outputs."""
-    run = get_run(run_id)
-    if not run:
+    """Get a specific run with all its agent outputs (stored JSON passed through)."""
+    body = await run_io(get_run_json, run_id)
+    if body is None:
         return JSONResponse({"error": f"Run #{run_id} not found"}, status_code=404)
-    return run
+    return Response(body, media_type="application/json")
+
+
+@app.get("/api/runs/{run_id}/logs")
+async def api_run_logs(run_id: int, since: int = 0, limit: int = 1000):
+    """Replay a run's server log lines with seq > ``since`` (ring buffer, persisted)."""
+    return await log_channel.replay(run_id, since=since, limit=min(max(limit, 1), 5000))
 
 
 class LabelUpdate(BaseModel):
@@ -2511,57 +3221,105 @@ async def api_delete_run(run_id: int):
 # WebSocket for real-time updates
 # ---------------------------------------------------------------------------
 
+# Clients that never send "hello" still get a snapshot after this long.
+_WS_HELLO_TIMEOUT = 2.0
+
+
+def _state_sync_message() -> dict:
+    """Full snapshot for a cold-starting dashboard (focus run + recent logs)."""
+    focus = run_manager.bind(None)
+    # Build gate info if pipeline is paused at a phase gate
+    gate_info = None
+    if pipeline_state.get("waiting_for_approval"):
+        current_phase = pipeline_state.get("current_phase", 1)
+        # Try to reconstruct agent-level gate info
+        last_completed = pipeline_state.get("completed_agents", [])
+        completed_slug = last_completed[-1] if last_completed else "agent_01a"
+        # Map completed agent to next agent
+        _next_agent_map = {
+            "agent_01a": ("agent_02", "Creative Engine"),
+            "agent_02": ("agent_04", "Copywriter"),
+            "agent_04": ("agent_05", "Hook Specialist"),
+        }
+        next_slug, next_name = _next_agent_map.get(completed_slug, ("unknown", "Next Agent"))
+        copywriter_failed_count = 0
+        if completed_slug == "agent_04":
+            copywriter_failed_count = len(pipeline_state.get("copywriter_failed_jobs", []))
+        gate_info = {
+            "completed_agent": completed_slug,
+            "next_agent": next_slug,
+            "next_agent_name": next_name,
+            "phase": current_phase,
+            "show_concept_selection": completed_slug == "agent_02",
+            "copywriter_failed_count": copywriter_failed_count,
+        }
+
+    return {
+        "type": "state_sync",
+        # Event stream position this snapshot reflects; the client resumes from here.
+        "epoch": ws_hub.epoch,
+        "seq": ws_hub.seq,
+        "run_id": focus.run_id,
+        "runs": run_manager.snapshot()["runs"],
+        "running": pipeline_state["running"],
+        "current_phase": pipeline_state["current_phase"],
+        "current_agent": pipeline_state["current_agent"],
+        "completed_agents": pipeline_state["completed_agents"],
+        "log": pipeline_state["log"][-50:],
+        "server_log_tail": log_channel.tail(150),
+        "waiting_for_approval": pipeline_state.get("waiting_for_approval", False),
+        "gate_info": gate_info,
+        "active_branch": pipeline_state.get("active_branch"),
+        "active_brand_slug": pipeline_state.get("active_brand_slug"),
+    }
+
+
+def _sync_ws_client(client, epoch: str | None = None, last_seq: int | None = None):
+    """Resume ``client`` from ``last_seq`` if possible, else send a snapshot."""
+    if client.synced:
+        return
+    client.synced = True
+    if not ws_hub.resume(client, epoch, last_seq):
+        client.enqueue(_state_sync_message())
+
+
+def _handle_ws_client_message(client, text: str):
+    """Handle hello (resume) and subscribe/unsubscribe requests from a client."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return
+    if not isinstance(data, dict):
+        return
+    kind = data.get("type")
+    if kind == "hello":
+        _sync_ws_client(client, data.get("epoch"), data.get("last_seq"))
+        return
+    topics = data.get("topics") if isinstance(data.get("topics"), dict) else None
+    if kind == "subscribe":
+        client.subscription.subscribe(topics, data.get("log_level"))
+    elif kind == "unsubscribe":
+        client.subscription.unsubscribe(topics)
+    else:
+        return
+    client.enqueue({"type": "subscribed", **client.subscription.snapshot()})
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
+    """Event stream. Clients send {"type": "hello", "epoch", "last_seq"} and get
+    only the events they missed; a cold start gets one state_sync snapshot."""
     await ws.accept()
-    ws_clients.append(ws)
+    client = ws_hub.add(ws)
+    fallback = asyncio.get_running_loop().call_later(_WS_HELLO_TIMEOUT, _sync_ws_client, client)
     try:
-        # Build gate info if pipeline is paused at a phase gate
-        gate_info = None
-        if pipeline_state.get("waiting_for_approval"):
-            current_phase = pipeline_state.get("current_phase", 1)
-            # Try to reconstruct agent-level gate info
-            last_completed = pipeline_state.get("completed_agents", [])
-            completed_slug = last_completed[-1] if last_completed else "agent_01a"
-            # Map completed agent to next agent
-            _next_agent_map = {
-                "agent_01a": ("agent_02", "Creative Engine"),
-                "agent_02": ("agent_04", "Copywriter"),
-                "agent_04": ("agent_05", "Hook Specialist"),
-            }
-            next_slug, next_name = _next_agent_map.get(completed_slug, ("unknown", "Next Agent"))
-            copywriter_failed_count = 0
-            if completed_slug == "agent_04":
-                copywriter_failed_count = len(pipeline_state.get("copywriter_failed_jobs", []))
-            gate_info = {
-                "completed_agent": completed_slug,
-                "next_agent": next_slug,
-                "next_agent_name": next_name,
-                "phase": current_phase,
-                "show_concept_selection": completed_slug == "agent_02",
-                "copywriter_failed_count": copywriter_failed_count,
-            }
-
-        await ws.send_json({
-            "type": "state_sync",
-            "running": pipeline_state["running"],
-            "current_phase": pipeline_state["current_phase"],
-            "current_agent": pipeline_state["current_agent"],
-            "completed_agents": pipeline_state["completed_agents"],
-            "log": pipeline_state["log"][-50:],
-            "server_log_tail": list(_recent_server_logs)[-150:],
-            "waiting_for_approval": pipeline_state.get("waiting_for_approval", False),
-            "gate_info": gate_info,
-            "active_branch": pipeline_state.get("active_branch"),
-            "active_brand_slug": pipeline_state.get("active_brand_slug"),
-        })
         while True:
-            await ws.receive_text()
+            _handle_ws_client_message(client, await ws.receive_text())
     except WebSocketDisconnect:
         pass
     finally:
-        if ws in ws_clients:
-            ws_clients.remove(ws)
+        fallback.cancel()
+        ws_hub.remove(ws)
 
 
 # ---------------------------------------------------------------------------
@@ -2571,12 +3329,25 @@ async def websocket_endpoint(ws: WebSocket):
 static_dir = Path(__file__).parent / "static"
 static_dir.mkdir(exist_ok=True)
 
+# Hashed, precompressed app.js/style.css under /assets/ (see build_static.py);
+# /static keeps serving the source files.
+static_assets = StaticAssets(static_dir)
+
+
+@app.get("/assets/{name}")
+async def asset(name: str, request: Request):
+    response = static_assets.asset_response(name, request)
+    if response is None:
+        return JSONResponse({"error": "Not found"}, status_code=404)
+    return response
+
+
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 
 @app.get("/")
-async def index():
-    return FileResponse(str(static_dir / "index.html"))
+async def index(request: Request):
+    return static_assets.index_response(request)
 
 
 # ---------------------------------------------------------------------------
@@ -2587,4 +3358,5 @@ if __name__ == "__main__":
     import uvicorn
     print("\n  Creative Maker Pipeline Dashboard")
     print("  http://localhost:8000\n")
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # permessage-deflate compresses large payloads (state_sync, log tails).
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info", ws_per_message_deflate=True)
@@ -15,12 +15,25 @@ let resultIndex = 0;         // current result being viewed
 let loadedResults = [];       // [{slug, name, icon, data}, ...]
 let pipelineRunning = false;
 let agentTimers = {};  // slug -> { startTime, intervalId }
-let statusPollTimer = null;
+let streamLogAt = {};  // "slug:job_key" -> last time stream progress was logged
+let rerunJobs = {};         // job_id -> agent slug, for queued /api/rerun jobs
+let pendingJobUpdates = {}; // job_id -> finished job that arrived before its POST returned
+// Position in the server's event stream. Sent in "hello" on reconnect so
+// the server replays only missed events instead of a full state_sync.
+let lastEventSeq = null;
+let serverEpoch = null;
 let serverLogSeen = new Set();
 let serverLogSeenOrder = [];
+let serverLogSeq = {};  // run_id -> last server_log seq received
+// Run this tab is following. The server runs several pipelines at once, so
+// run-scoped API calls pass it and WS events for other runs are ignored.
+// null = adopt the next run that starts.
+let activeRunId = null;
 
 // Brand state
 let activeBrandSlug = null;
+// Brand this tab's /ws subscription is narrowed to (see syncSubscription).
+let subscribedBrand = null;
 let brandList = [];
 let brandSelectorOpen = false;
 
@@ -73,6 +86,9 @@ function connectWS() {
 
   ws.onopen = () => {
     if (reconnectTimer) { clearTimeout(reconnectTimer); reconnectTimer = null; }
+    subscribedBrand = null;  // new connection starts unfiltered
+    syncSubscription();
+    ws.send(JSON.stringify({ type: 'hello', epoch: serverEpoch, last_seq: lastEventSeq }));
   };
 
   ws.onclose = () => {
@@ -83,13 +99,60 @@ function connectWS() {
 
   ws.onmessage = (event) => {
     const msg = JSON.parse(event.data);
+    if (msg.type === 'state_sync') {
+      serverEpoch = msg.epoch || null;
+    } else if (msg.seq != null && lastEventSeq != null && msg.seq <= lastEventSeq) {
+      return;  // already applied (replay overlap)
+    }
+    if (msg.seq != null) lastEventSeq = msg.seq;
     handleMessage(msg);
+    syncSubscription();
   };
 }
 
+// Narrow the server-side WS stream to the brand this tab has open, so events
+// and log lines from other brands' runs aren't sent here at all.
+function syncSubscription() {
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  const brand = activeBrandSlug || null;
+  if (brand === subscribedBrand) return;
+  ws.send(JSON.stringify({
+    type: 'subscribe',
+    topics: { brand_slug: brand ? [brand] : '*' },
+    log_level: 'info',
+  }));
+  if (subscribedBrand && brand) {
+    ws.send(JSON.stringify({ type: 'unsubscribe', topics: { brand_slug: [subscribedBrand] } }));
+  }
+  subscribedBrand = brand;
+}
+
+// Append ?run_id= for run-scoped endpoints once we follow a specific run.
+function runScoped(url) {
+  if (activeRunId == null) return url;
+  return url + (url.includes('?') ? '&' : '?') + `run_id=${activeRunId}`;
+}
+
+function isOtherRun(msg) {
+  return msg.run_id != null && activeRunId != null && msg.run_id !== activeRunId;
+}
+
 function handleMessage(msg) {
+  if (msg.type === 'pipeline_start' && activeRunId == null && msg.run_id != null) {
+    activeRunId = msg.run_id;
+  }
+  if (msg.type !== 'state_sync' && isOtherRun(msg)) return;
   switch (msg.type) {
+    case 'run_queued':
+      document.getElementById('pipeline-title').textContent = 'Queued...';
+      document.getElementById('pipeline-subtitle').textContent =
+        `Other pipelines are running — this run is #${msg.queue_position || 1} in the queue.`;
+      goToView('pipeline');
+      showAbortButton(true);
+      break;
+
     case 'state_sync':
+      if (msg.run_id != null) activeRunId = msg.run_id;
       const pausedAtGate = Boolean(msg.waiting_for_approval && msg.gate_info);
       // Track active brand from server
       if (msg.active_brand_slug) {
@@ -222,8 +285,15 @@ function handleMessage(msg) {
       break;
 
     case 'stream_progress':
-      // Live streaming progress from LLM — update the activity log
-      appendLog({ time: ts(), level: 'info', message: `${AGENT_NAMES[msg.slug] || msg.slug}: ${msg.message}` });
+      // Live streaming progress from LLM — card line + (throttled) activity log
+      if (msg.tokens != null) {
+        showStreamProgress(msg);
+        const key = `${msg.slug}:${msg.job_key || ''}`;
+        const now = Date.now();
+        if (msg.done || now - (streamLogAt[key] || 0) < 15000) break;
+        streamLogAt[key] = now;
+      }
+      appendLog({ time: ts(), level: 'info', message: `${AGENT_NAMES[msg.slug] || msg.slug}${msg.job_key ? ` (${msg.job_key})` : ''}: ${msg.message}` });
       break;
 
     case 'agent_complete':
@@ -243,6 +313,14 @@ function handleMessage(msg) {
 
     case 'server_log':
       // Stream of real server-side log lines
+      if (msg.run_id != null && msg.first_log_seq != null) {
+        const lastSeq = serverLogSeq[msg.run_id];
+        if (lastSeq != null && msg.first_log_seq > lastSeq + 1) {
+          // Lines were dropped while this tab lagged — replay the gap.
+          backfillServerLog(msg.run_id, lastSeq);
+        }
+        serverLogSeq[msg.run_id] = Math.max(lastSeq || 0, msg.log_seq || 0);
+      }
       appendServerLogLines(msg.lines || []);
       break;
 
@@ -298,6 +376,10 @@ function handleMessage(msg) {
       loadBranches();
       break;
 
+    case 'job_update':
+      handleJobUpdate(msg.job);
+      break;
+
     case 'pipeline_error':
       pipelineRunning = false;
       stopTimer();
@@ -338,6 +420,7 @@ function setCardState(slug, state, elapsed, error) {
   if (!card) return;
 
   card.className = `agent-card ${state}`;
+  if (state !== 'running') card.querySelector('.card-progress')?.remove();
   const badge = card.querySelector('.status-badge');
   if (!badge) return;
 
@@ -503,6 +586,17 @@ function appendServerLogLines(lines) {
   }
 }
 
+async function backfillServerLog(runId, since) {
+  try {
+    const resp = await fetch(`/api/runs/${runId}/logs?since=${since}`);
+    if (!resp.ok) return;
+    const data = await resp.json();
+    appendServerLogLines((data.lines || []).map(l => l.line));
+  } catch (e) {
+    // Best effort — the live stream continues regardless.
+  }
+}
+
 function clearServerLog() {
   const box = document.getElementById('terminal-output');
   if (box) box.innerHTML = '';
@@ -510,26 +604,27 @@ function clearServerLog() {
   serverLogSeenOrder = [];
 }
 
-function startStatusPolling() {
-  if (statusPollTimer) return;
-  statusPollTimer = setInterval(async () => {
-    try {
-      const resp = await fetch('/api/status');
-      if (!resp.ok) return;
-      const data = await resp.json();
-      if ((data.server_log_tail || []).length) {
-        appendServerLogLines(data.server_log_tail);
-      }
-    } catch (e) {
-      // Ignore transient polling errors.
-    }
-  }, 4000);
-}
-
 // -----------------------------------------------------------
 // AGENT ELAPSED TIMER (shows ticking seconds on running cards)
 // -----------------------------------------------------------
 
+// Latest structured stream progress on the agent card (one line; parallel
+// copywriter jobs show whichever job reported last, labelled by job key).
+function showStreamProgress(msg) {
+  const card = document.getElementById(`card-${msg.slug}`);
+  if (!card || !card.classList.contains('running')) return;
+  let line = card.querySelector('.card-progress');
+  if (!line) {
+    line = document.createElement('div');
+    line.className = 'card-progress';
+    card.appendChild(line);
+  }
+  const parts = [`~${Number(msg.tokens).toLocaleString()} tok`, `${msg.tokens_per_sec} tok/s`];
+  if (msg.percent != null) parts.push(`${Math.round(msg.percent)}%`);
+  if (msg.eta_seconds != null && !msg.done) parts.push(`~${Math.round(msg.eta_seconds)}s left`);
+  line.textContent = (msg.job_key ? `${msg.job_key}: ` : '') + parts.join(' · ');
+}
+
 function startAgentTimer(slug) {
   stopAgentTimer(slug); // clear any existing
   const startTime = Date.now();
@@ -661,7 +756,7 @@ async function startPipeline() {
     if (!proceed) return;
 
     try {
-      await fetch('/api/abort', { method: 'POST' });
+      await fetch(runScoped('/api/abort'), { method: 'POST' });
     } catch (e) {
       // Ignore and continue to status polling.
     }
@@ -669,7 +764,7 @@ async function startPipeline() {
     // Wait briefly for backend to clear running state.
     for (let i = 0; i < 20; i++) {
       try {
-        const s = await fetch('/api/status');
+        const s = await fetch(runScoped('/api/status'));
         const data = await s.json();
         if (!data.running) break;
       } catch (e) {
@@ -699,6 +794,7 @@ async function startPipeline() {
 
   const quickMode = document.getElementById('cb-quick-mode')?.checked || false;
 
+  activeRunId = null;  // follow the run this request starts
   try {
     const resp = await fetch('/api/run', {
       method: 'POST',
@@ -714,8 +810,10 @@ async function startPipeline() {
     if (data.error) {
       alert(data.error);
       setRunDisabled(false);
-    } else if (data.brand_slug) {
-      activeBrandSlug = data.brand_slug;
+    } else {
+      if (data.run_id != null) activeRunId = data.run_id;
+      if (data.brand_slug) activeBrandSlug = data.brand_slug;
+      syncSubscription();
     }
     // Pipeline view transition happens via WS message
   } catch (e) {
@@ -751,7 +849,7 @@ async function abortPipeline() {
     btn.disabled = true;
   }
   try {
-    const resp = await fetch('/api/abort', { method: 'POST' });
+    const resp = await fetch(runScoped('/api/abort'), { method: 'POST' });
     const data = await resp.json();
     if (data.error) {
       alert(data.error);
@@ -973,7 +1071,7 @@ async function continuePhase(withConceptSelection) {
     }
 
     try {
-      const resp = await fetch('/api/select-concepts', {
+      const resp = await fetch(runScoped('/api/select-concepts'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ selected: selections, model_override: modelOverride }),
@@ -1001,7 +1099,7 @@ async function continuePhase(withConceptSelection) {
   }
 
   try {
-    const resp = await fetch('/api/continue', {
+    const resp = await fetch(runScoped('/api/continue'), {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ model_override: modelOverride }),
@@ -1034,7 +1132,7 @@ async function rewriteFailedCopywriter() {
   startAgentTimer('agent_04');
 
   try {
-    const resp = await fetch('/api/rewrite-failed-copywriter', {
+    const resp = await fetch(runScoped('/api/rewrite-failed-copywriter'), {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ model_override: modelOverride }),
@@ -1179,18 +1277,16 @@ async function rerunAgent(slug, overrideProvider, overrideModel) {
     });
     const data = await resp.json();
 
-    stopAgentTimer(slug);
-
     if (data.error) {
+      stopAgentTimer(slug);
       setCardState(slug, 'failed', null, data.error);
       appendLog({ time: ts(), level: 'error', message: `Rerun ${slug} failed: ${data.error}` });
       return;
     }
 
-    // Success
-    setCardState(slug, 'done', data.elapsed);
-    if (data.cost) updateCost(data.cost);
-    appendLog({ time: ts(), level: 'success', message: `${slug} rerun completed (${data.elapsed}s)` });
+    // Queued — completion arrives as a job_update over the WebSocket
+    rerunJobs[data.job_id] = slug;
+    if (pendingJobUpdates[data.job_id]) handleJobUpdate(pendingJobUpdates[data.job_id]);
   } catch (e) {
     stopAgentTimer(slug);
     setCardState(slug, 'failed', null, e.message);
@@ -1198,6 +1294,35 @@ async function rerunAgent(slug, overrideProvider, overrideModel) {
   }
 }
 
+// Rerun jobs are tracked by id; a job_update can beat the POST response, so
+// finished updates for unknown jobs are parked briefly.
+function handleJobUpdate(job) {
+  if (!job || job.kind !== 'rerun') return;
+  const slug = rerunJobs[job.id];
+  if (!slug) {
+    if (job.status === 'completed' || job.status === 'failed') {
+      pendingJobUpdates[job.id] = job;
+      setTimeout(() => delete pendingJobUpdates[job.id], 10000);
+    }
+    return;
+  }
+  if (job.status === 'completed') {
+    delete rerunJobs[job.id];
+    delete pendingJobUpdates[job.id];
+    stopAgentTimer(slug);
+    const result = job.result || {};
+    setCardState(slug, 'done', result.elapsed);
+    if (result.cost) updateCost(result.cost);
+    appendLog({ time: ts(), level: 'success', message: `${slug} rerun completed (${result.elapsed}s)` });
+  } else if (job.status === 'failed') {
+    delete rerunJobs[job.id];
+    delete pendingJobUpdates[job.id];
+    stopAgentTimer(slug);
+    setCardState(slug, 'failed', null, job.error);
+    appendLog({ time: ts(), level: 'error', message: `Rerun ${slug} failed: ${job.error}` });
+  }
+}
+
 // -----------------------------------------------------------
 // COST TRACKER
 // -----------------------------------------------------------
@@ -1241,6 +1366,7 @@ function closeCardPreview(slug) {
 function clearPreviewCache() {
   for (const key in cardPreviewCache) delete cardPreviewCache[key];
   chatHistories = {};
+  chatSessions = {};
   // Collapse all open previews
   document.querySelectorAll('.card-preview').forEach(p => p.classList.add('hidden'));
   document.querySelectorAll('.agent-card.expanded').forEach(c => c.classList.remove('expanded'));
@@ -1257,6 +1383,7 @@ function clearPreviewCache() {
 // -----------------------------------------------------------
 
 let chatHistories = {};  // slug -> [{role, content}, ...]
+let chatSessions = {};   // slug -> server-side chat session id
 
 async function sendChatMessage(slug) {
   const input = document.getElementById(`chat-input-${slug}`);
@@ -1286,23 +1413,39 @@ async function sendChatMessage(slug) {
   const modelVal = modelSelect ? modelSelect.value : 'google/gemini-2.5-flash';
   const [provider, model] = modelVal.split('/');
 
+  let streamBubble = null;
+  const showDelta = (text) => {
+    if (!streamBubble) {
+      const typingEl = document.getElementById(typingId);
+      if (typingEl) typingEl.remove();
+      appendChatMessage(slug, 'assistant', '');
+      streamBubble = messagesEl.lastElementChild;
+      streamBubble.dataset.raw = '';
+    }
+    streamBubble.dataset.raw += text;
+    streamBubble.querySelector('.chat-msg-bubble').innerHTML = formatChatText(streamBubble.dataset.raw);
+    messagesEl.scrollTop = messagesEl.scrollHeight;
+  };
+
   try {
-    const resp = await fetch('/api/chat', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
-        slug,
-        message,
-        history: chatHistories[slug],
-        provider,
-        model,
-      }),
+    const data = await streamChat({
+      slug,
+      message,
+      session_id: chatSessions[slug] || null,
+      history: chatHistories[slug],
+      provider,
+      model,
+    }, {
+      session: (d) => { chatSessions[slug] = d.session_id; },
+      delta: (d) => showDelta(d.text),
+      edit: () => showDelta('\n\n**Applying edit…**'),
     });
-    const data = await resp.json();
+    if (data.session_id) chatSessions[slug] = data.session_id;
 
-    // Remove typing indicator
+    // Remove typing indicator / streamed draft; the final reply replaces it
     const typingEl = document.getElementById(typingId);
     if (typingEl) typingEl.remove();
+    if (streamBubble) streamBubble.remove();
 
     if (data.error) {
       appendChatMessage(slug, 'error', data.error);
@@ -1317,11 +1460,14 @@ async function sendChatMessage(slug) {
       // If there are changes, show the apply button
       if (data.has_changes && data.modified_output) {
         showApplyChanges(slug, data.modified_output);
+      } else if (data.edit_error) {
+        appendChatMessage(slug, 'error', data.edit_error);
       }
     }
   } catch (e) {
     const typingEl = document.getElementById(typingId);
     if (typingEl) typingEl.remove();
+    if (streamBubble) streamBubble.remove();
     appendChatMessage(slug, 'error', 'Failed to send message: ' + e.message);
   }
 
@@ -1329,20 +1475,59 @@ async function sendChatMessage(slug) {
   input.focus();
 }
 
-function appendChatMessage(slug, role, content) {
-  const messagesEl = document.getElementById(`chat-messages-${slug}`);
-  if (!messagesEl) return;
-
-  const div = document.createElement('div');
-  div.className = `chat-msg ${role}`;
+// POST a chat turn to /api/chat/stream and dispatch its SSE events to
+// handlers[event](data). Resolves with the final body (the `done` or
+// `error` event, or a plain JSON error response).
+async function streamChat(body, handlers) {
+  const resp = await fetch('/api/chat/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+    body: JSON.stringify(body),
+  });
+  if (!(resp.headers.get('content-type') || '').startsWith('text/event-stream')) {
+    return resp.json();
+  }
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) >= 0) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      const payload = data ? JSON.parse(data) : {};
+      if (event === 'done' || event === 'error') result = payload;
+      else if (handlers[event]) handlers[event](payload);
+    }
+  }
+  return result || { error: 'Chat stream ended unexpectedly' };
+}
 
+function formatChatText(content) {
   // Format content — convert markdown-like formatting
-  let html = esc(content)
+  return esc(content)
     .replace(/\n/g, '<br>')
     .replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>')
     .replace(/`([^`]+)`/g, '<code>$1</code>');
+}
 
-  div.innerHTML = `<div class="chat-msg-bubble">${html}</div>`;
+function appendChatMessage(slug, role, content) {
+  const messagesEl = document.getElementById(`chat-messages-${slug}`);
+  if (!messagesEl) return;
+
+  const div = document.createElement('div');
+  div.className = `chat-msg ${role}`;
+  div.innerHTML = `<div class="chat-msg-bubble">${formatChatText(content)}</div>`;
   messagesEl.appendChild(div);
   messagesEl.scrollTop = messagesEl.scrollHeight;
 }
@@ -1374,7 +1559,8 @@ async function applyChatChanges(slug) {
     const resp = await fetch('/api/chat/apply', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ slug, output: modifiedOutput }),
+      // The session's server-side document wins; output covers an expired session.
+      body: JSON.stringify({ slug, session_id: chatSessions[slug] || null, output: modifiedOutput }),
     });
     const data = await resp.json();
     if (data.error) {
@@ -2043,7 +2229,7 @@ async function crContinuePhase() {
   const modelOverride = getCrModelOverride() || getGateModelOverride();
 
   try {
-    const resp = await fetch('/api/select-concepts', {
+    const resp = await fetch(runScoped('/api/select-concepts'), {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ selected: selections, model_override: modelOverride }),
@@ -2563,6 +2749,7 @@ async function runBranch(branchId, options = {}) {
   const inputs = readForm();
   const brandParam = activeBrandSlug ? `?brand=${encodeURIComponent(activeBrandSlug)}` : '';
 
+  activeRunId = null;  // follow the run this request starts
   try {
     const resp = await fetch(`/api/branches/${branchId}/run${brandParam}`, {
       method: 'POST',
@@ -2579,6 +2766,7 @@ async function runBranch(branchId, options = {}) {
       if (!silent) alert(data.error);
       return { ok: false, error: data.error };
     }
+    if (data.run_id != null) activeRunId = data.run_id;
     // Pipeline view transition and state updates happen via WS
     return { ok: true, data };
   } catch (e) {
@@ -2801,6 +2989,7 @@ async function startFromPhase(phase) {
     brand: activeBrandSlug || '',
   };
 
+  activeRunId = null;  // follow the run this request starts
   try {
     const resp = await fetch(endpoint, {
       method: 'POST',
@@ -2808,6 +2997,7 @@ async function startFromPhase(phase) {
       body: JSON.stringify(requestBody),
     });
     const data = await resp.json();
+    if (data.run_id != null) activeRunId = data.run_id;
     if (data.error) {
       if (autoCreatedBranchId) {
         await fetch(`/api/branches/${autoCreatedBranchId}${brandParam}`, { method: 'DELETE' });
@@ -2953,6 +3143,7 @@ async function openBrand(slug) {
     }
 
     activeBrandSlug = slug;
+    syncSubscription();
 
     // Close brand selector panel
     if (brandSelectorOpen) toggleBrandSelector();
@@ -3019,6 +3210,7 @@ async function deleteBrand(slug) {
     // If the deleted brand was active, clear state
     if (activeBrandSlug === slug) {
       activeBrandSlug = null;
+      syncSubscription();
       resetAllCards();
       clearPreviewCache();
       branches = [];
@@ -3161,7 +3353,6 @@ connectWS();
 // loadSample('animus'); // Disabled — no auto-population
 checkHealth(); // Verify API keys are configured
 loadAgentModels(); // Load per-agent model assignments for card labels
-startStatusPolling(); // Fallback log/state hydration if websocket delivery drops
 
 // Re-update model tags when user changes model settings on the brief page
 document.addEventListener('change', (e) => {
@@ -3189,6 +3380,7 @@ async function initBrand() {
     if (brands.length > 0) {
       const targetSlug = preferredSlug || brands[0].slug; // /api/brands sorted by last_opened_at DESC
       activeBrandSlug = targetSlug;
+      syncSubscription();
 
       // Load the brand's brief into the form
       const brandResp = await fetch(`/api/brands/${targetSlug}/open`, { method: 'POST' });
@@ -0,0 +1,137 @@
+"""Lease, commit and cancel semantics shared by every WorkQueue backend."""
+
+from __future__ import annotations
+
+import pytest
+
+from pipeline.work_queue import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    LEASED,
+    QUEUED,
+    MemoryWorkQueue,
+    SQLiteWorkQueue,
+    Worker,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, clock, tmp_path):
+    if request.param == "memory":
+        return MemoryWorkQueue(clock=clock)
+    return SQLiteWorkQueue(tmp_path / "queue.db", clock=clock)
+
+
+def test_expired_lease_is_reissued(queue, clock):
+    task = queue.enqueue("shard", {"n": 1}, max_attempts=3)
+    first = queue.lease("w1", lease_seconds=10)
+    assert first["id"] == task["id"]
+
+    clock.advance(5)
+    assert queue.lease("w2", lease_seconds=10) is None
+
+    clock.advance(6)
+    second = queue.lease("w2", lease_seconds=10)
+    assert second["id"] == task["id"]
+    assert second["attempts"] == 2
+    assert second["worker_id"] == "w2"
+    assert second["lease_token"] != first["lease_token"]
+
+
+def test_stale_token_commit_is_rejected(queue, clock):
+    queue.enqueue("shard", {}, max_attempts=3)
+    stale = queue.lease("w1", lease_seconds=10)
+    clock.advance(11)
+    current = queue.lease("w2", lease_seconds=10)
+
+    assert queue.complete(stale["id"], stale["lease_token"], {"by": "w1"}) is False
+    assert queue.heartbeat(stale["id"], stale["lease_token"]) is False
+    assert queue.get(current["id"])["status"] == LEASED
+
+    assert queue.complete(current["id"], current["lease_token"], {"by": "w2"}) is True
+    assert queue.get(current["id"])["result"] == {"by": "w2"}
+
+
+def test_repeated_commit_is_accepted(queue):
+    queue.enqueue("shard", {})
+    task = queue.lease("w1", lease_seconds=10)
+
+    assert queue.complete(task["id"], task["lease_token"], {"ok": 1}) is True
+    assert queue.complete(task["id"], task["lease_token"], {"ok": 1}) is True
+    done = queue.get(task["id"])
+    assert done["status"] == COMPLETED
+    assert done["result"] == {"ok": 1}
+
+
+def test_expired_leases_fail_after_max_attempts(queue, clock):
+    task = queue.enqueue("shard", {}, max_attempts=2)
+    for _ in range(2):
+        assert queue.lease("w1", lease_seconds=10)["id"] == task["id"]
+        clock.advance(11)
+
+    assert queue.lease("w1", lease_seconds=10) is None
+    failed = queue.get(task["id"])
+    assert failed["status"] == FAILED
+    assert "Lease expired" in failed["error"]
+
+
+def test_fail_retries_until_max_attempts(queue, clock):
+    task = queue.enqueue("shard", {}, max_attempts=2)
+    leased = queue.lease("w1", lease_seconds=10)
+    assert queue.fail(task["id"], leased["lease_token"], "boom") == QUEUED
+
+    clock.advance(60)
+    leased = queue.lease("w1", lease_seconds=10)
+    assert queue.fail(task["id"], leased["lease_token"], "boom") == FAILED
+    assert queue.get(task["id"])["status"] == FAILED
+
+
+def test_cancel_leased_task(queue):
+    task = queue.enqueue("shard", {})
+    leased = queue.lease("w1", lease_seconds=10)
+
+    assert queue.cancel(task["id"]) is True
+    assert queue.heartbeat(task["id"], leased["lease_token"]) is False
+    assert queue.fail(task["id"], leased["lease_token"], "cancelled") == CANCELLED
+    assert queue.cancel(task["id"]) is False
+
+
+def test_cancel_leased_task_that_expires(queue, clock):
+    task = queue.enqueue("shard", {})
+    queue.lease("w1", lease_seconds=10)
+    assert queue.cancel(task["id"]) is True
+
+    clock.advance(11)
+    assert queue.lease("w2", lease_seconds=10) is None
+    assert queue.get(task["id"])["status"] == CANCELLED
+
+
+def test_worker_fails_task_whose_result_cannot_be_committed(queue, monkeypatch):
+    task = queue.enqueue("shard", {}, max_attempts=1)
+
+    def broken_complete(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(queue, "complete", broken_complete)
+    monkeypatch.setattr("pipeline.work_queue.time.sleep", lambda _: None)
+    worker = Worker(queue, {"shard": lambda payload, ctx: {"ok": 1}}, worker_id="w1", lease_seconds=30)
+
+    assert worker.run_once() is True
+    assert queue.get(task["id"])["status"] == FAILED
@@ -0,0 +1,63 @@
+"""Stand-alone worker for the distributed work queue.
+
+Usage:
+    WORK_QUEUE_BACKEND=sqlite python worker.py
+    python worker.py --backend sqlite --threads 4 --id render-box-1
+
+Leases agent runs enqueued by the API server (see pipeline/work_queue.py),
+runs them, and commits the results. Run as many as you like, on this or
+other machines that can reach the queue backend. The worker needs the same
+provider API keys (and PROVIDER_POOL entries, if used) as the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import threading
+
+import config
+from pipeline.work_queue import Worker, default_worker_id, get_work_queue
+from pipeline.work_tasks import TASK_HANDLERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run work-queue tasks (agent runs).")
+    parser.add_argument("--backend", default=config.WORK_QUEUE_BACKEND or "sqlite",
+                        help='Queue backend: "sqlite" or "module:Class" (default: WORK_QUEUE_BACKEND or sqlite)')
+    parser.add_argument("--threads", type=int, default=1, help="Tasks to run at once (default: 1)")
+    parser.add_argument("--id", default=None, help="Worker id shown in task leases (default: hostname-random)")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds between polls when idle")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL), format="%(asctime)s %(levelname)s %(message)s")
+    config.WORK_QUEUE_BACKEND = args.backend
+    queue = get_work_queue()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    base_id = args.id or default_worker_id()
+    threads = [
+        threading.Thread(
+            target=Worker(queue, TASK_HANDLERS, worker_id=f"{base_id}-{i}" if args.threads > 1 else base_id,
+                          poll_interval=args.poll).run_forever,
+            args=(stop,),
+            name=f"worker-{i}",
+        )
+        for i in range(max(1, args.threads))
+    ]
+    for thread in threads:
+        thread.start()
+    # Wake periodically so signals are handled promptly.
+    while not stop.wait(0.5):
+        pass
+    logging.info("Stopping; waiting for running tasks to finish")
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()